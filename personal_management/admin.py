@@ -1,14 +1,20 @@
+import json
+
 from django import forms
 from django.contrib import admin
+from django.db.models import Q
+from django.utils.html import format_html
 
-from . import models
+from . import admin_actions, models
+from .admin_changelists import AutocompleteFilter, AutocompleteFilterMixin, LargeTableAdmin
 
 
 @admin.register(models.AreaOfLife)
-class AreaOfLifeAdmin(admin.ModelAdmin):
+class AreaOfLifeAdmin(AutocompleteFilterMixin, admin.ModelAdmin):
     list_display = ("name", "owner", "color")
     search_fields = ("name", "owner__username")
-    list_filter = ("owner",)
+    list_filter = (("owner", AutocompleteFilter),)
+    list_select_related = ("owner",)
 
 
 class MilestoneInline(admin.TabularInline):
@@ -17,39 +23,62 @@ class MilestoneInline(admin.TabularInline):
 
 
 @admin.register(models.Goal)
-class GoalAdmin(admin.ModelAdmin):
+class GoalAdmin(AutocompleteFilterMixin, admin.ModelAdmin):
     list_display = ("title", "area", "start_date", "target_date", "completion_ratio")
     search_fields = ("title", "area__name")
-    list_filter = ("area__owner", "area")
+    list_filter = (("area__owner", AutocompleteFilter), ("area", AutocompleteFilter))
     inlines = [MilestoneInline]
 
 
 @admin.register(models.Habit)
-class HabitAdmin(admin.ModelAdmin):
+class HabitAdmin(AutocompleteFilterMixin, admin.ModelAdmin):
     list_display = ("name", "area", "frequency", "target_per_period", "active")
-    list_filter = ("frequency", "active", "area__owner")
+    list_filter = ("frequency", "active", ("area__owner", AutocompleteFilter))
     search_fields = ("name", "area__name")
+    actions = (admin_actions.deactivate_habits, admin_actions.activate_habits)
 
 
 @admin.register(models.HabitCheckIn)
-class HabitCheckInAdmin(admin.ModelAdmin):
+class HabitCheckInAdmin(LargeTableAdmin):
     list_display = ("habit", "timestamp", "note")
-    list_filter = ("habit__area__owner", "habit")
+    list_filter = (("habit__area__owner", AutocompleteFilter), ("habit", AutocompleteFilter))
+    list_select_related = ("habit",)
     search_fields = ("habit__name", "note")
+    search_document = models.CHECKIN_SEARCH_DOCUMENT
     date_hierarchy = "timestamp"
+    autocomplete_fields = ("habit",)
+
+    def search_conditions(self, search_term):
+        # Habits are few; resolve the name first and use the habit_id index.
+        habits = models.Habit.objects.filter(name__icontains=search_term)
+        return super().search_conditions(search_term) | Q(habit__in=habits)
+
+
+@admin.register(models.HabitCheckInRollup)
+class HabitCheckInRollupAdmin(AutocompleteFilterMixin, admin.ModelAdmin):
+    list_display = ("habit", "period", "period_start", "count")
+    list_filter = ("period", ("habit__area__owner", AutocompleteFilter), ("habit", AutocompleteFilter))
+    list_select_related = ("habit",)
+    date_hierarchy = "period_start"
+    readonly_fields = ("habit", "period", "period_start", "count")
+
+    def has_add_permission(self, request):
+        return False
 
 
 @admin.register(models.Task)
-class TaskAdmin(admin.ModelAdmin):
+class TaskAdmin(AutocompleteFilterMixin, admin.ModelAdmin):
     list_display = ("title", "owner", "goal", "due_date", "completed")
-    list_filter = ("completed", "due_date", "owner")
+    list_filter = ("completed", "due_date", ("owner", AutocompleteFilter))
+    list_select_related = ("owner", "goal")
     search_fields = ("title", "goal__title", "owner__username")
+    actions = (admin_actions.complete_tasks, admin_actions.reopen_tasks)
 
 
 @admin.register(models.Reflection)
-class ReflectionAdmin(admin.ModelAdmin):
+class ReflectionAdmin(AutocompleteFilterMixin, admin.ModelAdmin):
     list_display = ("owner", "cadence", "created_at")
-    list_filter = ("cadence", "owner")
+    list_filter = ("cadence", ("owner", AutocompleteFilter))
     search_fields = ("owner__username", "highlights", "lessons")
 
 
@@ -88,11 +117,22 @@ class ExerciseForm(forms.ModelForm):
 
 
 @admin.register(models.Exercise)
-class ExerciseAdmin(admin.ModelAdmin):
+class ExerciseAdmin(LargeTableAdmin):
     list_display = ("name", "category", "equipment", "has_media")
     list_filter = ("category", "equipment")
+    list_select_related = ("category",)
     search_fields = ("name", "primary_muscles", "secondary_muscles")
+    search_document = models.EXERCISE_SEARCH_DOCUMENT
     form = ExerciseForm
+    actions = (admin_actions.recategorize_exercises,)
+
+    def search_conditions(self, search_term):
+        term = search_term.lower()
+        muscles = [name for name, _ in models.Exercise.MUSCLE_GROUP_CHOICES if term in name.lower()]
+        conditions = super().search_conditions(search_term)
+        if muscles:
+            conditions |= Q(primary_muscles__overlap=muscles) | Q(secondary_muscles__overlap=muscles)
+        return conditions
 
     @admin.display(boolean=True, description="Media")
     def has_media(self, obj):
@@ -105,10 +145,13 @@ class MealCategoryAdmin(admin.ModelAdmin):
 
 
 @admin.register(models.Meal)
-class MealAdmin(admin.ModelAdmin):
+class MealAdmin(LargeTableAdmin):
     list_display = ("name", "category", "calories", "protein", "carbohydrates", "fats", "has_media")
     list_filter = ("category",)
+    list_select_related = ("category",)
     search_fields = ("name", "summary", "ingredients")
+    search_document = models.MEAL_SEARCH_DOCUMENT
+    actions = (admin_actions.recategorize_meals,)
 
     @admin.display(boolean=True, description="Media")
     def has_media(self, obj):
@@ -129,8 +172,28 @@ class PomodoroProfileAdmin(admin.ModelAdmin):
     search_fields = ("user__username", "user__email")
 
 
+class FocusLengthFilter(admin.SimpleListFilter):
+    """Fixed focus-length bands; listing the distinct values would scan every session."""
+
+    title = "focus length"
+    parameter_name = "focus"
+    bands = {
+        "short": ("Up to 25 minutes", Q(focus_minutes__lte=25)),
+        "medium": ("26 to 50 minutes", Q(focus_minutes__gt=25, focus_minutes__lte=50)),
+        "long": ("Over 50 minutes", Q(focus_minutes__gt=50)),
+    }
+
+    def lookups(self, request, model_admin):
+        return [(value, label) for value, (label, _) in self.bands.items()]
+
+    def queryset(self, request, queryset):
+        if self.value() in self.bands:
+            return queryset.filter(self.bands[self.value()][1])
+        return queryset
+
+
 @admin.register(models.PomodoroSession)
-class PomodoroSessionAdmin(admin.ModelAdmin):
+class PomodoroSessionAdmin(LargeTableAdmin):
     list_display = (
         "profile",
         "status",
@@ -139,8 +202,17 @@ class PomodoroSessionAdmin(admin.ModelAdmin):
         "started_at",
         "completed_focus_minutes",
     )
-    list_filter = ("status", "focus_minutes")
+    list_filter = ("status", FocusLengthFilter, ("profile__user", AutocompleteFilter))
+    list_select_related = ("profile__user",)
     search_fields = ("profile__user__username",)
+    date_hierarchy = "started_at"
+    autocomplete_fields = ("profile",)
+    actions = (admin_actions.cancel_sessions,)
+
+    def search_conditions(self, search_term):
+        # Match the few profiles first so the sessions come from the profile_id index.
+        profiles = models.PomodoroProfile.objects.filter(user__username__icontains=search_term)
+        return Q(profile__in=profiles)
 
 
 @admin.register(models.PomodoroTree)
@@ -156,14 +228,57 @@ class SessionExerciseInline(admin.TabularInline):
 
 
 @admin.register(models.WorkoutSession)
-class WorkoutSessionAdmin(admin.ModelAdmin):
+class WorkoutSessionAdmin(AutocompleteFilterMixin, admin.ModelAdmin):
     list_display = ("title", "owner", "scheduled_for", "focus", "updated_at")
-    list_filter = ("owner", "scheduled_for")
+    list_filter = (("owner", AutocompleteFilter), "scheduled_for")
     search_fields = ("title", "focus", "notes", "owner__username")
     inlines = [SessionExerciseInline]
     autocomplete_fields = ("owner",)
 
 
+@admin.register(models.WeeklyMuscleVolume)
+class WeeklyMuscleVolumeAdmin(admin.ModelAdmin):
+    list_display = ("owner", "week_start", "muscle", "primary_sets", "secondary_sets", "primary_reps")
+    list_filter = ("muscle",)
+    search_fields = ("owner__username",)
+    date_hierarchy = "week_start"
+    readonly_fields = (
+        "owner",
+        "week_start",
+        "muscle",
+        "primary_sets",
+        "secondary_sets",
+        "primary_reps",
+        "secondary_reps",
+    )
+
+
+@admin.register(models.SlowQuery)
+class SlowQueryAdmin(admin.ModelAdmin):
+    list_display = ("captured_at", "duration_ms", "view", "template", "caller", "has_plan")
+    list_filter = ("view",)
+    search_fields = ("sql", "view", "template", "caller")
+    date_hierarchy = "captured_at"
+    fields = ("captured_at", "duration_ms", "view", "template", "caller", "sql", "params", "formatted_plan")
+    readonly_fields = fields
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.display(boolean=True, description="Plan")
+    def has_plan(self, obj):
+        return obj.plan is not None
+
+    @admin.display(description="Plan")
+    def formatted_plan(self, obj):
+        if obj.plan is None:
+            return "Not sampled"
+        return format_html("<pre>{}</pre>", json.dumps(obj.plan, indent=2))
+
+
 def _superuser_only_admin(request):
     return request.user.is_active and request.user.is_superuser
 
@@ -0,0 +1,158 @@
+"""Admin actions that change the whole selection with one ``UPDATE``.
+
+Django's changelist hands an action either the ticked rows or, after "Select all
+N", every row matching the current filters and search; both arrive as a
+queryset, so ``bulk_update`` never loads model instances. ``QuerySet.update``
+sends no ``post_save`` signals, so it does the signal handlers' invalidation
+itself, once for the batch: one library version bump, one cache write for every
+affected calendar feed, and one sync log upsert, all when the transaction
+commits.
+"""
+
+from __future__ import annotations
+
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.contrib.admin.utils import model_ngettext
+from django.db import IntegrityError, transaction
+from django.template.response import TemplateResponse
+from django.utils import timezone
+
+from . import calendar_feed, models, sync
+from .library_cache import bump_library_version
+
+
+def bulk_update(
+    queryset,
+    *,
+    sync_name: str | None = None,
+    calendar_owner: str | None = None,
+    library: bool = False,
+    **values,
+) -> int:
+    """Set ``values`` on every row of ``queryset`` and invalidate once.
+
+    ``sync_name`` queues the rows for delta sync, ``calendar_owner`` is the
+    lookup to the owners whose calendar feeds change, and ``library`` bumps the
+    Body library version.
+    """
+
+    with transaction.atomic(using=queryset.db):
+        # Read before the UPDATE: the selection's filters may not match afterwards.
+        if sync_name is not None:
+            sync.queryset_changed(sync_name, queryset)
+        owner_ids = (
+            set(queryset.order_by().values_list(calendar_owner, flat=True).distinct())
+            if calendar_owner
+            else set()
+        )
+        updated = queryset.update(**values)
+        # Bumped only once the outermost transaction commits, so a concurrent
+        # request cannot cache the old rows under the new versions.
+        if updated and owner_ids:
+            transaction.on_commit(lambda: calendar_feed.bump_feed_versions(owner_ids), using=queryset.db)
+        if updated and library:
+            transaction.on_commit(bump_library_version, using=queryset.db)
+    return updated
+
+
+def _report(modeladmin, request, updated: int, done: str) -> None:
+    modeladmin.message_user(
+        request,
+        f"{done} {updated} {model_ngettext(modeladmin.opts, updated)}.",
+        messages.SUCCESS,
+    )
+
+
+@admin.action(description="Mark selected tasks complete")
+def complete_tasks(modeladmin, request, queryset):
+    updated = bulk_update(
+        queryset.filter(completed=False), sync_name="task", calendar_owner="owner_id", completed=True
+    )
+    _report(modeladmin, request, updated, "Completed")
+
+
+@admin.action(description="Mark selected tasks not complete")
+def reopen_tasks(modeladmin, request, queryset):
+    updated = bulk_update(
+        queryset.filter(completed=True), sync_name="task", calendar_owner="owner_id", completed=False
+    )
+    _report(modeladmin, request, updated, "Reopened")
+
+
+@admin.action(description="Deactivate selected habits")
+def deactivate_habits(modeladmin, request, queryset):
+    updated = bulk_update(queryset.filter(active=True), sync_name="habit", active=False)
+    _report(modeladmin, request, updated, "Deactivated")
+
+
+@admin.action(description="Activate selected habits")
+def activate_habits(modeladmin, request, queryset):
+    updated = bulk_update(queryset.filter(active=False), sync_name="habit", active=True)
+    _report(modeladmin, request, updated, "Activated")
+
+
+@admin.action(description="Cancel selected running sessions")
+def cancel_sessions(modeladmin, request, queryset):
+    # ``auto_now`` only applies on save(), so set ``updated_at`` explicitly.
+    updated = bulk_update(
+        queryset.filter(status=models.PomodoroSession.RUNNING),
+        status=models.PomodoroSession.CANCELLED,
+        updated_at=timezone.now(),
+    )
+    _report(modeladmin, request, updated, "Cancelled")
+
+
+class CategoryForm(forms.Form):
+    category = forms.ModelChoiceField(queryset=None)
+
+    def __init__(self, *args, category_model, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["category"].queryset = category_model.objects.all()
+
+
+def _recategorize(modeladmin, request, queryset, category_model):
+    form = CategoryForm(request.POST if "apply" in request.POST else None, category_model=category_model)
+    if form.is_valid():
+        category = form.cleaned_data["category"]
+        try:
+            updated = bulk_update(queryset.exclude(category=category), library=True, category=category)
+        except IntegrityError:
+            modeladmin.message_user(
+                request,
+                f"Some selected {modeladmin.opts.verbose_name_plural} already exist in {category}; "
+                "nothing was changed.",
+                messages.ERROR,
+            )
+        else:
+            _report(modeladmin, request, updated, f"Moved to {category}:")
+        return None
+
+    # Show the form, carrying the selection through to the next POST.
+    select_across = request.POST.get("select_across") == "1"
+    return TemplateResponse(
+        request,
+        "admin/personal_management/bulk_action_form.html",
+        {
+            **modeladmin.admin_site.each_context(request),
+            "title": f"Move {modeladmin.opts.verbose_name_plural} to another category",
+            "opts": modeladmin.opts,
+            "form": form,
+            "action": request.POST["action"],
+            "select_across": select_across,
+            # The changelist ignores an action POST without ticked rows, even with select_across.
+            "selected": request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+            "action_checkbox_name": helpers.ACTION_CHECKBOX_NAME,
+        },
+    )
+
+
+@admin.action(description="Move selected exercises to another category")
+def recategorize_exercises(modeladmin, request, queryset):
+    return _recategorize(modeladmin, request, queryset, models.ExerciseCategory)
+
+
+@admin.action(description="Move selected meals to another category")
+def recategorize_meals(modeladmin, request, queryset):
+    return _recategorize(modeladmin, request, queryset, models.MealCategory)
@@ -0,0 +1,234 @@
+"""Changelist pieces for admin pages over tables with millions of rows.
+
+Django's default changelist is built for small tables. On a large one it runs a
+``COUNT(*)`` for every page, searches with ``ILIKE '%…%'`` across text columns,
+lists every related row in a foreign-key sidebar filter and builds the date
+drill-down from a ``SELECT DISTINCT date_trunc(…)`` over all matching rows.
+``LargeTableAdmin`` replaces each of those with something an index answers:
+
+* ``EstimatedCountPaginator`` reads the planner's row estimate for an unfiltered
+  list and stops counting filtered lists at ``COUNT_LIMIT`` rows;
+* ``search_document`` is a ``SearchVector`` backed by a GIN expression index,
+  matched word by word as prefixes;
+* ``AutocompleteFilter`` picks the related object with the admin's select2
+  autocomplete, so only the selected row is ever loaded;
+* ``BoundedDateHierarchyChangeList`` offers every period between the first and
+  last date instead of only the periods that have rows.
+"""
+
+from __future__ import annotations
+
+import re
+from datetime import date, datetime
+
+from django import forms
+from django.contrib import admin
+from django.contrib.admin.views.main import PAGE_VAR, ChangeList
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.contrib.postgres.search import SearchQuery
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Max, Min, Q
+from django.utils import formats, timezone
+from django.utils.functional import cached_property
+from django.utils.text import capfirst
+from django.utils.translation import gettext as _
+
+COUNT_LIMIT = 10_000
+SEARCH_CONFIG = "simple"
+
+_WORD = re.compile(r"\w+")
+
+
+def estimated_row_count(model, using: str = "default") -> int:
+    """Return PostgreSQL's row estimate for ``model``'s table, or -1 if unknown.
+
+    A partitioned table has no estimate of its own; its partitions' are added up.
+    """
+
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return -1
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT COALESCE(sum(c.reltuples) FILTER (WHERE c.relkind = 'r' AND c.reltuples >= 0), -1)::bigint "
+            "FROM pg_class c WHERE c.oid = %s::regclass "
+            "OR c.oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = %s::regclass)",
+            [model._meta.db_table] * 2,
+        )
+        return cursor.fetchone()[0]
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that never counts more than ``COUNT_LIMIT`` rows.
+
+    An unfiltered list of a table the planner estimates at ``COUNT_LIMIT`` rows
+    or more reports that estimate; any other list counts at most ``COUNT_LIMIT``
+    matches, so on very broad filters the last page link stops there.
+    """
+
+    @cached_property
+    def count(self) -> int:
+        queryset = self.object_list
+        if not queryset.query.has_filters():
+            estimate = estimated_row_count(queryset.model, queryset.db)
+            if estimate >= COUNT_LIMIT:
+                return estimate
+        return queryset.order_by()[:COUNT_LIMIT].count()
+
+
+def prefix_search_query(text: str) -> SearchQuery | None:
+    """Match every word of ``text`` as a prefix (``bench pr`` → ``bench:* & pr:*``)."""
+
+    words = _WORD.findall(text)
+    if not words:
+        return None
+    return SearchQuery(" & ".join(f"{word}:*" for word in words), search_type="raw", config=SEARCH_CONFIG)
+
+
+class AutocompleteFilter(admin.RelatedFieldListFilter):
+    """Foreign-key filter that searches for the related object instead of listing them all."""
+
+    template = "admin/personal_management/autocomplete_filter.html"
+
+    def field_choices(self, field, request, model_admin):
+        # The widget loads choices as the user types; nothing to list up front.
+        return []
+
+    def has_output(self) -> bool:
+        return True
+
+    def widget_html(self, changelist) -> str:
+        related_model = self.field.remote_field.model
+        form_field = forms.ModelChoiceField(
+            queryset=related_model._default_manager.all(),
+            to_field_name=self.field.target_field.name,
+            required=False,
+            widget=AutocompleteSelect(
+                self.field, changelist.model_admin.admin_site, attrs={"style": "width: 100%"}
+            ),
+        )
+        value = self.lookup_val[-1] if self.lookup_val else None
+        return form_field.widget.render(self.lookup_kwarg, value, attrs={"id": f"id_{self.lookup_kwarg}"})
+
+    def choices(self, changelist):
+        removed = {self.lookup_kwarg, self.lookup_kwarg_isnull, PAGE_VAR}
+        yield {
+            "selected": bool(self.lookup_val),
+            "widget": self.widget_html(changelist),
+            "hidden": [(name, value) for name, value in changelist.params.items() if name not in removed],
+            "query_string": changelist.get_query_string(remove=[self.lookup_kwarg, self.lookup_kwarg_isnull]),
+        }
+
+
+class AutocompleteFilterMixin:
+    """Load the select2 assets ``AutocompleteFilter`` needs on the changelist."""
+
+    @property
+    def media(self):
+        return super().media + AutocompleteSelect(None, self.admin_site).media
+
+
+class BoundedDateHierarchyChangeList(ChangeList):
+    """ChangeList whose date drill-down needs only the first and last date.
+
+    Links cover every year, month or day between the ``MIN`` and ``MAX`` of the
+    field, which an index on it answers from its two ends; a period without rows
+    just shows an empty page.
+    """
+
+    @cached_property
+    def date_hierarchy_links(self) -> dict:
+        field_name = self.date_hierarchy
+        year_field, month_field, day_field = (f"{field_name}__{part}" for part in ("year", "month", "day"))
+        year, month, day = (self.params.get(name) for name in (year_field, month_field, day_field))
+
+        def link(filters):
+            return self.get_query_string(filters, [f"{field_name}__"])
+
+        if year and month and day:
+            current = date(int(year), int(month), int(day))
+            return {
+                "show": True,
+                "back": {
+                    "link": link({year_field: year, month_field: month}),
+                    "title": capfirst(formats.date_format(current, "YEAR_MONTH_FORMAT")),
+                },
+                "choices": [{"title": capfirst(formats.date_format(current, "MONTH_DAY_FORMAT"))}],
+            }
+
+        bounds = self.queryset.aggregate(first=Min(field_name), last=Max(field_name))
+        first, last = (
+            timezone.localtime(value) if isinstance(value, datetime) and timezone.is_aware(value) else value
+            for value in (bounds["first"], bounds["last"])
+        )
+        if first is None:
+            return {"show": True, "back": None, "choices": []}
+        if not year and first.year == last.year:
+            # Like Django, start one level down when everything is in one year or month.
+            year = first.year
+            if first.month == last.month:
+                month = first.month
+
+        if year and month:
+            return {
+                "show": True,
+                "back": {"link": link({year_field: year}), "title": str(year)},
+                "choices": [
+                    {
+                        "link": link({year_field: year, month_field: month, day_field: number}),
+                        "title": capfirst(
+                            formats.date_format(date(int(year), int(month), number), "MONTH_DAY_FORMAT")
+                        ),
+                    }
+                    for number in range(first.day, last.day + 1)
+                ],
+            }
+        if year:
+            return {
+                "show": True,
+                "back": {"link": link({}), "title": _("All dates")},
+                "choices": [
+                    {
+                        "link": link({year_field: year, month_field: number}),
+                        "title": capfirst(formats.date_format(date(int(year), number, 1), "YEAR_MONTH_FORMAT")),
+                    }
+                    for number in range(first.month, last.month + 1)
+                ],
+            }
+        return {
+            "show": True,
+            "back": None,
+            "choices": [
+                {"link": link({year_field: str(number)}), "title": str(number)}
+                for number in range(first.year, last.year + 1)
+            ],
+        }
+
+
+class LargeTableAdmin(AutocompleteFilterMixin, admin.ModelAdmin):
+    """ModelAdmin whose changelist stays fast on tables with millions of rows."""
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    show_facets = admin.ShowFacets.NEVER
+    change_list_template = "admin/personal_management/large_table_change_list.html"
+    # A ``SearchVector`` with a matching GIN expression index on the model.
+    search_document = None
+
+    def get_changelist(self, request, **kwargs):
+        return BoundedDateHierarchyChangeList
+
+    def search_conditions(self, search_term: str) -> Q:
+        """Return the filter for rows matching ``search_term``."""
+
+        query = prefix_search_query(search_term)
+        return Q(search_document=query) if query is not None else Q(pk__in=[])
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        if self.search_document is not None:
+            queryset = queryset.alias(search_document=self.search_document)
+        return queryset.filter(self.search_conditions(search_term)), False
@@ -0,0 +1,678 @@
+"""Read-only JSON endpoints for the shared Body exercise and meal libraries.
+
+Rows are fetched with ``values()`` so no model instances are built, clients pick
+columns with ``fields=`` and page with an opaque keyset cursor over ``id``. ETags
+are derived from the library version and the normalized query, which lets
+``If-None-Match`` revalidations return 304 before any query runs.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import hashlib
+import json
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Any, Callable
+
+from django.contrib.auth.decorators import login_required
+from django.db.models import Model
+from django.http import (
+    Http404,
+    HttpResponse,
+    HttpResponseBadRequest,
+    HttpResponseForbidden,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.utils import timezone
+from django.utils.http import parse_etags
+from django.views.decorators.http import require_GET, require_POST
+
+from . import (
+    exports,
+    imports,
+    ingredients,
+    meal_planner,
+    models,
+    reflections,
+    sync,
+    training_volume,
+    workout_generator,
+)
+from .exercise_index import get_exercise_index
+from .meal_index import get_meal_index
+from .library_cache import get_library_version
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+MUSCLE_NAMES = {choice[0] for choice in models.Exercise.MUSCLE_GROUP_CHOICES}
+EQUIPMENT_NAMES = {choice[0] for choice in models.Exercise.EQUIPMENT_CHOICES}
+
+
+class InvalidQuery(ValueError):
+    """Raised when a filter, field list, or cursor cannot be applied."""
+
+
+def _muscle(value: str) -> list[str]:
+    if value not in MUSCLE_NAMES:
+        raise InvalidQuery(f"Unknown muscle group: {value}")
+    return [value]
+
+
+def _equipment(value: str) -> str:
+    if value not in EQUIPMENT_NAMES:
+        raise InvalidQuery(f"Unknown equipment: {value}")
+    return value
+
+
+def _number(value: str) -> Decimal:
+    try:
+        number = Decimal(value)
+    except ArithmeticError:
+        number = None
+    if number is None or not number.is_finite():
+        raise InvalidQuery(f"Expected a number, got {value!r}")
+    return number
+
+
+def _integer(value: str) -> int:
+    try:
+        return int(value)
+    except ValueError:
+        raise InvalidQuery(f"Expected an integer, got {value!r}") from None
+
+
+def _object_id(value: str) -> int:
+    number = _integer(value)
+    if number < 1:
+        raise InvalidQuery(f"Expected a positive id, got {value!r}")
+    return number
+
+
+@dataclass(frozen=True)
+class LibraryResource:
+    """Describes which columns and filters one library endpoint exposes."""
+
+    model: type[Model]
+    fields: dict[str, str]
+    default_fields: tuple[str, ...]
+    filters: dict[str, tuple[str, Callable[[str], Any]]] = field(default_factory=dict)
+    exclusions: dict[str, tuple[str, Callable[[str], Any]]] = field(default_factory=dict)
+
+    def parse_fields(self, raw: str | None) -> list[str]:
+        if not raw:
+            return list(self.default_fields)
+        requested = [name.strip() for name in raw.split(",") if name.strip()]
+        unknown = [name for name in requested if name not in self.fields]
+        if unknown:
+            raise InvalidQuery(f"Unknown field(s): {', '.join(unknown)}")
+        return list(dict.fromkeys(requested))
+
+    def parse_filters(self, params) -> dict[str, Any]:
+        return self._lookups(self.filters, params)
+
+    def parse_exclusions(self, params) -> dict[str, Any]:
+        return self._lookups(self.exclusions, params)
+
+    @staticmethod
+    def _lookups(spec, params) -> dict[str, Any]:
+        lookups: dict[str, Any] = {}
+        for param, (lookup, parse) in spec.items():
+            value = params.get(param)
+            if value not in (None, ""):
+                lookups[lookup] = parse(value)
+        return lookups
+
+
+CATEGORY_FIELDS = {"id": "id", "name": "name", "description": "description"}
+
+RESOURCES = {
+    "exercises": LibraryResource(
+        model=models.Exercise,
+        fields={
+            "id": "id",
+            "name": "name",
+            "category": "category_id",
+            "category_name": "category__name",
+            "equipment": "equipment",
+            "primary_muscles": "primary_muscles",
+            "secondary_muscles": "secondary_muscles",
+            "description": "description",
+            "coaching_cues": "coaching_cues",
+            "image_url": "image_url",
+            "video_url": "video_url",
+            "created_at": "created_at",
+        },
+        default_fields=(
+            "id",
+            "name",
+            "category",
+            "category_name",
+            "equipment",
+            "primary_muscles",
+            "secondary_muscles",
+            "image_url",
+            "video_url",
+        ),
+        filters={
+            "category": ("category_id", _integer),
+            "category_name": ("category__name__iexact", str),
+            "equipment": ("equipment", _equipment),
+            "primary_muscle": ("primary_muscles__contains", _muscle),
+            "secondary_muscle": ("secondary_muscles__contains", _muscle),
+            "q": ("name__icontains", str),
+        },
+    ),
+    "exercise-categories": LibraryResource(
+        model=models.ExerciseCategory,
+        fields=CATEGORY_FIELDS,
+        default_fields=("id", "name", "description"),
+        filters={"q": ("name__icontains", str)},
+    ),
+    "meals": LibraryResource(
+        model=models.Meal,
+        fields={
+            "id": "id",
+            "name": "name",
+            "category": "category_id",
+            "category_name": "category__name",
+            "summary": "summary",
+            "ingredients": "ingredients",
+            "instructions": "instructions",
+            "servings": "servings",
+            "calories": "calories",
+            "protein": "protein",
+            "carbohydrates": "carbohydrates",
+            "fats": "fats",
+            "prep_time_minutes": "prep_time_minutes",
+            "image_url": "image_url",
+            "recipe_url": "recipe_url",
+            "created_at": "created_at",
+        },
+        default_fields=(
+            "id",
+            "name",
+            "category",
+            "category_name",
+            "summary",
+            "servings",
+            "calories",
+            "protein",
+            "carbohydrates",
+            "fats",
+            "prep_time_minutes",
+            "image_url",
+            "recipe_url",
+        ),
+        filters={
+            "category": ("category_id", _integer),
+            "category_name": ("category__name__iexact", str),
+            "min_calories": ("calories__gte", _number),
+            "max_calories": ("calories__lte", _number),
+            "min_protein": ("protein__gte", _number),
+            "max_carbohydrates": ("carbohydrates__lte", _number),
+            "max_fats": ("fats__lte", _number),
+            "max_prep_time": ("prep_time_minutes__lte", _integer),
+            # One link per (meal, ingredient), so this join cannot duplicate meals.
+            "ingredient": ("ingredient_links__ingredient__name", ingredients.normalize_name),
+            "q": ("name__icontains", str),
+        },
+        exclusions={
+            "without_ingredient": ("ingredient_links__ingredient__name", ingredients.normalize_name),
+        },
+    ),
+    "meal-categories": LibraryResource(
+        model=models.MealCategory,
+        fields=CATEGORY_FIELDS,
+        default_fields=("id", "name", "description"),
+        filters={"q": ("name__icontains", str)},
+    ),
+}
+
+
+def encode_cursor(last_id: int) -> str:
+    return base64.urlsafe_b64encode(str(last_id).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return int(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidQuery("Invalid cursor") from None
+
+
+def _page_size(raw: str | None) -> int:
+    if not raw:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(_integer(raw), MAX_PAGE_SIZE))
+
+
+def _etag(resource_name: str, params) -> str:
+    normalized = "&".join(f"{key}={params.get(key)}" for key in sorted(params))
+    digest = hashlib.sha256(
+        f"{get_library_version()}|{resource_name}|{normalized}".encode()
+    ).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def _if_none_match(request, etag: str) -> bool:
+    # GZipMiddleware hands out weak W/"..." tags; If-None-Match compares weakly.
+    tags = parse_etags(request.headers.get("If-None-Match", ""))
+    return "*" in tags or etag in {tag.removeprefix("W/") for tag in tags}
+
+
+def _serialize(row: dict[str, Any]) -> dict[str, Any]:
+    return {key: float(value) if isinstance(value, Decimal) else value for key, value in row.items()}
+
+
+def _with_cache_headers(response: HttpResponse, etag: str) -> HttpResponse:
+    response["ETag"] = etag
+    response["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def library_list(request, resource_name: str):
+    resource = RESOURCES[resource_name]
+    etag = _etag(resource_name, request.GET)
+    if _if_none_match(request, etag):
+        return _with_cache_headers(HttpResponse(status=304), etag)
+
+    try:
+        fields = resource.parse_fields(request.GET.get("fields"))
+        lookups = resource.parse_filters(request.GET)
+        exclusions = resource.parse_exclusions(request.GET)
+        limit = _page_size(request.GET.get("limit"))
+        cursor = request.GET.get("cursor")
+        if cursor:
+            lookups["id__gt"] = decode_cursor(cursor)
+    except InvalidQuery as exc:
+        return HttpResponseBadRequest(str(exc))
+
+    columns = [resource.fields[name] for name in fields]
+    if "id" not in columns:
+        columns.append("id")
+    rows = list(
+        resource.model.objects.filter(**lookups)
+        .exclude(**exclusions)
+        .order_by("id")
+        .values(*columns)[: limit + 1]
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    results = [
+        _serialize({name: row[resource.fields[name]] for name in fields}) for row in rows
+    ]
+    payload = {
+        "results": results,
+        "next_cursor": encode_cursor(rows[-1]["id"]) if has_more else None,
+    }
+    return _with_cache_headers(JsonResponse(payload), etag)
+
+
+@login_required
+@require_GET
+def library_exercises(request):
+    return library_list(request, "exercises")
+
+
+@login_required
+@require_GET
+def library_exercise_categories(request):
+    return library_list(request, "exercise-categories")
+
+
+@login_required
+@require_GET
+def library_meals(request):
+    return library_list(request, "meals")
+
+
+@login_required
+@require_GET
+def library_meal_categories(request):
+    return library_list(request, "meal-categories")
+
+
+LIBRARY_EXPORTS = ("exercises", "meals")
+
+
+def _export_response(request, dataset: str, *, owner=None):
+    fmt = request.GET.get("format", "ndjson")
+    if fmt not in exports.FORMATS:
+        return HttpResponseBadRequest(f"format must be one of: {', '.join(exports.FORMATS)}")
+    compress = request.GET.get("gzip") in {"1", "true", "yes"}
+    response = StreamingHttpResponse(
+        exports.stream_export(dataset, fmt, owner=owner, compress=compress),
+        content_type=exports.content_type(fmt, compress=compress),
+    )
+    filename = exports.export_filename(dataset, fmt, compress=compress)
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+@login_required
+@require_GET
+def export_library(request, dataset: str):
+    if dataset not in LIBRARY_EXPORTS:
+        raise Http404("Unknown export")
+    if not request.user.is_superuser:
+        return HttpResponseForbidden("Library exports are limited to superusers")
+    return _export_response(request, dataset)
+
+
+@login_required
+@require_GET
+def export_workout_sessions(request):
+    return _export_response(request, "workout-sessions", owner=request.user)
+
+
+@login_required
+@require_POST
+def import_library(request, dataset: str):
+    if dataset not in imports.IMPORTERS:
+        raise Http404("Unknown import")
+    if not request.user.is_superuser:
+        return HttpResponseForbidden("Library imports are limited to superusers")
+    upload = request.FILES.get("file")
+    if upload is None:
+        return HttpResponseBadRequest("file is required")
+    fmt = request.POST.get("format") or imports.detect_format(upload.name)
+    if fmt not in imports.FORMATS:
+        return HttpResponseBadRequest(f"format must be one of: {', '.join(imports.FORMATS)}")
+
+    with imports.open_text(upload.file, upload.name) as stream:
+        report = imports.import_library(
+            dataset,
+            stream,
+            fmt,
+            create_categories=request.POST.get("create_categories", "1") in {"1", "true", "yes"},
+        )
+    return JsonResponse(report.to_dict())
+
+
+@login_required
+@require_GET
+def weekly_training_volume(request):
+    try:
+        weeks = max(1, min(_integer(request.GET.get("weeks") or "12"), 520))
+        muscle = request.GET.get("muscle") or None
+        if muscle is not None:
+            _muscle(muscle)
+    except InvalidQuery as exc:
+        return HttpResponseBadRequest(str(exc))
+
+    rows = training_volume.weekly_volume(
+        request.user, weeks=weeks, muscle=muscle, today=timezone.localdate()
+    )
+    return JsonResponse({"weeks": weeks, "results": list(rows)})
+
+
+def _csv_param(request, name: str) -> list[str]:
+    return [value.strip() for value in request.GET.get(name, "").split(",") if value.strip()]
+
+
+@login_required
+@require_GET
+def exercise_alternatives(request, exercise_id: int):
+    mode = request.GET.get("mode", "substitutes")
+    if mode not in {"substitutes", "similar"}:
+        return HttpResponseBadRequest("mode must be substitutes or similar")
+    try:
+        equipment = [_equipment(value) for value in _csv_param(request, "equipment")]
+        limit = max(1, min(_integer(request.GET.get("limit") or "10"), 100))
+    except InvalidQuery as exc:
+        return HttpResponseBadRequest(str(exc))
+
+    index = get_exercise_index()
+    if exercise_id not in index.positions:
+        raise Http404("Unknown exercise")
+    lookup = index.substitutes if mode == "substitutes" else index.similar
+    return JsonResponse({"results": lookup(exercise_id, equipment=equipment, limit=limit)})
+
+
+@login_required
+@require_GET
+def exercises_for_muscles(request):
+    try:
+        muscles = [_muscle(value)[0] for value in _csv_param(request, "muscles")]
+        equipment = [_equipment(value) for value in _csv_param(request, "equipment")]
+        limit = max(1, min(_integer(request.GET.get("limit") or "50"), 500))
+    except InvalidQuery as exc:
+        return HttpResponseBadRequest(str(exc))
+    if not muscles:
+        return HttpResponseBadRequest("muscles is required")
+    results = get_exercise_index().matching(muscles, equipment=equipment, limit=limit)
+    return JsonResponse({"results": results})
+
+
+@login_required
+@require_GET
+def similar_meals(request, meal_id: int):
+    try:
+        categories = [_object_id(value) for value in _csv_param(request, "category")]
+        exclude_categories = [_object_id(value) for value in _csv_param(request, "exclude_category")]
+        max_prep_time = request.GET.get("max_prep_time")
+        max_prep_time = _integer(max_prep_time) if max_prep_time else None
+        limit = max(1, min(_integer(request.GET.get("limit") or "10"), 100))
+    except InvalidQuery as exc:
+        return HttpResponseBadRequest(str(exc))
+
+    index = get_meal_index()
+    if meal_id not in index.positions:
+        raise Http404("Unknown meal or meal without a full macro breakdown")
+    if request.GET.get("other_categories") in {"1", "true", "yes"}:
+        exclude_categories.append(int(index.category[index.positions[meal_id]]))
+    results = index.similar(
+        meal_id,
+        limit=limit,
+        categories=categories,
+        exclude_categories=exclude_categories,
+        max_prep_time=max_prep_time,
+    )
+    return JsonResponse({"results": results})
+
+
+REFLECTION_CADENCES = {choice[0] for choice in models.Reflection.CADENCE_CHOICES}
+
+
+def _cadence(request) -> str | None:
+    cadence = request.GET.get("cadence") or None
+    if cadence is not None and cadence not in REFLECTION_CADENCES:
+        raise InvalidQuery(f"Unknown cadence: {cadence}")
+    return cadence
+
+
+@login_required
+@require_GET
+def reflection_archive(request):
+    try:
+        cadence = _cadence(request) or models.Reflection.WEEKLY
+        size = max(1, min(_integer(request.GET.get("limit") or str(reflections.PAGE_SIZE)), 100))
+        rows, next_cursor = reflections.review_page(
+            request.user, cadence, request.GET.get("cursor"), size=size
+        )
+    except (InvalidQuery, reflections.InvalidCursor) as exc:
+        return HttpResponseBadRequest(str(exc))
+    results = [
+        {
+            "id": row.id,
+            "cadence": row.cadence,
+            "created_at": row.created_at,
+            "highlights": row.highlights,
+            "lessons": row.lessons,
+            "next_steps": row.next_steps,
+        }
+        for row in rows
+    ]
+    return JsonResponse({"results": results, "next_cursor": next_cursor})
+
+
+@login_required
+@require_GET
+def reflection_search(request):
+    query = request.GET.get("q", "").strip()
+    if not query:
+        return HttpResponseBadRequest("q is required")
+    try:
+        cadence = _cadence(request)
+        limit = max(1, min(_integer(request.GET.get("limit") or str(reflections.SEARCH_LIMIT)), 100))
+    except InvalidQuery as exc:
+        return HttpResponseBadRequest(str(exc))
+    results = reflections.search(request.user, query[:200], cadence=cadence, limit=limit)
+    return JsonResponse({"results": results})
+
+
+@login_required
+@require_GET
+def sync_changes(request):
+    try:
+        since = request.GET.get("since")
+        since = decode_cursor(since) if since else 0
+        limit = max(1, min(_integer(request.GET.get("limit") or str(sync.BATCH_SIZE)), sync.MAX_BATCH_SIZE))
+    except InvalidQuery as exc:
+        return HttpResponseBadRequest(str(exc))
+    changes, last_seq, has_more = sync.changes_since(request.user, since, limit=limit)
+    return JsonResponse(
+        {"changes": changes, "next_cursor": encode_cursor(last_seq), "has_more": has_more}
+    )
+
+
+def _meal_plan_options(request) -> tuple[date, dict[str, Any]]:
+    params = request.GET
+    targets = meal_planner.MacroTargets(
+        **{
+            name: float(_number(params[name]))
+            for name in ("calories", "protein", "carbohydrates", "fats")
+            if params.get(name)
+        }
+    )
+    if min(targets.as_array()) <= 0:
+        raise InvalidQuery("Targets must be positive")
+    start = params.get("start")
+    try:
+        start = date.fromisoformat(start) if start else training_volume.week_start(timezone.localdate())
+    except ValueError:
+        raise InvalidQuery("start must be an ISO date") from None
+    last_start = date.max - timedelta(days=6)
+    if start > last_start:
+        raise InvalidQuery(f"start must be on or before {last_start.isoformat()}")
+    return start, {
+        "targets": targets,
+        "meal_count": max(1, min(_integer(params.get("meals") or "3"), 8)),
+        "categories": [_object_id(value) for value in _csv_param(request, "category")],
+        "max_prep_time": _integer(params["max_prep_time"]) if params.get("max_prep_time") else None,
+    }
+
+
+@login_required
+@require_GET
+def meal_plan(request):
+    try:
+        start, options = _meal_plan_options(request)
+    except InvalidQuery as exc:
+        return HttpResponseBadRequest(str(exc))
+    plan = meal_planner.plan_week(request.user, start, **options)
+    return JsonResponse({"start": start, "days": plan})
+
+
+@login_required
+@require_GET
+def shopping_list(request):
+    try:
+        start, options = _meal_plan_options(request)
+    except InvalidQuery as exc:
+        return HttpResponseBadRequest(str(exc))
+    plan = meal_planner.plan_week(request.user, start, **options)
+    meal_ids = [meal["id"] for day in plan for meal in day["meals"]]
+    return JsonResponse(
+        {"start": start, "meals": len(meal_ids), "items": ingredients.shopping_list(meal_ids)}
+    )
+
+
+def _bounded(data: dict, key: str, default: int, low: int, high: int) -> int:
+    value = data.get(key, default)
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise InvalidQuery(f"{key} must be an integer")
+    value = _integer(str(value))
+    if not low <= value <= high:
+        raise InvalidQuery(f"{key} must be between {low} and {high}")
+    return value
+
+
+def _string_list(data: dict, key: str) -> list[str]:
+    value = data.get(key) or []
+    if isinstance(value, str):
+        value = value.split(",")
+    if not isinstance(value, list):
+        raise InvalidQuery(f"{key} must be a list")
+    return [str(item).strip() for item in value if str(item).strip()]
+
+
+def _workout_request(data: dict) -> workout_generator.WorkoutRequest:
+    muscles = list(dict.fromkeys(_muscle(value)[0] for value in _string_list(data, "muscles")))
+    if not muscles:
+        raise InvalidQuery("muscles is required")
+    scheduled_for = data.get("scheduled_for") or None
+    if scheduled_for is not None:
+        try:
+            scheduled_for = date.fromisoformat(str(scheduled_for))
+        except ValueError:
+            raise InvalidQuery("scheduled_for must be an ISO date") from None
+    seed = data.get("seed")
+    return workout_generator.WorkoutRequest(
+        muscles=muscles,
+        equipment=[_equipment(value) for value in _string_list(data, "equipment")],
+        exercise_count=_bounded(data, "exercise_count", 6, 1, workout_generator.MAX_EXERCISES),
+        time_budget_minutes=_bounded(data, "time_budget_minutes", 60, 5, 240),
+        sets=_bounded(data, "sets", 3, 1, 10),
+        reps=str(data.get("reps") or "8-10")[:40],
+        rest_seconds=_bounded(data, "rest_seconds", 90, 0, 600),
+        title=str(data.get("title") or "")[:160],
+        focus=str(data.get("focus") or "")[:120],
+        scheduled_for=scheduled_for,
+        seed=None if seed is None else _bounded(data, "seed", 0, 0, 2**32 - 1),
+    )
+
+
+@login_required
+@require_POST
+def generate_workout_session(request):
+    try:
+        data = json.loads(request.body or "{}")
+    except json.JSONDecodeError:
+        return HttpResponseBadRequest("Invalid JSON payload")
+    if not isinstance(data, dict):
+        return HttpResponseBadRequest("Invalid JSON payload")
+    try:
+        workout = _workout_request(data)
+    except InvalidQuery as exc:
+        return HttpResponseBadRequest(str(exc))
+    if not workout.slots:
+        return HttpResponseBadRequest("time_budget_minutes is too short for a single exercise")
+
+    session, uncovered = workout_generator.generate_session(request.user, workout)
+    exercises = list(
+        session.session_exercises.order_by("order").values(
+            "order", "exercise_id", "exercise__name", "sets", "reps", "rest_seconds"
+        )
+    )
+    return JsonResponse(
+        {
+            "session": {
+                "id": session.id,
+                "title": session.title,
+                "focus": session.focus,
+                "scheduled_for": session.scheduled_for,
+                "exercises": exercises,
+            },
+            "estimated_minutes": round(len(exercises) * workout.minutes_per_exercise),
+            "uncovered_muscles": uncovered,
+        },
+        status=201,
+    )
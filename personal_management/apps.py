@@ -1,7 +1,32 @@
+import logging
+
 from django.apps import AppConfig
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
 
 
 class PersonalManagementConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "personal_management"
     verbose_name = "Personal Management"
+
+    def ready(self):
+        from . import signals  # noqa: F401
+
+        if getattr(settings, "WARM_TEMPLATES_ON_STARTUP", False):
+            self.warm_templates()
+
+    @staticmethod
+    def warm_templates():
+        from .template_warmup import warm
+
+        results = warm()
+        for result in results:
+            if result.error:
+                logger.error("Template %s failed to compile: %s", result.name, result.error)
+        logger.info(
+            "Warmed %d templates in %.1f ms",
+            len(results),
+            sum(result.seconds for result in results) * 1000,
+        )
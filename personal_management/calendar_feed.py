@@ -0,0 +1,196 @@
+"""Per-user iCalendar feed of task, milestone, and workout session dates.
+
+Calendar clients poll often, so the feed is keyed on a per-user version stored in
+the cache and bumped whenever one of the underlying rows changes. Token lookups
+are cached as well, which means a revalidation that ends in 304 never touches the
+database. A changed feed is streamed once and its body cached under the new
+version, so later polls are served from the cache.
+"""
+
+from __future__ import annotations
+
+import secrets
+import time
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from typing import Iterable, Iterator
+
+from django.core.cache import cache
+
+from . import models
+
+FEED_TIMEOUT = 60 * 60 * 24
+# Rendered feeds above this size are streamed on every change but not cached.
+MAX_CACHED_BYTES = 2 * 1024 * 1024
+PRODUCT_ID = "-//Improve//Personal Management//EN"
+
+
+def _version_key(owner_id: int) -> str:
+    return f"calendar-feed:{owner_id}:version"
+
+
+def _token_key(token: str) -> str:
+    return f"calendar-feed:token:{token}"
+
+
+def _body_key(owner_id: int, version: int) -> str:
+    return f"calendar-feed:{owner_id}:{version}:body"
+
+
+def get_feed_version(owner_id: int) -> int:
+    version = cache.get(_version_key(owner_id))
+    if version is None:
+        # Same reasoning as the library version: a timestamp seed means an evicted
+        # key can never make a client's stale ETag match again.
+        version = time.time_ns()
+        if not cache.add(_version_key(owner_id), version, None):
+            version = cache.get(_version_key(owner_id), version)
+    return version
+
+
+def bump_feed_version(owner_id: int) -> int:
+    version = time.time_ns()
+    cache.set(_version_key(owner_id), version, None)
+    return version
+
+
+def bump_feed_versions(owner_ids: Iterable[int]) -> int:
+    """Bump several owners' feeds with one cache write, for bulk changes."""
+
+    version = time.time_ns()
+    cache.set_many({_version_key(owner_id): version for owner_id in owner_ids}, None)
+    return version
+
+
+def last_modified(version: int) -> datetime:
+    return datetime.fromtimestamp(version // 1_000_000_000, tz=dt_timezone.utc)
+
+
+def feed_for(owner) -> models.CalendarFeed:
+    feed, _ = models.CalendarFeed.objects.get_or_create(
+        owner=owner, defaults={"token": secrets.token_urlsafe(32)}
+    )
+    return feed
+
+
+def rotate_token(owner) -> models.CalendarFeed:
+    feed = feed_for(owner)
+    cache.delete(_token_key(feed.token))
+    feed.token = secrets.token_urlsafe(32)
+    feed.save(update_fields=["token"])
+    return feed
+
+
+def owner_for_token(token: str) -> int | None:
+    """Resolve a feed token to its owner id, caching hits and misses."""
+
+    owner_id = cache.get(_token_key(token))
+    if owner_id is None:
+        owner_id = (
+            models.CalendarFeed.objects.filter(token=token).values_list("owner_id", flat=True).first()
+        ) or 0
+        cache.set(_token_key(token), owner_id, FEED_TIMEOUT)
+    return owner_id or None
+
+
+def cached_body(owner_id: int, version: int) -> bytes | None:
+    return cache.get(_body_key(owner_id, version))
+
+
+def _escape(text: str) -> str:
+    text = text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+    return text.replace("\r\n", "\\n").replace("\n", "\\n")
+
+
+def _fold(line: str) -> str:
+    # RFC 5545 §3.1: lines longer than 75 octets continue after CRLF + space.
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line + "\r\n"
+    parts, start = [], 0
+    while start < len(encoded):
+        end = min(start + (75 if not parts else 74), len(encoded))
+        while end < len(encoded) and (encoded[end] & 0xC0) == 0x80:
+            end -= 1
+        parts.append(encoded[start:end].decode())
+        start = end
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _event(uid: str, day: date, summary: str, description: str, stamp: str) -> str:
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{uid}",
+        f"DTSTAMP:{stamp}",
+        f"DTSTART;VALUE=DATE:{day:%Y%m%d}",
+        f"DTEND;VALUE=DATE:{day + timedelta(days=1):%Y%m%d}",
+        f"SUMMARY:{_escape(summary)}",
+    ]
+    if description:
+        lines.append(f"DESCRIPTION:{_escape(description)}")
+    lines.append("END:VEVENT")
+    return "".join(_fold(line) for line in lines)
+
+
+def _events(owner_id: int, stamp: str) -> Iterator[str]:
+    tasks = (
+        models.Task.objects.filter(owner_id=owner_id, due_date__isnull=False)
+        .order_by("pk")
+        .values_list("pk", "title", "description", "due_date", "completed")
+    )
+    for pk, title, description, due_date, completed in tasks.iterator(chunk_size=2000):
+        summary = f"✓ {title}" if completed else title
+        yield _event(f"task-{pk}@improve", due_date, summary, description, stamp)
+
+    milestones = (
+        models.Milestone.objects.filter(goal__area__owner_id=owner_id, due_date__isnull=False)
+        .order_by("pk")
+        .values_list("pk", "title", "goal__title", "due_date", "done", "notes")
+    )
+    for pk, title, goal_title, due_date, done, notes in milestones.iterator(chunk_size=2000):
+        summary = f"{'✓ ' if done else ''}{goal_title}: {title}"
+        yield _event(f"milestone-{pk}@improve", due_date, summary, notes, stamp)
+
+    sessions = (
+        models.WorkoutSession.objects.filter(owner_id=owner_id, scheduled_for__isnull=False)
+        .order_by("pk")
+        .values_list("pk", "title", "focus", "scheduled_for")
+    )
+    for pk, title, focus, scheduled_for in sessions.iterator(chunk_size=2000):
+        yield _event(f"session-{pk}@improve", scheduled_for, f"Workout: {title}", focus, stamp)
+
+
+def render(owner_id: int, version: int) -> Iterator[bytes]:
+    """Yield the feed in chunks and cache the full body once it is complete."""
+
+    stamp = f"{last_modified(version):%Y%m%dT%H%M%SZ}"
+    header = "".join(
+        _fold(line)
+        for line in (
+            "BEGIN:VCALENDAR",
+            "VERSION:2.0",
+            f"PRODID:{PRODUCT_ID}",
+            "CALSCALE:GREGORIAN",
+            "METHOD:PUBLISH",
+            "X-WR-CALNAME:Improve",
+        )
+    )
+    chunks: list[bytes] | None = []
+    size = 0
+    buffer = [header]
+    for event in _events(owner_id, stamp):
+        buffer.append(event)
+        if len(buffer) >= 200:
+            chunk = "".join(buffer).encode()
+            buffer = []
+            if chunks is not None:
+                chunks.append(chunk)
+                size += len(chunk)
+                if size > MAX_CACHED_BYTES:
+                    chunks = None
+            yield chunk
+    buffer.append("END:VCALENDAR\r\n")
+    chunk = "".join(buffer).encode()
+    yield chunk
+    if chunks is not None and size + len(chunk) <= MAX_CACHED_BYTES:
+        chunks.append(chunk)
+        cache.set(_body_key(owner_id, version), b"".join(chunks), FEED_TIMEOUT)
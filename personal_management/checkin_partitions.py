@@ -0,0 +1,255 @@
+"""Monthly partitions and rollup compaction for ``HabitCheckIn``.
+
+The check-in table is range-partitioned on ``timestamp`` into one table per UTC
+month (``personal_management_habitcheckin_y2025m01``) plus a default partition
+for rows no month covers. Check-ins recorded before the table was partitioned
+stay in the table they were written to, attached as ``…_legacy`` for every
+timestamp before the first monthly partition. Queries bounded in time only read
+the months they need, and an old month is removed by dropping its table rather
+than deleting its rows one by one.
+
+``create_partitions`` adds the current month and ``MONTHS_AHEAD`` more, moving
+any rows the default partition already holds for them; run
+``manage.py create_checkin_partitions`` from cron so inserts never fall through
+to the default. ``compact`` rolls every month older than
+``settings.HABIT_CHECKIN_DETAIL_MONTHS`` into ``HabitCheckInRollup`` — one count
+per habit per period of the habit's frequency (day, week or month in
+``settings.TIME_ZONE``) — and drops it; the legacy partition is compacted row by
+row until all of it is old enough to drop. Compacted check-ins are tombstoned in
+the sync log like any other delete, so every client drops them; the rollups are
+server-side only.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import models, sync
+
+MONTHS_AHEAD = 3
+
+PARENT = models.HabitCheckIn._meta.db_table
+DEFAULT_PARTITION = f"{PARENT}_default"
+LEGACY_PARTITION = f"{PARENT}_legacy"
+_PARTITION_NAME = re.compile(rf"^{PARENT}_y(\d{{4}})m(\d{{2}})$")
+_UPPER_BOUND = re.compile(r"TO \('(\d{4})-(\d{2})-01")
+
+# Rolls the rows selected by ``moved`` up into per-period counts and tombstones
+# their sync log entries; returns how many check-ins and rollup rows it touched.
+# Periods that straddle a month boundary are added to.
+_COMPACT_SQL = """
+    WITH moved AS ({moved}),
+    tombstoned AS (
+        UPDATE {sync_change} SET deleted = TRUE, changed_at = now(), seq = nextval('{sequence}')
+        WHERE model = 'habit_checkin' AND NOT deleted AND object_id IN (SELECT id FROM moved)
+    ),
+    rolled AS (
+        INSERT INTO {rollup} (habit_id, period, period_start, count)
+        SELECT moved.habit_id, p.period, date_trunc(p.period, moved."timestamp" AT TIME ZONE %s)::date, count(*)
+        FROM moved
+        JOIN {habit} h ON h.id = moved.habit_id
+        CROSS JOIN LATERAL (
+            SELECT CASE h.frequency WHEN %s THEN %s WHEN %s THEN %s ELSE %s END AS period
+        ) p
+        GROUP BY 1, 2, 3
+        ON CONFLICT (habit_id, period, period_start)
+        DO UPDATE SET count = {rollup}.count + EXCLUDED.count
+        RETURNING 1
+    )
+    SELECT (SELECT count(*) FROM moved), (SELECT count(*) FROM rolled)
+"""
+
+
+@dataclass
+class Compaction:
+    source: str
+    check_ins: int
+    rollups: int
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_of(moment: datetime | date) -> date:
+    if isinstance(moment, datetime):
+        moment = moment.astimezone(dt_timezone.utc)
+    return date(moment.year, moment.month, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT}_y{month.year}m{month.month:02d}"
+
+
+def _bound(month: date) -> str:
+    return f"'{month.isoformat()} 00:00:00+00'"
+
+
+def partitions() -> list[date]:
+    """Return the months that have a partition, oldest first."""
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = %s::regclass",
+            [PARENT],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    months = []
+    for name in names:
+        match = _PARTITION_NAME.match(name)
+        if match:
+            months.append(date(int(match[1]), int(match[2]), 1))
+    return sorted(months)
+
+
+def legacy_end() -> date | None:
+    """Return the month the legacy partition ends before, or ``None`` once it is dropped."""
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT pg_get_expr(c.relpartbound, c.oid) FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = %s::regclass AND c.relname = %s",
+            [PARENT, LEGACY_PARTITION],
+        )
+        row = cursor.fetchone()
+    if row is None:
+        return None
+    match = _UPPER_BOUND.search(row[0])
+    return date(int(match[1]), int(match[2]), 1)
+
+
+def create_partition(cursor, month: date) -> None:
+    name = partition_name(month)
+    start, end = _bound(month), _bound(add_months(month, 1))
+    cursor.execute(
+        f'SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE "timestamp" >= {start} AND "timestamp" < {end})'
+    )
+    if not cursor.fetchone()[0]:
+        cursor.execute(f"CREATE TABLE {name} PARTITION OF {PARENT} FOR VALUES FROM ({start}) TO ({end})")
+        return
+    # A new partition may not overlap rows already in the default one; move them.
+    cursor.execute(f"ALTER TABLE {PARENT} DETACH PARTITION {DEFAULT_PARTITION}")
+    cursor.execute(f"CREATE TABLE {name} PARTITION OF {PARENT} FOR VALUES FROM ({start}) TO ({end})")
+    cursor.execute(
+        f'WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE "timestamp" >= {start} AND "timestamp" < {end} '
+        'RETURNING id, "timestamp", note, habit_id) '
+        f'INSERT INTO {name} (id, "timestamp", note, habit_id) SELECT id, "timestamp", note, habit_id FROM moved'
+    )
+    cursor.execute(f"ALTER TABLE {PARENT} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT")
+
+
+def create_partitions(months_ahead: int = MONTHS_AHEAD, *, today: date | None = None) -> list[str]:
+    """Create any missing partitions from this month to ``months_ahead`` months out."""
+
+    current = month_of(today or timezone.now())
+    existing = set(partitions())
+    # Months before the end of the legacy partition are already covered by it.
+    covered_until = legacy_end() or date.min
+    created = []
+    with transaction.atomic(), connection.cursor() as cursor:
+        for offset in range(months_ahead + 1):
+            month = add_months(current, offset)
+            if month >= covered_until and month not in existing:
+                create_partition(cursor, month)
+                created.append(partition_name(month))
+    return created
+
+
+def compaction_cutoff(keep_months: int | None = None, *, today: date | None = None) -> date:
+    """First month kept in detail; every month before it is compacted."""
+
+    # Zero would compact the current month, and a negative value months ahead.
+    if keep_months is None:
+        keep_months = settings.HABIT_CHECKIN_DETAIL_MONTHS
+        if keep_months < 1:
+            raise ImproperlyConfigured("HABIT_CHECKIN_DETAIL_MONTHS must be at least 1.")
+    elif keep_months < 1:
+        raise ValueError("keep_months must be at least 1.")
+    return add_months(month_of(today or timezone.now()), -keep_months)
+
+
+def _compact(cursor, moved: str) -> tuple[int, int]:
+    sync_change = models.SyncChange._meta.db_table
+    # As in ``sync.rebuild``: concurrent sync writers wait, so their ``seq`` values
+    # land after the tombstones'. Writers lock check-ins before the sync log, so
+    # callers lock the check-ins they compact first.
+    cursor.execute(f"LOCK TABLE {sync_change} IN EXCLUSIVE MODE")
+    sql = _COMPACT_SQL.format(
+        moved=moved,
+        sync_change=sync_change,
+        sequence=sync.SEQUENCE,
+        rollup=models.HabitCheckInRollup._meta.db_table,
+        habit=models.Habit._meta.db_table,
+    )
+    cursor.execute(
+        sql,
+        [
+            settings.TIME_ZONE,
+            models.Habit.DAILY,
+            models.HabitCheckInRollup.DAY,
+            models.Habit.WEEKLY,
+            models.HabitCheckInRollup.WEEK,
+            models.HabitCheckInRollup.MONTH,
+        ],
+    )
+    return cursor.fetchone()
+
+
+def compact(keep_months: int | None = None, *, today: date | None = None) -> list[Compaction]:
+    """Roll months before the detail window into rollups and drop their partitions.
+
+    Each month is compacted in its own transaction, so an interrupted run keeps
+    what it finished and the next run picks up the rest. The month is detached
+    first, so no check-in can be added to it after it was counted; the check-in
+    table stays locked until that month's transaction commits.
+    """
+
+    cutoff = compaction_cutoff(keep_months, today=today)
+    results = []
+    for month in partitions():
+        if month >= cutoff:
+            break
+        name = partition_name(month)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"ALTER TABLE {PARENT} DETACH PARTITION {name}")
+            check_ins, rollups = _compact(cursor, f'SELECT id, habit_id, "timestamp" FROM {name}')
+            cursor.execute(f"DROP TABLE {name}")
+        results.append(Compaction(name, check_ins, rollups))
+
+    end = legacy_end()
+    if end is not None and end <= cutoff:
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"ALTER TABLE {PARENT} DETACH PARTITION {LEGACY_PARTITION}")
+            check_ins, rollups = _compact(cursor, f'SELECT id, habit_id, "timestamp" FROM {LEGACY_PARTITION}')
+            cursor.execute(f"DROP TABLE {LEGACY_PARTITION}")
+        results.append(Compaction(LEGACY_PARTITION, check_ins, rollups))
+    elif end is not None:
+        results.extend(_compact_rows(LEGACY_PARTITION, cutoff))
+
+    # Backdated check-ins for months that have no partition land in the default one.
+    results.extend(_compact_rows(DEFAULT_PARTITION, cutoff))
+    return results
+
+
+def _compact_rows(table: str, cutoff: date) -> list[Compaction]:
+    """Compact the rows of a partition that spans the cutoff by deleting them."""
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"LOCK TABLE {table} IN SHARE ROW EXCLUSIVE MODE")
+        cursor.execute(f'SELECT EXISTS (SELECT 1 FROM {table} WHERE "timestamp" < {_bound(cutoff)})')
+        if not cursor.fetchone()[0]:
+            return []
+        check_ins, rollups = _compact(
+            cursor,
+            f'DELETE FROM {table} WHERE "timestamp" < {_bound(cutoff)} RETURNING id, habit_id, "timestamp"',
+        )
+    return [Compaction(table, check_ins, rollups)]
@@ -0,0 +1,339 @@
+"""In-process muscle bitmask index over the exercise library.
+
+Each exercise's primary and secondary muscles are encoded as ``uint32`` bitmasks
+(one bit per entry in ``Exercise.MUSCLE_GROUP_CHOICES``) and stored in parallel
+NumPy arrays next to equipment codes and category ids. Substitution and
+similarity lookups are then a handful of vectorized bit operations over the
+whole library instead of array-overlap queries against PostgreSQL.
+
+Saves and deletes in this process patch the arrays in place; a change of the
+shared library version (another worker, a bulk import) triggers a full reload.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Iterable
+
+import numpy as np
+
+from . import models
+from .library_cache import get_library_version
+
+MUSCLE_BITS = {
+    name: 1 << position for position, (name, _) in enumerate(models.Exercise.MUSCLE_GROUP_CHOICES)
+}
+EQUIPMENT_CODES = {
+    name: position for position, (name, _) in enumerate(models.Exercise.EQUIPMENT_CHOICES)
+}
+REMOVED = np.uint8(255)
+
+
+def muscle_mask(muscles: Iterable[str]) -> int:
+    mask = 0
+    for muscle in muscles:
+        mask |= MUSCLE_BITS.get(muscle, 0)
+    return mask
+
+
+def muscles_from_mask(mask: int) -> list[str]:
+    return [name for name, bit in MUSCLE_BITS.items() if mask & bit]
+
+
+def equipment_mask(equipment: Iterable[str] | None) -> np.ndarray | None:
+    """Boolean lookup table indexed by equipment code, or None for "any"."""
+
+    if not equipment:
+        return None
+    allowed = np.zeros(256, dtype=bool)
+    for name in equipment:
+        if name in EQUIPMENT_CODES:
+            allowed[EQUIPMENT_CODES[name]] = True
+    return allowed
+
+
+def _popcount_table(bits: int) -> np.ndarray:
+    values = np.arange(1 << bits, dtype=np.uint32)
+    table = np.zeros(1 << bits, dtype=np.uint8)
+    for bit in range(bits):
+        table += ((values >> bit) & 1).astype(np.uint8)
+    return table
+
+
+# Every mask fits in len(MUSCLE_BITS) bits, so a lookup table (512 KiB for 19
+# muscles) turns popcount into a single gather on NumPy < 2.0.
+POPCOUNT = _popcount_table(len(MUSCLE_BITS))
+
+
+if hasattr(np, "bitwise_count"):
+
+    def popcount(values: np.ndarray) -> np.ndarray:
+        return np.bitwise_count(values)
+
+else:
+
+    def popcount(values: np.ndarray) -> np.ndarray:
+        return POPCOUNT[values.astype(np.intp)]
+
+
+class ExerciseIndex:
+    """Columnar snapshot of the exercise library keyed by position."""
+
+    def __init__(self, rows: Iterable[tuple] = (), *, version: int | None = None):
+        rows = list(rows)
+        size = len(rows)
+        capacity = max(16, size)
+        self.ids = np.zeros(capacity, dtype=np.int64)
+        self.primary = np.zeros(capacity, dtype=np.uint32)
+        self.secondary = np.zeros(capacity, dtype=np.uint32)
+        self.combined = np.zeros(capacity, dtype=np.uint32)
+        self.primary_count = np.zeros(capacity, dtype=np.uint8)
+        self.combined_count = np.zeros(capacity, dtype=np.uint8)
+        self.equipment = np.full(capacity, REMOVED, dtype=np.uint8)
+        self.category = np.zeros(capacity, dtype=np.int64)
+        self.names: list[str] = []
+        self.positions: dict[int, int] = {}
+        self.size = 0
+        self.version = version
+        self.lock = threading.RLock()
+        for row in rows:
+            self._store(self._append_slot(row[0]), row)
+
+    @classmethod
+    def load(cls) -> "ExerciseIndex":
+        version = get_library_version()
+        rows = models.Exercise.objects.order_by("id").values_list(
+            "id", "name", "primary_muscles", "secondary_muscles", "equipment", "category_id"
+        )
+        return cls(rows.iterator(chunk_size=5000), version=version)
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.equipment[: self.size] != REMOVED))
+
+    def _append_slot(self, exercise_id: int) -> int:
+        if self.size == len(self.ids):
+            capacity = len(self.ids) * 2
+            self.ids = np.resize(self.ids, capacity)
+            self.primary = np.resize(self.primary, capacity)
+            self.secondary = np.resize(self.secondary, capacity)
+            self.combined = np.resize(self.combined, capacity)
+            self.primary_count = np.resize(self.primary_count, capacity)
+            self.combined_count = np.resize(self.combined_count, capacity)
+            self.category = np.resize(self.category, capacity)
+            grown = np.full(capacity, REMOVED, dtype=np.uint8)
+            grown[: self.size] = self.equipment[: self.size]
+            self.equipment = grown
+        position = self.size
+        self.size += 1
+        self.positions[exercise_id] = position
+        self.names.append("")
+        return position
+
+    def _store(self, position: int, row: tuple) -> None:
+        exercise_id, name, primary, secondary, equipment, category_id = row
+        self.ids[position] = exercise_id
+        self.names[position] = name
+        primary_mask = muscle_mask(primary)
+        secondary_mask = muscle_mask(secondary)
+        self.primary[position] = primary_mask
+        self.secondary[position] = secondary_mask
+        self.combined[position] = primary_mask | secondary_mask
+        self.primary_count[position] = POPCOUNT[primary_mask]
+        self.combined_count[position] = POPCOUNT[primary_mask | secondary_mask]
+        self.equipment[position] = EQUIPMENT_CODES.get(equipment, EQUIPMENT_CODES[models.Exercise.OTHER])
+        self.category[position] = category_id
+
+    def upsert(self, exercise: models.Exercise) -> None:
+        row = (
+            exercise.pk,
+            exercise.name,
+            exercise.primary_muscles,
+            exercise.secondary_muscles,
+            exercise.equipment,
+            exercise.category_id,
+        )
+        with self.lock:
+            position = self.positions.get(exercise.pk)
+            if position is None:
+                position = self._append_slot(exercise.pk)
+            self._store(position, row)
+
+    def remove(self, exercise_id: int) -> None:
+        with self.lock:
+            position = self.positions.pop(exercise_id, None)
+            if position is not None:
+                self.equipment[position] = REMOVED
+
+    def _live(self, equipment: Iterable[str] | None, exclude_id: int | None = None) -> np.ndarray:
+        codes = self.equipment[: self.size]
+        allowed = equipment_mask(equipment)
+        live = codes != REMOVED if allowed is None else allowed[codes]
+        if exclude_id is not None and exclude_id in self.positions:
+            live[self.positions[exclude_id]] = False
+        return live
+
+    def _results(self, positions: np.ndarray, scores: np.ndarray | None = None) -> list[dict]:
+        results = []
+        for rank, position in enumerate(positions.tolist()):
+            entry = {
+                "id": int(self.ids[position]),
+                "name": self.names[position],
+                "equipment": models.Exercise.EQUIPMENT_CHOICES[self.equipment[position]][0],
+                "primary_muscles": muscles_from_mask(int(self.primary[position])),
+                "secondary_muscles": muscles_from_mask(int(self.secondary[position])),
+            }
+            if scores is not None:
+                entry["score"] = round(float(scores[rank]), 4)
+            results.append(entry)
+        return results
+
+    def substitutes(
+        self, exercise_id: int, *, equipment: Iterable[str] | None = None, limit: int = 10
+    ) -> list[dict]:
+        """Exercises training exactly the same primary muscles, best secondary overlap first."""
+
+        with self.lock:
+            position = self.positions.get(exercise_id)
+            if position is None:
+                return []
+            target_primary = self.primary[position]
+            target_secondary = self.secondary[position]
+            live = self._live(equipment, exclude_id=exercise_id)
+            candidates = np.flatnonzero(live & (self.primary[: self.size] == target_primary))
+            overlap = popcount(self.secondary[candidates] & target_secondary)
+            order = np.argsort(-overlap.astype(np.int16), kind="stable")[:limit]
+            return self._results(candidates[order])
+
+    def similar(
+        self, exercise_id: int, *, equipment: Iterable[str] | None = None, limit: int = 10
+    ) -> list[dict]:
+        """Rank exercises by weighted Jaccard similarity of primary and all muscles."""
+
+        with self.lock:
+            position = self.positions.get(exercise_id)
+            if position is None:
+                return []
+            scores = self._similarity(position)
+            scores[~self._live(equipment, exclude_id=exercise_id)] = -1.0
+            return self._top(scores, limit)
+
+    def matching(
+        self,
+        muscles: Iterable[str],
+        *,
+        equipment: Iterable[str] | None = None,
+        limit: int = 50,
+    ) -> list[dict]:
+        """Exercises whose primary muscles cover any of ``muscles``, most coverage first."""
+
+        target = np.uint32(muscle_mask(muscles))
+        with self.lock:
+            primary_shared = popcount(self.primary[: self.size] & target)
+            scores = (2 * primary_shared + popcount(self.combined[: self.size] & target)).astype(np.float32)
+            scores[~self._live(equipment) | (primary_shared == 0)] = -1.0
+            return self._top(scores, limit)
+
+    def greedy_cover(
+        self,
+        muscles: Iterable[str],
+        *,
+        count: int,
+        equipment: Iterable[str] | None = None,
+        exclude: Iterable[int] = (),
+        rng: np.random.Generator | None = None,
+    ) -> tuple[list[int], int]:
+        """Greedy set cover of ``muscles`` with at most ``count`` exercises.
+
+        Each step picks the exercise covering the most still-uncovered muscles
+        (primary hits weigh double). Once everything is covered the target resets,
+        so extra slots add balanced volume. Returns exercise ids and the mask of
+        muscles left uncovered.
+        """
+
+        target = muscle_mask(muscles)
+        with self.lock:
+            live = self._live(equipment)
+            for exercise_id in exclude:
+                if exercise_id in self.positions:
+                    live[self.positions[exercise_id]] = False
+            candidates = np.flatnonzero(live & ((self.combined[: self.size] & np.uint32(target)) != 0))
+            primary = self.primary[candidates]
+            combined = self.combined[candidates]
+            # Sub-integer jitter only breaks ties, so equal-gain picks vary between calls.
+            jitter = rng.random(len(candidates)) * 0.5 if rng is not None else np.zeros(len(candidates))
+            available = np.ones(len(candidates), dtype=bool)
+            uncovered = target
+            covered = 0
+            chosen: list[int] = []
+            while len(chosen) < count and available.any():
+                if uncovered == 0:
+                    uncovered = target
+                mask = np.uint32(uncovered)
+                gain = 2.0 * popcount(primary & mask) + popcount(combined & mask) + jitter
+                gain[~available] = -1.0
+                best = int(np.argmax(gain))
+                if gain[best] < 1:
+                    break
+                available[best] = False
+                chosen.append(int(self.ids[candidates[best]]))
+                covered |= int(combined[best])
+                uncovered &= ~int(combined[best])
+            return chosen, target & ~covered
+
+    def _similarity(self, position: int) -> np.ndarray:
+        # |A ∪ B| = |A| + |B| - |A ∩ B|, so only the intersections need a popcount.
+        size = self.size
+        primary_shared = popcount(self.primary[:size] & self.primary[position]).astype(np.float32)
+        combined_shared = popcount(self.combined[:size] & self.combined[position]).astype(np.float32)
+        primary_union = self.primary_count[:size] + np.float32(self.primary_count[position]) - primary_shared
+        combined_union = self.combined_count[:size] + np.float32(self.combined_count[position]) - combined_shared
+        primary_score = primary_shared / np.maximum(primary_union, 1)
+        combined_score = combined_shared / np.maximum(combined_union, 1)
+        return (2 * primary_score + combined_score) / 3
+
+    def _top(self, scores: np.ndarray, limit: int) -> list[dict]:
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+        order = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return self._results(order, scores[order])
+
+
+_index: ExerciseIndex | None = None
+_index_lock = threading.Lock()
+
+
+def get_exercise_index() -> ExerciseIndex:
+    """Return the process-wide index, reloading it if the library changed elsewhere."""
+
+    global _index
+    version = get_library_version()
+    index = _index
+    if index is None or index.version != version:
+        with _index_lock:
+            if _index is None or _index.version != version:
+                _index = ExerciseIndex.load()
+            index = _index
+    return index
+
+
+def library_changed(instance, *, deleted: bool, previous_version: int, version: int) -> None:
+    """Keep the loaded index current across a local library write.
+
+    Exercise writes are patched in place; writes to other library models only
+    carry the version forward. An index that was already stale before this write
+    is left alone so the next lookup reloads it in full.
+    """
+
+    index = _index
+    if index is None:
+        return
+    with index.lock:
+        if index.version != previous_version:
+            return
+        if isinstance(instance, models.Exercise):
+            if deleted:
+                index.remove(instance.pk)
+            else:
+                index.upsert(instance)
+        index.version = version
@@ -0,0 +1,193 @@
+"""Streaming NDJSON and CSV serializers for the Body library and workout plans.
+
+Every dataset is read with ``values_list().iterator(chunk_size=...)`` which uses a
+server-side cursor on PostgreSQL, and rows are encoded into small byte chunks as
+they arrive. Memory use therefore stays flat no matter how many rows are exported.
+"""
+
+from __future__ import annotations
+
+import csv
+import zlib
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Iterable, Iterator
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import QuerySet
+
+from . import models
+
+DEFAULT_CHUNK_SIZE = 2000
+FLUSH_BYTES = 64 * 1024
+FORMATS = ("ndjson", "csv")
+
+
+@dataclass(frozen=True)
+class ExportDataset:
+    """Column layout for one exportable dataset: output header -> ORM lookup."""
+
+    name: str
+    columns: tuple[tuple[str, str], ...]
+    ordering: tuple[str, ...] = ("id",)
+
+    @property
+    def headers(self) -> list[str]:
+        return [header for header, _ in self.columns]
+
+    def rows(self, queryset: QuerySet, *, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[tuple]:
+        lookups = [lookup for _, lookup in self.columns]
+        return queryset.order_by(*self.ordering).values_list(*lookups).iterator(chunk_size=chunk_size)
+
+
+DATASETS = {
+    "exercises": ExportDataset(
+        name="exercises",
+        columns=(
+            ("id", "id"),
+            ("name", "name"),
+            ("category", "category__name"),
+            ("equipment", "equipment"),
+            ("primary_muscles", "primary_muscles"),
+            ("secondary_muscles", "secondary_muscles"),
+            ("description", "description"),
+            ("coaching_cues", "coaching_cues"),
+            ("image_url", "image_url"),
+            ("video_url", "video_url"),
+            ("created_at", "created_at"),
+        ),
+    ),
+    "meals": ExportDataset(
+        name="meals",
+        columns=(
+            ("id", "id"),
+            ("name", "name"),
+            ("category", "category__name"),
+            ("summary", "summary"),
+            ("ingredients", "ingredients"),
+            ("instructions", "instructions"),
+            ("servings", "servings"),
+            ("calories", "calories"),
+            ("protein", "protein"),
+            ("carbohydrates", "carbohydrates"),
+            ("fats", "fats"),
+            ("prep_time_minutes", "prep_time_minutes"),
+            ("image_url", "image_url"),
+            ("recipe_url", "recipe_url"),
+            ("created_at", "created_at"),
+        ),
+    ),
+    # One row per planned exercise; sessions without exercises still appear once
+    # because the reverse relation is a LEFT OUTER JOIN.
+    "workout-sessions": ExportDataset(
+        name="workout-sessions",
+        columns=(
+            ("session_id", "id"),
+            ("owner", "owner__username"),
+            ("title", "title"),
+            ("scheduled_for", "scheduled_for"),
+            ("focus", "focus"),
+            ("order", "session_exercises__order"),
+            ("exercise_id", "session_exercises__exercise_id"),
+            ("exercise", "session_exercises__exercise__name"),
+            ("sets", "session_exercises__sets"),
+            ("reps", "session_exercises__reps"),
+            ("tempo", "session_exercises__tempo"),
+            ("rest_seconds", "session_exercises__rest_seconds"),
+        ),
+        ordering=("scheduled_for", "id", "session_exercises__order"),
+    ),
+}
+
+
+def dataset_queryset(name: str, *, owner=None) -> QuerySet:
+    if name == "exercises":
+        return models.Exercise.objects.all()
+    if name == "meals":
+        return models.Meal.objects.all()
+    queryset = models.WorkoutSession.objects.all()
+    if owner is not None:
+        queryset = queryset.filter(owner=owner)
+    return queryset
+
+
+def _json_value(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def _csv_value(value):
+    if isinstance(value, list):
+        return "|".join(str(item) for item in value)
+    return value
+
+
+class _Echo:
+    """File-like object whose ``write`` simply hands back what csv.writer produced."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def encode_ndjson(headers: list[str], rows: Iterable[tuple]) -> Iterator[str]:
+    encoder = DjangoJSONEncoder(separators=(",", ":"))
+    for row in rows:
+        yield encoder.encode(dict(zip(headers, map(_json_value, row)))) + "\n"
+
+
+def encode_csv(headers: list[str], rows: Iterable[tuple]) -> Iterator[str]:
+    writer = csv.writer(_Echo())
+    yield writer.writerow(headers)
+    for row in rows:
+        yield writer.writerow([_csv_value(value) for value in row])
+
+
+def _buffered(lines: Iterable[str]) -> Iterator[bytes]:
+    buffer: list[bytes] = []
+    size = 0
+    for line in lines:
+        encoded = line.encode("utf-8")
+        buffer.append(encoded)
+        size += len(encoded)
+        if size >= FLUSH_BYTES:
+            yield b"".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+def _gzipped(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def stream_export(
+    name: str,
+    fmt: str,
+    *,
+    owner=None,
+    compress: bool = False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """Yield the encoded (and optionally gzipped) bytes of dataset ``name``."""
+
+    dataset = DATASETS[name]
+    rows = dataset.rows(dataset_queryset(name, owner=owner), chunk_size=chunk_size)
+    encode = encode_ndjson if fmt == "ndjson" else encode_csv
+    chunks = _buffered(encode(dataset.headers, rows))
+    return _gzipped(chunks) if compress else chunks
+
+
+def export_filename(name: str, fmt: str, *, compress: bool = False) -> str:
+    return f"{name}.{fmt}" + (".gz" if compress else "")
+
+
+def content_type(fmt: str, *, compress: bool = False) -> str:
+    if compress:
+        return "application/gzip"
+    return "application/x-ndjson" if fmt == "ndjson" else "text/csv; charset=utf-8"
@@ -0,0 +1,332 @@
+"""Streaming bulk upsert of exercises and meals from CSV or NDJSON catalogs.
+
+Records are read one at a time, validated, and flushed in batches through
+``bulk_create(update_conflicts=True)`` on each model's natural key. Category names
+are resolved against an in-memory map so a batch costs one lookup query (to tell
+inserts from updates) plus one upsert statement. The accepted columns match the
+output of :mod:`personal_management.exports`, so exports round-trip.
+"""
+
+from __future__ import annotations
+
+import csv
+import gzip
+import io
+import json
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from typing import IO, Any, Iterable, Iterator
+
+from django.db import connection
+from django.db.models import Model
+
+from . import ingredients, models
+from .library_cache import bump_library_version
+
+DEFAULT_BATCH_SIZE = 2000
+MAX_REPORTED_ERRORS = 50
+FORMATS = ("csv", "ndjson")
+
+MUSCLE_NAMES = {choice[0] for choice in models.Exercise.MUSCLE_GROUP_CHOICES}
+EQUIPMENT_NAMES = {choice[0] for choice in models.Exercise.EQUIPMENT_CHOICES}
+
+
+class RowError(ValueError):
+    """Raised when a single record cannot be imported."""
+
+
+@dataclass
+class ImportReport:
+    inserted: int = 0
+    updated: int = 0
+    rejected: int = 0
+    errors: list[dict[str, Any]] = field(default_factory=list)
+
+    def reject(self, line: int, reason: str) -> None:
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": reason})
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "rejected": self.rejected,
+            "errors": self.errors,
+        }
+
+
+def detect_format(filename: str) -> str:
+    stem = filename[:-3] if filename.endswith(".gz") else filename
+    return "ndjson" if stem.endswith((".ndjson", ".jsonl", ".json")) else "csv"
+
+
+def open_text(stream: IO[bytes], filename: str) -> IO[str]:
+    if filename.endswith(".gz"):
+        stream = gzip.GzipFile(fileobj=stream)
+    return io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+
+
+def read_records(stream: IO[str], fmt: str) -> Iterator[tuple[int, dict[str, Any] | None]]:
+    """Yield ``(line_number, record)`` pairs; ``record`` is None for unparseable lines."""
+
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+        return
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            record = None
+        yield line_number, record if isinstance(record, dict) else None
+
+
+def _text(record: dict, key: str, *, max_length: int | None = None, required: bool = False) -> str:
+    value = record.get(key)
+    value = "" if value is None else str(value).strip()
+    if required and not value:
+        raise RowError(f"{key} is required")
+    if max_length is not None and len(value) > max_length:
+        raise RowError(f"{key} is longer than {max_length} characters")
+    return value
+
+
+def _muscles(record: dict, key: str) -> list[str]:
+    value = record.get(key) or []
+    if isinstance(value, str):
+        separator = "|" if "|" in value else ","
+        value = [part.strip() for part in value.split(separator)]
+    muscles = [str(item).strip() for item in value if str(item).strip()]
+    unknown = [muscle for muscle in muscles if muscle not in MUSCLE_NAMES]
+    if unknown:
+        raise RowError(f"unknown muscle group(s) in {key}: {', '.join(unknown)}")
+    if len(muscles) > 6:
+        raise RowError(f"{key} accepts at most 6 muscle groups")
+    return muscles
+
+
+def _decimal(record: dict, key: str, *, max_digits: int) -> Decimal | None:
+    value = record.get(key)
+    if value in (None, ""):
+        return None
+    try:
+        number = Decimal(str(value)).quantize(Decimal("0.01"))
+    except InvalidOperation:
+        raise RowError(f"{key} must be a number") from None
+    if not number.is_finite() or number < 0 or number >= 10 ** (max_digits - 2):
+        raise RowError(f"{key} is out of range")
+    return number
+
+
+def _positive_int(
+    record: dict, key: str, *, model: type[Model], minimum: int = 0, default: int | None = None
+) -> int | None:
+    value = record.get(key)
+    if value in (None, ""):
+        return default
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise RowError(f"{key} must be an integer") from None
+    # Anything the column cannot hold would abort the whole batch's INSERT.
+    _, maximum = connection.ops.integer_field_range(model._meta.get_field(key).get_internal_type())
+    if not minimum <= number <= maximum:
+        raise RowError(f"{key} must be between {minimum} and {maximum}")
+    return number
+
+
+class _LibraryImporter(ABC):
+    model: type[Model]
+    category_model: type[Model]
+    unique_fields: tuple[str, ...]
+    update_fields: tuple[str, ...]
+
+    def __init__(self, *, create_categories: bool = True):
+        self.create_categories = create_categories
+        # Category names are unique case-sensitively: an exact match wins, then
+        # the oldest category whose name differs only in case.
+        self.categories: dict[str, int] = {}
+        self.folded_categories: dict[str, int] = {}
+        for pk, name in self.category_model.objects.order_by("pk").values_list("pk", "name"):
+            self._remember_category(pk, name)
+
+    def _remember_category(self, pk: int, name: str) -> None:
+        self.categories[name] = pk
+        self.folded_categories.setdefault(name.casefold(), pk)
+
+    def category_id(self, name: str) -> int:
+        pk = self.categories.get(name) or self.folded_categories.get(name.casefold())
+        if pk is not None:
+            return pk
+        if not self.create_categories:
+            raise RowError(f"unknown category: {name}")
+        category = self.category_model.objects.filter(name__iexact=name).order_by("pk").first()
+        if category is None:
+            category, _ = self.category_model.objects.get_or_create(name=name)
+        self._remember_category(category.pk, name)
+        return category.pk
+
+    @abstractmethod
+    def values(self, record: dict) -> dict[str, Any]:
+        """Validate ``record`` and return the model field values except the category."""
+
+    def build(self, record: dict):
+        category = _text(record, "category", max_length=120, required=True)
+        values = self.values(record)
+        # Resolved last so a rejected record never creates a category.
+        return self.model(category_id=self.category_id(category), **values)
+
+    def natural_key(self, obj) -> tuple:
+        return tuple(getattr(obj, field_name) for field_name in self.key_attrs)
+
+    @property
+    def key_attrs(self) -> tuple[str, ...]:
+        return tuple(
+            f"{field_name}_id" if field_name == "category" else field_name
+            for field_name in self.unique_fields
+        )
+
+    def flush(self, objs: list, report: ImportReport) -> None:
+        # ON CONFLICT DO UPDATE cannot touch the same row twice per statement, so
+        # keep only the last record for each natural key within the batch.
+        unique = list({self.natural_key(obj): obj for obj in objs}.values())
+        existing = set(
+            self.model.objects.filter(name__in={obj.name for obj in unique}).values_list(*self.key_attrs)
+        )
+        updated = sum(1 for obj in unique if self.natural_key(obj) in existing)
+        self.model.objects.bulk_create(
+            unique,
+            update_conflicts=True,
+            unique_fields=self.unique_fields,
+            update_fields=self.update_fields,
+        )
+        self.after_flush(unique)
+        # Records superseded within the batch count as updates of the surviving row.
+        report.updated += updated + len(objs) - len(unique)
+        report.inserted += len(unique) - updated
+
+    def after_flush(self, objs: list) -> None:
+        """Hook for derived data; bulk_create skips the post_save signals that maintain it."""
+
+    def run(
+        self, records: Iterable[tuple[int, dict[str, Any] | None]], *, batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> ImportReport:
+        report = ImportReport()
+        batch: list = []
+        try:
+            for line_number, record in records:
+                if record is None:
+                    report.reject(line_number, "could not parse record")
+                    continue
+                try:
+                    batch.append(self.build(record))
+                except RowError as exc:
+                    report.reject(line_number, str(exc))
+                    continue
+                if len(batch) >= batch_size:
+                    self.flush(batch, report)
+                    batch = []
+            if batch:
+                self.flush(batch, report)
+        finally:
+            # bulk_create bypasses the post_save signals that normally bump the version.
+            if report.inserted or report.updated:
+                bump_library_version()
+        return report
+
+
+class ExerciseImporter(_LibraryImporter):
+    model = models.Exercise
+    category_model = models.ExerciseCategory
+    unique_fields = ("name", "category", "equipment")
+    update_fields = (
+        "primary_muscles",
+        "secondary_muscles",
+        "description",
+        "coaching_cues",
+        "image_url",
+        "video_url",
+    )
+
+    def values(self, record: dict) -> dict[str, Any]:
+        equipment = _text(record, "equipment") or models.Exercise.BODYWEIGHT
+        if equipment not in EQUIPMENT_NAMES:
+            raise RowError(f"unknown equipment: {equipment}")
+        primary_muscles = _muscles(record, "primary_muscles")
+        if not primary_muscles:
+            raise RowError("primary_muscles is required")
+        return {
+            "name": _text(record, "name", max_length=160, required=True),
+            "equipment": equipment,
+            "primary_muscles": primary_muscles,
+            "secondary_muscles": _muscles(record, "secondary_muscles"),
+            "description": _text(record, "description"),
+            "coaching_cues": _text(record, "coaching_cues"),
+            "image_url": _text(record, "image_url", max_length=200),
+            "video_url": _text(record, "video_url", max_length=200),
+        }
+
+
+class MealImporter(_LibraryImporter):
+    model = models.Meal
+    category_model = models.MealCategory
+    unique_fields = ("name", "category")
+    update_fields = (
+        "summary",
+        "ingredients",
+        "instructions",
+        "servings",
+        "calories",
+        "protein",
+        "carbohydrates",
+        "fats",
+        "prep_time_minutes",
+        "image_url",
+        "recipe_url",
+    )
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.ingredients = ingredients.IngredientSync()
+
+    def after_flush(self, objs: list) -> None:
+        self.ingredients.sync((meal.pk, meal.ingredients) for meal in objs)
+
+    def values(self, record: dict) -> dict[str, Any]:
+        return {
+            "name": _text(record, "name", max_length=160, required=True),
+            "summary": _text(record, "summary", max_length=200),
+            "ingredients": _text(record, "ingredients"),
+            "instructions": _text(record, "instructions"),
+            "servings": _positive_int(record, "servings", model=models.Meal, minimum=1, default=1),
+            "calories": _decimal(record, "calories", max_digits=6),
+            "protein": _decimal(record, "protein", max_digits=5),
+            "carbohydrates": _decimal(record, "carbohydrates", max_digits=5),
+            "fats": _decimal(record, "fats", max_digits=5),
+            "prep_time_minutes": _positive_int(record, "prep_time_minutes", model=models.Meal),
+            "image_url": _text(record, "image_url", max_length=200),
+            "recipe_url": _text(record, "recipe_url", max_length=200),
+        }
+
+
+IMPORTERS = {
+    "exercises": ExerciseImporter,
+    "meals": MealImporter,
+}
+
+
+def import_library(
+    dataset: str,
+    stream: IO[str],
+    fmt: str,
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    create_categories: bool = True,
+) -> ImportReport:
+    importer = IMPORTERS[dataset](create_categories=create_categories)
+    return importer.run(read_records(stream, fmt), batch_size=batch_size)
@@ -0,0 +1,216 @@
+"""Parse ``Meal.ingredients`` into normalized ``Ingredient`` rows.
+
+Every line of a meal's ingredient text becomes a ``MealIngredient`` link with an
+optional quantity and unit ("200 g chicken breast, diced" -> 200, "g",
+"chicken breast"). Once the links exist, "meals with X" and "meals without Y" are
+joins on the ``(ingredient, meal)`` index, and a shopping list is a single
+grouped query instead of a scan over recipe text.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+from fractions import Fraction
+from typing import Iterable
+
+from django.db.models import Count, DecimalField, Exists, F, OuterRef, Sum
+
+from . import models
+
+DEFAULT_BATCH_SIZE = 2000
+MAX_NAME_LENGTH = models.Ingredient._meta.get_field("name").max_length
+_quantity_field = models.MealIngredient._meta.get_field("quantity")
+# Quantities at or above this do not fit ``MealIngredient.quantity``.
+MAX_QUANTITY = Decimal(10) ** (_quantity_field.max_digits - _quantity_field.decimal_places)
+
+UNITS = {
+    "g": ("g", "gram", "grams", "gr"),
+    "kg": ("kg", "kilogram", "kilograms"),
+    "mg": ("mg",),
+    "ml": ("ml", "milliliter", "milliliters", "millilitre", "millilitres"),
+    "l": ("l", "liter", "liters", "litre", "litres"),
+    "cup": ("cup", "cups"),
+    "tbsp": ("tbsp", "tablespoon", "tablespoons"),
+    "tsp": ("tsp", "teaspoon", "teaspoons"),
+    "oz": ("oz", "ounce", "ounces"),
+    "lb": ("lb", "lbs", "pound", "pounds"),
+    "clove": ("clove", "cloves"),
+    "slice": ("slice", "slices"),
+    "piece": ("piece", "pieces", "pc", "pcs"),
+    "can": ("can", "cans"),
+    "pinch": ("pinch", "pinches"),
+    "handful": ("handful", "handfuls"),
+    "scoop": ("scoop", "scoops"),
+}
+UNIT_ALIASES = {alias: unit for unit, aliases in UNITS.items() for alias in aliases}
+VULGAR_FRACTIONS = {"½": "1/2", "⅓": "1/3", "⅔": "2/3", "¼": "1/4", "¾": "3/4"}
+
+_BULLET = re.compile(r"^\s*(?:[-*•·]+|\d+[.)](?!\d))\s*")
+_QUANTITY = re.compile(
+    r"^(?P<quantity>\d+\s+\d+/\d+|\d+/\d+|\d+(?:[.,]\d+)?)\s*"
+    r"(?:(?P<unit>" + "|".join(sorted(map(re.escape, UNIT_ALIASES), key=len, reverse=True)) + r")\b\.?)?"
+    r"\s*(?:of\s+)?",
+    re.IGNORECASE,
+)
+_PARENTHETICAL = re.compile(r"\([^)]*\)")
+_NOISE = re.compile(r"[^\w\s'-]+")
+_SPACES = re.compile(r"\s+")
+
+
+@dataclass(frozen=True)
+class ParsedIngredient:
+    name: str
+    quantity: Decimal | None = None
+    unit: str = ""
+
+
+def normalize_name(text: str) -> str:
+    """Canonical ingredient key: lowercase, no notes, single spaces."""
+
+    text = _PARENTHETICAL.sub(" ", text.casefold()).split(",", 1)[0]
+    text = _SPACES.sub(" ", _NOISE.sub(" ", text)).strip(" -'")
+    return text[:MAX_NAME_LENGTH]
+
+
+def _quantity(raw: str) -> Decimal | None:
+    try:
+        value = sum(Fraction(part.replace(",", ".")) for part in raw.split())
+        quantity = Decimal(value.numerator) / Decimal(value.denominator)
+    except (ValueError, ZeroDivisionError, InvalidOperation):
+        return None
+    quantity = quantity.quantize(Decimal("0.01"))
+    return quantity if quantity < MAX_QUANTITY else None
+
+
+def parse_line(line: str) -> ParsedIngredient | None:
+    for symbol, fraction in VULGAR_FRACTIONS.items():
+        line = line.replace(symbol, f" {fraction}")
+    text = _BULLET.sub("", line).strip()
+    quantity, unit = None, ""
+    match = _QUANTITY.match(text)
+    if match:
+        quantity = _quantity(match["quantity"])
+        unit = UNIT_ALIASES[match["unit"].lower()] if match["unit"] else ""
+        text = text[match.end():]
+    name = normalize_name(text)
+    if not name:
+        return None
+    return ParsedIngredient(name=name, quantity=quantity, unit=unit)
+
+
+def parse_ingredients(text: str) -> list[ParsedIngredient]:
+    """Parse one ingredient per line, merging repeats of the same ingredient."""
+
+    merged: dict[str, ParsedIngredient] = {}
+    for line in text.splitlines():
+        parsed = parse_line(line)
+        if parsed is None:
+            continue
+        previous = merged.get(parsed.name)
+        if previous is None:
+            merged[parsed.name] = parsed
+        elif previous.unit == parsed.unit and None not in (previous.quantity, parsed.quantity):
+            total = previous.quantity + parsed.quantity
+            # A total too large to store is as good as an unknown quantity.
+            merged[parsed.name] = ParsedIngredient(
+                parsed.name, total if total < MAX_QUANTITY else None, parsed.unit
+            )
+    return list(merged.values())
+
+
+class IngredientSync:
+    """Rewrites the ingredient links of batches of meals.
+
+    Ingredient ids are kept in an in-memory map so a batch costs one upsert of new
+    names, one lookup, one delete of the old links, and one bulk insert.
+    """
+
+    def __init__(self):
+        self.ingredient_ids: dict[str, int] = {}
+
+    def _resolve(self, names: set[str]) -> None:
+        missing = names - self.ingredient_ids.keys()
+        if not missing:
+            return
+        models.Ingredient.objects.bulk_create(
+            [models.Ingredient(name=name) for name in sorted(missing)], ignore_conflicts=True
+        )
+        self.ingredient_ids.update(
+            models.Ingredient.objects.filter(name__in=missing).values_list("name", "id")
+        )
+
+    def sync(self, meals: Iterable[tuple[int, str]]) -> int:
+        """Rebuild links for ``(meal_id, ingredients_text)`` pairs; returns links written."""
+
+        parsed = {meal_id: parse_ingredients(text or "") for meal_id, text in meals}
+        if not parsed:
+            return 0
+        self._resolve({item.name for items in parsed.values() for item in items})
+        links = [
+            models.MealIngredient(
+                meal_id=meal_id,
+                ingredient_id=self.ingredient_ids[item.name],
+                quantity=item.quantity,
+                unit=item.unit,
+                position=position,
+            )
+            for meal_id, items in parsed.items()
+            for position, item in enumerate(items, start=1)
+        ]
+        models.MealIngredient.objects.filter(meal_id__in=parsed).delete()
+        models.MealIngredient.objects.bulk_create(links, batch_size=DEFAULT_BATCH_SIZE)
+        return len(links)
+
+
+def sync_meals(meals: Iterable[models.Meal]) -> int:
+    return IngredientSync().sync((meal.pk, meal.ingredients) for meal in meals)
+
+
+def rebuild(*, batch_size: int = DEFAULT_BATCH_SIZE) -> tuple[int, int]:
+    """Re-parse every meal in id-ordered batches; returns ``(meals, links)``."""
+
+    syncer = IngredientSync()
+    meal_total = link_total = 0
+    last_id = 0
+    while True:
+        batch = list(
+            models.Meal.objects.filter(pk__gt=last_id)
+            .order_by("pk")
+            .values_list("pk", "ingredients")[:batch_size]
+        )
+        if not batch:
+            break
+        link_total += syncer.sync(batch)
+        meal_total += len(batch)
+        last_id = batch[-1][0]
+    # Names no meal refers to any more would otherwise linger in autocomplete lists.
+    models.Ingredient.objects.filter(
+        ~Exists(models.MealIngredient.objects.filter(ingredient=OuterRef("pk")))
+    ).delete()
+    return meal_total, link_total
+
+
+def shopping_list(meal_ids: Iterable[int]) -> list[dict]:
+    """Aggregate ingredients for one serving of each meal, grouped by name and unit."""
+
+    per_serving = F("quantity") / F("meal__servings")
+    rows = (
+        models.MealIngredient.objects.filter(meal_id__in=list(meal_ids))
+        .values("ingredient__name", "unit")
+        .annotate(
+            quantity=Sum(per_serving, output_field=DecimalField(max_digits=12, decimal_places=2)),
+            meals=Count("meal_id"),
+        )
+        .order_by("ingredient__name", "unit")
+    )
+    return [
+        {
+            "ingredient": row["ingredient__name"],
+            "unit": row["unit"],
+            "quantity": None if row["quantity"] is None else round(float(row["quantity"]), 2),
+            "meals": row["meals"],
+        }
+        for row in rows
+    ]
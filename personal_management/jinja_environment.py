@@ -0,0 +1,101 @@
+"""Jinja2 environment for the dashboard's hottest templates.
+
+Only the templates in ``JINJA_TEMPLATES`` have Jinja2 versions (under
+``personal_management/jinja2/``); they mirror their Django template twins
+filter for filter, so either engine produces the same page. Any other template
+the Jinja2 shell includes, such as a microapp's settings panel, is rendered by
+the Django engine through ``render_django``. ``DashboardView`` only switches
+engines when ``settings.JINJA2_TEMPLATES`` is on and the active microapp has a
+Jinja2 dashboard, so every other page is untouched.
+"""
+
+from __future__ import annotations
+
+from django.core.cache import InvalidCacheBackendError, caches
+from django.core.cache.utils import make_template_fragment_key
+from django.template import defaultfilters, engines
+from django.templatetags.static import static
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateformat import format as date_format
+from django.utils.timezone import template_localtime
+from jinja2 import Environment, pass_context, pass_eval_context
+from markupsafe import Markup
+
+JINJA_TEMPLATES = frozenset(
+    {
+        "personal_management/base.html",
+        "personal_management/dashboard.html",
+        "personal_management/systems/body/dashboard.html",
+        "personal_management/systems/body/exercises_detail.html",
+        "personal_management/systems/body/meals_detail.html",
+        "personal_management/systems/body/sessions_detail.html",
+        "personal_management/systems/productivity/dashboard.html",
+        "personal_management/systems/productivity/overview.html",
+    }
+)
+
+
+def url(name: str, *args, **kwargs) -> str:
+    return reverse(name, args=args or None, kwargs=kwargs or None)
+
+
+def now(format_string: str) -> str:
+    return date_format(timezone.localtime(), format_string)
+
+
+def date(value, format_string: str = "") -> str:
+    # Django applies ``expects_localtime`` when it calls the filter; do it here too.
+    return defaultfilters.date(template_localtime(value), format_string)
+
+
+@pass_eval_context
+def linebreaksbr(eval_ctx, value) -> Markup:
+    return Markup(defaultfilters.linebreaksbr(value, autoescape=eval_ctx.autoescape))
+
+
+def cache_fragment(fragment_name: str, timeout: int, *vary_on, caller) -> Markup:
+    """``{% call cache_fragment(name, timeout, *vary_on) %}…{% endcall %}``, like ``{% cache %}``."""
+
+    try:
+        fragment_cache = caches["template_fragments"]
+    except InvalidCacheBackendError:
+        fragment_cache = caches["default"]
+    key = make_template_fragment_key(fragment_name, vary_on)
+    value = fragment_cache.get(key)
+    if value is None:
+        value = caller()
+        fragment_cache.set(key, value, timeout)
+    return Markup(value)
+
+
+@pass_context
+def render_django(context, template_name: str, **extra) -> Markup:
+    """Render a Django template with the current context, as ``{% include %}`` would."""
+
+    values = {**context.get_all(), **extra}
+    template = engines["django"].get_template(template_name)
+    return Markup(template.render(values, values.get("request")))
+
+
+def environment(**options) -> Environment:
+    env = Environment(**options)
+    env.globals.update(
+        {
+            "static": static,
+            "url": url,
+            "now": now,
+            "cache_fragment": cache_fragment,
+            "render_django": render_django,
+            "jinja_templates": JINJA_TEMPLATES,
+        }
+    )
+    env.filters.update(
+        {
+            "date": date,
+            "floatformat": defaultfilters.floatformat,
+            "linebreaksbr": linebreaksbr,
+            "title": defaultfilters.title,
+        }
+    )
+    return env
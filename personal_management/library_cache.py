@@ -0,0 +1,50 @@
+"""Versioned cache helpers for the shared Body exercise and meal libraries.
+
+The libraries are global, so rendered fragments and derived values can be shared
+across every user. Cache keys embed a library version that is bumped whenever an
+Exercise, Meal, or one of their categories is written, which makes stale entries
+unreachable without having to enumerate and delete them.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Callable, TypeVar
+
+from django.core.cache import cache
+
+LIBRARY_VERSION_KEY = "body-library:version"
+LIBRARY_CACHE_TIMEOUT = 60 * 60 * 24
+
+T = TypeVar("T")
+
+
+def get_library_version() -> int:
+    version = cache.get(LIBRARY_VERSION_KEY)
+    if version is None:
+        # Seed with a timestamp rather than 1 so an evicted version key can never
+        # resurrect fragments that were cached under an older counter value.
+        version = time.time_ns()
+        if not cache.add(LIBRARY_VERSION_KEY, version, None):
+            version = cache.get(LIBRARY_VERSION_KEY, version)
+    return version
+
+
+def bump_library_version() -> int:
+    version = time.time_ns()
+    cache.set(LIBRARY_VERSION_KEY, version, None)
+    return version
+
+
+def library_cache_key(name: str, *parts: object, version: int | None = None) -> str:
+    version = get_library_version() if version is None else version
+    suffix = ":".join(str(part) for part in parts)
+    return f"body-library:{version}:{name}" + (f":{suffix}" if suffix else "")
+
+
+def cached_library_value(name: str, compute: Callable[[], T], *parts: object, version: int | None = None) -> T:
+    """Return ``compute()`` cached under the current library version."""
+
+    return cache.get_or_set(
+        library_cache_key(name, *parts, version=version), compute, LIBRARY_CACHE_TIMEOUT
+    )
@@ -0,0 +1,128 @@
+import re
+import statistics
+import time
+from difflib import SequenceMatcher
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.template import engines
+from django.test import RequestFactory
+from django.test.utils import override_settings
+
+from personal_management.views import DashboardView
+
+PAGES = (
+    "app=body",
+    "app=body&body_view=exercises",
+    "app=body&body_view=meals",
+    "app=body&body_view=sessions",
+    "app=productivity",
+)
+
+_BETWEEN_TAGS = re.compile(r">\s+<")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _normalize(html: str) -> str:
+    # The engines differ only in where block tags leave blank lines behind.
+    return _WHITESPACE.sub(" ", _BETWEEN_TAGS.sub("><", html)).strip()
+
+
+def _first_difference(left: str, right: str, width: int = 60) -> str:
+    for tag, i1, _, j1, _ in SequenceMatcher(None, left, right, autojunk=False).get_opcodes():
+        if tag != "equal":
+            return f"django: {left[i1:i1 + width]!r}\n  jinja2: {right[j1:j1 + width]!r}"
+    return ""
+
+
+class Command(BaseCommand):
+    help = (
+        "Render the dashboard pages that have Jinja2 templates with both engines, "
+        "report the median render time of each and check that the HTML matches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            help="Username whose dashboard is rendered (defaults to the first active user).",
+        )
+        parser.add_argument("--iterations", type=int, default=20, help="Renders per page and engine.")
+        parser.add_argument(
+            "--uncached-fragments",
+            action="store_true",
+            help="Render the Body library rows on every iteration instead of reading cached fragments.",
+        )
+        parser.add_argument(
+            "pages",
+            nargs="*",
+            metavar="query",
+            help=f"Dashboard query strings to render (default: {', '.join(PAGES)}).",
+        )
+
+    def handle(self, *args, **options):
+        if "jinja2" not in engines:
+            raise CommandError("Jinja2 is not installed; install it to compare the template engines.")
+        if options["iterations"] < 1:
+            raise CommandError("--iterations must be at least 1.")
+
+        User = get_user_model()
+        if options["user"]:
+            try:
+                user = User.objects.get(username=options["user"])
+            except User.DoesNotExist:
+                raise CommandError(f"User {options['user']!r} does not exist.") from None
+        else:
+            user = User.objects.filter(is_active=True).order_by("pk").first()
+            if user is None:
+                raise CommandError("There are no active users to render a dashboard for.")
+
+        if options["uncached_fragments"]:
+            caches = {
+                **settings.CACHES,
+                "template_fragments": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+            }
+            with override_settings(CACHES=caches):
+                self.benchmark(user, options["pages"] or PAGES, options["iterations"])
+        else:
+            self.benchmark(user, options["pages"] or PAGES, options["iterations"])
+
+    def benchmark(self, user, pages, iterations):
+        factory = RequestFactory(HTTP_HOST="localhost")
+        templates = {
+            name: engines[name].get_template(DashboardView.template_name) for name in ("django", "jinja2")
+        }
+
+        self.stdout.write(f"{'page':<40} {'django ms':>10} {'jinja2 ms':>10} {'speedup':>8}  output")
+        totals = {"django": 0.0, "jinja2": 0.0}
+        for query in pages:
+            request = factory.get(f"/dashboard/?{query}")
+            request.user = user
+            # Querysets in the context cache their rows on the first render, so the
+            # timed renders measure templates rather than the database.
+            context = DashboardView.build_dashboard_context(request)
+            html, medians = {}, {}
+            for name, template in templates.items():
+                html[name] = template.render(dict(context), request)
+                timings = []
+                for _ in range(iterations):
+                    started = time.perf_counter()
+                    template.render(dict(context), request)
+                    timings.append(time.perf_counter() - started)
+                medians[name] = statistics.median(timings) * 1000
+                totals[name] += medians[name]
+
+            django_html, jinja_html = _normalize(html["django"]), _normalize(html["jinja2"])
+            same = django_html == jinja_html
+            self.stdout.write(
+                f"{query:<40} {medians['django']:>10.2f} {medians['jinja2']:>10.2f} "
+                f"{medians['django'] / medians['jinja2']:>7.2f}x  "
+                + (self.style.SUCCESS("same") if same else self.style.ERROR("differs"))
+            )
+            if not same:
+                self.stdout.write(f"  {_first_difference(django_html, jinja_html)}")
+
+        self.stdout.write(
+            f"{'total':<40} {totals['django']:>10.2f} {totals['jinja2']:>10.2f} "
+            f"{totals['django'] / totals['jinja2']:>7.2f}x"
+        )
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from personal_management import checkin_partitions
+
+
+class Command(BaseCommand):
+    help = (
+        "Roll habit check-in months older than the detail window into per-habit period counts "
+        "and drop their partitions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--keep-months",
+            type=int,
+            help="Months kept in full detail, counting the current one "
+            "(defaults to settings.HABIT_CHECKIN_DETAIL_MONTHS).",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="List the partitions that would be compacted without changing anything.",
+        )
+
+    def handle(self, *args, **options):
+        keep_months = options["keep_months"]
+        if keep_months is not None and keep_months < 1:
+            raise CommandError("--keep-months must be at least 1.")
+        cutoff = checkin_partitions.compaction_cutoff(keep_months)
+
+        if options["dry_run"]:
+            months = [month for month in checkin_partitions.partitions() if month < cutoff]
+            for month in months:
+                self.stdout.write(f"Would compact {checkin_partitions.partition_name(month)}")
+            if checkin_partitions.legacy_end() is not None:
+                self.stdout.write(
+                    f"Would compact check-ins before {cutoff:%Y-%m} in {checkin_partitions.LEGACY_PARTITION}"
+                )
+            self.stdout.write(f"{len(months)} partitions before {cutoff:%Y-%m} would be compacted.")
+            return
+
+        results = checkin_partitions.compact(keep_months)
+        for result in results:
+            self.stdout.write(f"{result.source}: {result.check_ins} check-ins -> {result.rollups} rollup rows")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Compacted {sum(result.check_ins for result in results)} check-ins before {cutoff:%Y-%m}."
+            )
+        )
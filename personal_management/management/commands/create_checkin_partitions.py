@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from personal_management import checkin_partitions
+
+
+class Command(BaseCommand):
+    help = "Create the monthly habit check-in partitions for this month and the months ahead."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months-ahead",
+            type=int,
+            default=checkin_partitions.MONTHS_AHEAD,
+            help="How many months after the current one should have a partition.",
+        )
+
+    def handle(self, *args, **options):
+        if options["months_ahead"] < 0:
+            raise CommandError("--months-ahead cannot be negative.")
+        created = checkin_partitions.create_partitions(options["months_ahead"])
+        for name in created:
+            self.stdout.write(f"Created {name}")
+        self.stdout.write(self.style.SUCCESS(f"{len(created)} partitions created."))
@@ -0,0 +1,77 @@
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from personal_management import exports
+
+
+class Command(BaseCommand):
+    help = "Stream the exercise or meal library, or workout session plans, to NDJSON or CSV."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "dataset",
+            choices=sorted(exports.DATASETS),
+            help="Dataset to export.",
+        )
+        parser.add_argument(
+            "--format",
+            choices=exports.FORMATS,
+            default="ndjson",
+            help="Output format (default: ndjson).",
+        )
+        parser.add_argument(
+            "--output",
+            default="-",
+            help="File to write to, or '-' for stdout (default: stdout).",
+        )
+        parser.add_argument(
+            "--gzip",
+            action="store_true",
+            help="Compress the output with gzip.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=exports.DEFAULT_CHUNK_SIZE,
+            help=f"Rows fetched per server-side cursor round trip (default: {exports.DEFAULT_CHUNK_SIZE}).",
+        )
+        parser.add_argument(
+            "--owner",
+            help="Only export workout sessions owned by this username.",
+        )
+
+    def handle(self, *args, **options):
+        dataset: str = options["dataset"]
+        owner = None
+        if options["owner"]:
+            if dataset != "workout-sessions":
+                raise CommandError("--owner only applies to the workout-sessions dataset.")
+            try:
+                owner = get_user_model().objects.get(username=options["owner"])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"User {options['owner']!r} does not exist.") from None
+
+        chunks = exports.stream_export(
+            dataset,
+            options["format"],
+            owner=owner,
+            compress=options["gzip"],
+            chunk_size=max(1, options["chunk_size"]),
+        )
+        written = 0
+        if options["output"] == "-":
+            stream = sys.stdout.buffer
+            for chunk in chunks:
+                stream.write(chunk)
+                written += len(chunk)
+            stream.flush()
+        else:
+            with open(options["output"], "wb") as stream:
+                for chunk in chunks:
+                    stream.write(chunk)
+                    written += len(chunk)
+            self.stderr.write(
+                self.style.SUCCESS(f"Exported {dataset} to {options['output']} ({written} bytes).")
+            )
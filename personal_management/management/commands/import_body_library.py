@@ -0,0 +1,60 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from personal_management import imports
+
+
+class Command(BaseCommand):
+    help = "Upsert exercises or meals from a CSV or NDJSON catalog (optionally gzipped)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "dataset",
+            choices=sorted(imports.IMPORTERS),
+            help="Library to import into.",
+        )
+        parser.add_argument("path", help="Path to a .csv, .ndjson or .jsonl file (optionally .gz).")
+        parser.add_argument(
+            "--format",
+            choices=imports.FORMATS,
+            help="Input format (default: detected from the file extension).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=imports.DEFAULT_BATCH_SIZE,
+            help=f"Rows per upsert statement (default: {imports.DEFAULT_BATCH_SIZE}).",
+        )
+        parser.add_argument(
+            "--no-create-categories",
+            action="store_true",
+            help="Reject rows whose category does not exist instead of creating it.",
+        )
+
+    def handle(self, *args, **options):
+        path: str = options["path"]
+        fmt = options["format"] or imports.detect_format(path)
+        started = time.monotonic()
+        try:
+            raw = open(path, "rb")
+        except OSError as exc:
+            raise CommandError(f"Cannot open {path}: {exc}") from exc
+
+        with raw, imports.open_text(raw, path) as stream:
+            report = imports.import_library(
+                options["dataset"],
+                stream,
+                fmt,
+                batch_size=max(1, options["batch_size"]),
+                create_categories=not options["no_create_categories"],
+            )
+
+        for error in report.errors:
+            self.stderr.write(f"  line {error['line']}: {error['error']}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {options['dataset']} in {time.monotonic() - started:.1f}s: "
+                f"{report.inserted} inserted, {report.updated} updated, {report.rejected} rejected."
+            )
+        )
@@ -0,0 +1,78 @@
+import gzip
+import re
+
+from django.contrib.auth import get_user_model
+from django.contrib.staticfiles import finders
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+from personal_management.views import DashboardView
+
+ANONYMOUS_PAGES = ("/", "/about/", "/accounts/login/")
+DASHBOARD_VARIANTS = (
+    "app=body&body_view=exercises",
+    "app=body&body_view=meals",
+    "app=body&body_view=sessions",
+    *(
+        f"app=productivity&productivity_view={view}"
+        for view in ("pomodoro", "blocking", "weekly", "monthly", "habits", "backward", "parkinson")
+    ),
+)
+BUNDLES = ("css/site.css", "css/app.css", "js/app.js")
+
+_INLINE = re.compile(rb"<(style|script)(?![^>]*\bsrc=)[^>]*>.*?</\1>", re.S)
+
+
+class Command(BaseCommand):
+    help = "Report the HTML bytes of each page and how much of it is inline CSS and JavaScript."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            help="Username for the dashboard pages (defaults to the first active user).",
+        )
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        if options["user"]:
+            try:
+                user = User.objects.get(username=options["user"])
+            except User.DoesNotExist:
+                raise CommandError(f"User {options['user']!r} does not exist.") from None
+        else:
+            user = User.objects.filter(is_active=True).order_by("pk").first()
+
+        anonymous = Client(HTTP_HOST="localhost")
+        rows = [(path, anonymous.get(path)) for path in ANONYMOUS_PAGES]
+        if user is not None:
+            client = Client(HTTP_HOST="localhost")
+            client.force_login(user)
+            queries = [f"app={microapp['slug']}" for microapp in DashboardView.default_microapps]
+            for query in (*queries, *DASHBOARD_VARIANTS):
+                rows.append((f"/dashboard/?{query}", client.get(f"/dashboard/?{query}")))
+
+        self.stdout.write(f"{'page':<60} {'html':>9} {'gzip':>8} {'inline':>8}")
+        totals = [0, 0, 0]
+        for path, response in rows:
+            if response.status_code != 200:
+                self.stdout.write(self.style.WARNING(f"{path:<60} HTTP {response.status_code}"))
+                continue
+            html = response.content
+            sizes = (
+                len(html),
+                len(gzip.compress(html, mtime=0)),
+                sum(len(match.group(0)) for match in _INLINE.finditer(html)),
+            )
+            totals = [total + size for total, size in zip(totals, sizes)]
+            self.stdout.write(f"{path:<60} {sizes[0]:>9} {sizes[1]:>8} {sizes[2]:>8}")
+        self.stdout.write(self.style.SUCCESS(f"{'total':<60} {totals[0]:>9} {totals[1]:>8} {totals[2]:>8}"))
+
+        self.stdout.write("\nStatic bundles (downloaded once per deploy):")
+        for name in BUNDLES:
+            path = finders.find(name)
+            if path is None:
+                self.stdout.write(f"  {name:<20} not found")
+                continue
+            with open(path, "rb") as handle:
+                data = handle.read()
+            self.stdout.write(f"  {name:<20} {len(data):>8} bytes, {len(gzip.compress(data, mtime=0)):>7} gzip")
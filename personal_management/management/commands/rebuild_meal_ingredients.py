@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from personal_management import ingredients
+
+
+class Command(BaseCommand):
+    help = "Re-parse every meal's ingredient text into the normalized ingredient tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=ingredients.DEFAULT_BATCH_SIZE,
+            help="Meals parsed and written per batch.",
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        meals, links = ingredients.rebuild(batch_size=max(1, options["batch_size"]))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Linked {links} ingredients across {meals} meals in {time.monotonic() - started:.1f}s."
+            )
+        )
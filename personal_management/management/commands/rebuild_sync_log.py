@@ -0,0 +1,18 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from personal_management import sync
+
+
+class Command(BaseCommand):
+    help = "Add change-log entries for rows written without signals and tombstone rows that are gone."
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        written = sync.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Wrote {written} change-log entries in {time.monotonic() - started:.1f}s."
+            )
+        )
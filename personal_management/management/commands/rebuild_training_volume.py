@@ -0,0 +1,35 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from personal_management import models, training_volume
+
+
+class Command(BaseCommand):
+    help = "Rebuild the weekly muscle volume rollup from planned workout sessions."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--owner",
+            help="Only rebuild the rollup for this username.",
+        )
+
+    def handle(self, *args, **options):
+        owner_id = None
+        if options["owner"]:
+            try:
+                owner_id = get_user_model().objects.get(username=options["owner"]).pk
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"User {options['owner']!r} does not exist.") from None
+
+        started = time.monotonic()
+        training_volume.rebuild(owner_id)
+        rows = models.WeeklyMuscleVolume.objects.all()
+        if owner_id is not None:
+            rows = rows.filter(owner_id=owner_id)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt {rows.count()} weekly volume rows in {time.monotonic() - started:.1f}s."
+            )
+        )
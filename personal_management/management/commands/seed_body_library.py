@@ -101,7 +101,7 @@ class Command(BaseCommand):
                 secondary_muscles=secondary,
                 description=(
                     f"{name} is a programmed movement designed to build capacity in the "
-                    f"{primary.lower()} while reinforcing sound mechanics."
+                    f"{', '.join(primary).lower()} while reinforcing sound mechanics."
                 ),
                 coaching_cues=cues,
                 image_url=f"https://picsum.photos/seed/exercise-{index}/640/480",
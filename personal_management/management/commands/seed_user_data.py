@@ -0,0 +1,479 @@
+import multiprocessing
+import random
+import time
+from dataclasses import asdict, dataclass
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.utils import timezone
+
+from personal_management import models
+
+
+User = get_user_model()
+
+AREA_TEMPLATES = [
+    ("Body", "#22c55e"),
+    ("Productivity", "#4f46e5"),
+    ("Money", "#eab308"),
+    ("Relationships", "#ec4899"),
+    ("Mind & Emotions", "#06b6d4"),
+    ("Work", "#f97316"),
+    ("Legacy & Fun", "#a855f7"),
+    ("Second Brain", "#64748b"),
+]
+
+HABIT_NAMES = [
+    "Morning mobility",
+    "Read 20 pages",
+    "Journal",
+    "Meditate",
+    "Walk 8k steps",
+    "Inbox zero",
+    "Deep work block",
+    "Call a friend",
+    "Track spending",
+    "Stretch before bed",
+]
+
+TASK_VERBS = ["Draft", "Review", "Plan", "Call", "Ship", "Outline", "Book", "Refactor", "Pay", "Clean"]
+TASK_OBJECTS = ["proposal", "budget", "workout block", "weekly review", "invoice", "roadmap", "dentist", "notes"]
+
+WORKOUT_FOCUSES = [
+    "Lower Body Strength",
+    "Upper Body Push",
+    "Upper Body Pull",
+    "Mobility Reset",
+    "Conditioning Intervals",
+    "Core Stability",
+]
+
+
+@dataclass
+class SeedProfile:
+    """Per-user volume distribution used to generate a synthetic account."""
+
+    areas: int = 4
+    goals_per_area: int = 2
+    milestones_per_goal: int = 3
+    habits_per_area: int = 2
+    checkin_days: int = 90
+    checkin_rate: float = 0.7
+    tasks: int = 200
+    reflections: int = 40
+    pomodoro_sessions: int = 60
+    workouts: int = 30
+    exercises_per_workout: int = 5
+
+
+class Command(BaseCommand):
+    help = (
+        "Populate per-user life-management data (areas, goals, habits, check-ins, tasks, "
+        "reflections, pomodoro history and workout sessions) for load testing."
+    )
+
+    def add_arguments(self, parser):
+        defaults = SeedProfile()
+        parser.add_argument(
+            "--users",
+            type=int,
+            default=100,
+            help="Number of synthetic users to create (default: 100).",
+        )
+        parser.add_argument(
+            "--power-users",
+            type=int,
+            default=0,
+            help="How many of those users get the power-user profile (default: 0).",
+        )
+        parser.add_argument(
+            "--prefix",
+            default="seed_user_",
+            help="Username prefix for generated accounts (default: seed_user_).",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=max(1, (multiprocessing.cpu_count() or 2) - 1),
+            help="Worker processes used to build users in parallel (default: CPU count - 1).",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=50,
+            help="Users handled per worker task and transaction (default: 50).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Rows per bulk INSERT statement (default: 5000).",
+        )
+        parser.add_argument("--seed", type=int, default=None, help="Random seed for reproducible datasets.")
+        parser.add_argument(
+            "--overwrite",
+            action="store_true",
+            help="If provided, existing users matching the prefix are deleted before seeding.",
+        )
+        parser.add_argument("--areas", type=int, default=defaults.areas)
+        parser.add_argument("--goals-per-area", type=int, default=defaults.goals_per_area)
+        parser.add_argument("--milestones-per-goal", type=int, default=defaults.milestones_per_goal)
+        parser.add_argument("--habits-per-area", type=int, default=defaults.habits_per_area)
+        parser.add_argument(
+            "--checkin-days",
+            type=int,
+            default=defaults.checkin_days,
+            help="Days of habit check-in history per user (default: %(default)s).",
+        )
+        parser.add_argument(
+            "--checkin-rate",
+            type=float,
+            default=defaults.checkin_rate,
+            help="Probability a habit is checked in on any given day (default: %(default)s).",
+        )
+        parser.add_argument("--tasks", type=int, default=defaults.tasks)
+        parser.add_argument("--reflections", type=int, default=defaults.reflections)
+        parser.add_argument("--pomodoro-sessions", type=int, default=defaults.pomodoro_sessions)
+        parser.add_argument("--workouts", type=int, default=defaults.workouts)
+        parser.add_argument("--exercises-per-workout", type=int, default=defaults.exercises_per_workout)
+        parser.add_argument(
+            "--power-checkin-days",
+            type=int,
+            default=5 * 365,
+            help="Check-in history for power users (default: 5 years).",
+        )
+        parser.add_argument(
+            "--power-tasks",
+            type=int,
+            default=10000,
+            help="Tasks per power user (default: 10000).",
+        )
+
+    def handle(self, *args, **options):
+        users: int = options["users"]
+        power_users: int = min(options["power_users"], users)
+        prefix: str = options["prefix"]
+        workers: int = max(1, options["workers"])
+        chunk_size: int = max(1, options["chunk_size"])
+
+        if users < 1:
+            raise CommandError("--users must be at least 1.")
+        if not 0 <= options["checkin_rate"] <= 1:
+            raise CommandError("--checkin-rate must be between 0 and 1.")
+
+        profile = SeedProfile(
+            areas=min(options["areas"], len(AREA_TEMPLATES)),
+            goals_per_area=options["goals_per_area"],
+            milestones_per_goal=options["milestones_per_goal"],
+            habits_per_area=min(options["habits_per_area"], len(HABIT_NAMES)),
+            checkin_days=options["checkin_days"],
+            checkin_rate=options["checkin_rate"],
+            tasks=options["tasks"],
+            reflections=options["reflections"],
+            pomodoro_sessions=options["pomodoro_sessions"],
+            workouts=options["workouts"],
+            exercises_per_workout=options["exercises_per_workout"],
+        )
+        power_profile = SeedProfile(
+            **{
+                **asdict(profile),
+                "checkin_days": options["power_checkin_days"],
+                "tasks": options["power_tasks"],
+                "reflections": profile.reflections * 5,
+                "pomodoro_sessions": profile.pomodoro_sessions * 10,
+                "workouts": profile.workouts * 10,
+            }
+        )
+
+        if options["overwrite"]:
+            self.stdout.write(f"Removing previously generated users starting with '{prefix}'…")
+            User.objects.filter(username__startswith=prefix).delete()
+
+        exercise_ids = list(models.Exercise.objects.values_list("id", flat=True))
+        if profile.workouts and not exercise_ids:
+            self.stdout.write(
+                self.style.WARNING(
+                    "Exercise library is empty; workout sessions will be created without exercises. "
+                    "Run seed_body_library first for complete sessions."
+                )
+            )
+
+        base_seed = options["seed"] if options["seed"] is not None else random.randrange(1 << 30)
+        jobs = []
+        for start in range(0, users, chunk_size):
+            indices = range(start + 1, min(start + chunk_size, users) + 1)
+            jobs.append(
+                {
+                    "prefix": prefix,
+                    "indices": [(index, index <= power_users) for index in indices],
+                    "profile": asdict(profile),
+                    "power_profile": asdict(power_profile),
+                    "exercise_ids": exercise_ids,
+                    "batch_size": options["batch_size"],
+                    "seed": base_seed + start,
+                }
+            )
+
+        self.stdout.write(
+            f"Seeding {users} users ({power_users} power users) in {len(jobs)} chunks "
+            f"across {workers} worker(s)…"
+        )
+        started = time.monotonic()
+        totals: dict[str, int] = {}
+        for chunk_totals in self._run_jobs(jobs, workers):
+            for key, value in chunk_totals.items():
+                totals[key] = totals.get(key, 0) + value
+            self.stdout.write(f"  Created {totals.get('users', 0)} users…")
+
+        elapsed = time.monotonic() - started
+        for key, value in totals.items():
+            self.stdout.write(f"  {key}: {value}")
+        self.stdout.write(self.style.SUCCESS(f"User data seeding complete in {elapsed:.1f}s."))
+
+    def _run_jobs(self, jobs, workers):
+        if workers == 1 or len(jobs) == 1 or "fork" not in multiprocessing.get_all_start_methods():
+            for job in jobs:
+                yield _seed_chunk(job)
+            return
+
+        # Forked workers must not share the parent's database socket.
+        connections.close_all()
+        context = multiprocessing.get_context("fork")
+        with context.Pool(processes=workers, initializer=connections.close_all) as pool:
+            yield from pool.imap_unordered(_seed_chunk, jobs)
+
+
+def _seed_chunk(job: dict) -> dict[str, int]:
+    """Build every user in ``job`` inside a single transaction with batched inserts."""
+
+    rng = random.Random(job["seed"])
+    batch_size = job["batch_size"]
+    prefix = job["prefix"]
+    profiles = {False: SeedProfile(**job["profile"]), True: SeedProfile(**job["power_profile"])}
+    now = timezone.now()
+    today = timezone.localdate()
+    totals: dict[str, int] = {}
+
+    def insert(model, objs):
+        if objs:
+            model.objects.bulk_create(objs, batch_size=batch_size)
+            key = str(model._meta.verbose_name_plural)
+            totals[key] = totals.get(key, 0) + len(objs)
+        return objs
+
+    usernames = {f"{prefix}{index:06d}": is_power for index, is_power in job["indices"]}
+    with transaction.atomic():
+        existing = set(
+            User.objects.filter(username__in=usernames).values_list("username", flat=True)
+        )
+        password = make_password(None)
+        users = insert(
+            User,
+            [
+                User(username=username, email=f"{username}@example.com", password=password)
+                for username in usernames
+                if username not in existing
+            ],
+        )
+        user_profiles = {user.pk: profiles[usernames[user.username]] for user in users}
+
+        areas = insert(
+            models.AreaOfLife,
+            [
+                models.AreaOfLife(owner=user, name=name, color=color)
+                for user in users
+                for name, color in AREA_TEMPLATES[: user_profiles[user.pk].areas]
+            ],
+        )
+
+        goals = insert(
+            models.Goal,
+            [
+                models.Goal(
+                    area=area,
+                    title=f"{area.name} goal {number}",
+                    start_date=today - timedelta(days=rng.randint(0, 365)),
+                    target_date=today + timedelta(days=rng.randint(14, 365)),
+                    success_criteria="Measurable progress logged every week.",
+                )
+                for area in areas
+                for number in range(1, user_profiles[area.owner_id].goals_per_area + 1)
+            ],
+        )
+
+        insert(
+            models.Milestone,
+            [
+                models.Milestone(
+                    goal=goal,
+                    title=f"Milestone {number}",
+                    due_date=goal.start_date + timedelta(days=30 * number),
+                    done=rng.random() < 0.4,
+                )
+                for goal in goals
+                for number in range(1, user_profiles[goal.area.owner_id].milestones_per_goal + 1)
+            ],
+        )
+
+        habits = insert(
+            models.Habit,
+            [
+                models.Habit(area=area, name=name, frequency=models.Habit.DAILY, active=rng.random() < 0.85)
+                for area in areas
+                for name in rng.sample(HABIT_NAMES, k=user_profiles[area.owner_id].habits_per_area)
+            ],
+        )
+
+        checkins: list[models.HabitCheckIn] = []
+        for habit in habits:
+            profile = user_profiles[habit.area.owner_id]
+            for offset in range(profile.checkin_days):
+                if rng.random() >= profile.checkin_rate:
+                    continue
+                checkins.append(
+                    models.HabitCheckIn(
+                        habit=habit,
+                        timestamp=now - timedelta(days=offset, minutes=rng.randint(0, 720)),
+                    )
+                )
+            if len(checkins) >= batch_size:
+                insert(models.HabitCheckIn, checkins)
+                checkins = []
+        insert(models.HabitCheckIn, checkins)
+
+        goals_by_owner: dict[int, list[models.Goal]] = {}
+        for goal in goals:
+            goals_by_owner.setdefault(goal.area.owner_id, []).append(goal)
+
+        for user in users:
+            profile = user_profiles[user.pk]
+            owner_goals = goals_by_owner.get(user.pk, [])
+            tasks: list[models.Task] = []
+            for number in range(profile.tasks):
+                offset = rng.randint(-profile.checkin_days, 30)
+                tasks.append(
+                    models.Task(
+                        owner=user,
+                        goal=rng.choice(owner_goals) if owner_goals and rng.random() < 0.5 else None,
+                        title=f"{rng.choice(TASK_VERBS)} {rng.choice(TASK_OBJECTS)} #{number + 1}",
+                        due_date=today + timedelta(days=offset) if rng.random() < 0.9 else None,
+                        completed=offset < 0 and rng.random() < 0.8,
+                    )
+                )
+                if len(tasks) >= batch_size:
+                    insert(models.Task, tasks)
+                    tasks = []
+            insert(models.Task, tasks)
+
+        reflections = insert(
+            models.Reflection,
+            [
+                models.Reflection(
+                    owner=user,
+                    cadence=rng.choice(
+                        [models.Reflection.DAILY, models.Reflection.WEEKLY, models.Reflection.MONTHLY]
+                    ),
+                    highlights="Kept the morning routine and finished the deep work block.",
+                    lessons="Energy drops after lunch; schedule admin work there.",
+                    next_steps="Protect two focus sessions before noon.",
+                )
+                for user in users
+                for _ in range(user_profiles[user.pk].reflections)
+            ],
+        )
+        # ``created_at`` is auto_now_add, so spread the history after the insert.
+        for reflection in reflections:
+            profile = user_profiles[reflection.owner_id]
+            reflection.created_at = now - timedelta(days=rng.randint(0, max(profile.checkin_days, 1)))
+        models.Reflection.objects.bulk_update(reflections, ["created_at"], batch_size=batch_size)
+
+        pomodoro_profiles = insert(
+            models.PomodoroProfile,
+            [models.PomodoroProfile(user=user) for user in users],
+        )
+        sessions: list[models.PomodoroSession] = []
+        trees: list[models.PomodoroTree] = []
+        for pomodoro_profile in pomodoro_profiles:
+            profile = user_profiles[pomodoro_profile.user_id]
+            completed_minutes = 0
+            completed_sessions = 0
+            for _ in range(profile.pomodoro_sessions):
+                focus = rng.choice([25, 25, 35, 50, 90])
+                completed = rng.random() < 0.8
+                tree_type = pomodoro_profile._tree_for_minutes(focus) if completed else ""
+                sessions.append(
+                    models.PomodoroSession(
+                        profile=pomodoro_profile,
+                        focus_minutes=focus,
+                        status=(
+                            models.PomodoroSession.COMPLETED
+                            if completed
+                            else models.PomodoroSession.CANCELLED
+                        ),
+                        started_at=now - timedelta(days=rng.randint(0, max(profile.checkin_days, 1))),
+                        completed_focus_minutes=focus if completed else 0,
+                        tree_type=tree_type,
+                    )
+                )
+                if completed:
+                    completed_minutes += focus
+                    completed_sessions += 1
+                    trees.append(
+                        models.PomodoroTree(profile=pomodoro_profile, tree_type=tree_type, focus_minutes=focus)
+                    )
+            pomodoro_profile.total_focus_minutes = completed_minutes
+            pomodoro_profile.total_sessions = completed_sessions
+            pomodoro_profile.xp = completed_minutes * models.PomodoroProfile.XP_PER_MINUTE
+            pomodoro_profile.level = pomodoro_profile.xp // models.PomodoroProfile.XP_PER_LEVEL + 1
+            pomodoro_profile.coins = completed_minutes // 5
+            if len(sessions) >= batch_size:
+                insert(models.PomodoroSession, sessions)
+                insert(models.PomodoroTree, trees)
+                sessions, trees = [], []
+        insert(models.PomodoroSession, sessions)
+        insert(models.PomodoroTree, trees)
+        models.PomodoroProfile.objects.bulk_update(
+            pomodoro_profiles,
+            ["total_focus_minutes", "total_sessions", "xp", "level", "coins"],
+            batch_size=batch_size,
+        )
+
+        workouts: list[models.WorkoutSession] = []
+        for user in users:
+            profile = user_profiles[user.pk]
+            for number in range(profile.workouts):
+                focus = rng.choice(WORKOUT_FOCUSES)
+                workouts.append(
+                    models.WorkoutSession(
+                        owner=user,
+                        title=f"{focus} #{number + 1}",
+                        focus=focus,
+                        scheduled_for=today + timedelta(days=rng.randint(-profile.checkin_days, 14)),
+                    )
+                )
+        insert(models.WorkoutSession, workouts)
+        exercise_ids = job["exercise_ids"]
+        session_exercises: list[models.SessionExercise] = []
+        if exercise_ids:
+            for workout in workouts:
+                count = min(user_profiles[workout.owner_id].exercises_per_workout, len(exercise_ids))
+                for order, exercise_id in enumerate(rng.sample(exercise_ids, k=count), start=1):
+                    session_exercises.append(
+                        models.SessionExercise(
+                            session=workout,
+                            exercise_id=exercise_id,
+                            order=order,
+                            sets=rng.randint(2, 5),
+                            reps=rng.choice(["5", "8", "8-10", "10", "12", "45s"]),
+                            rest_seconds=rng.choice([60, 90, 120]),
+                        )
+                    )
+                if len(session_exercises) >= batch_size:
+                    insert(models.SessionExercise, session_exercises)
+                    session_exercises = []
+        insert(models.SessionExercise, session_exercises)
+
+    return totals
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from personal_management import template_warmup
+
+
+class Command(BaseCommand):
+    help = "Compile every dashboard microapp template and the templates they include, reporting compile times."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "templates",
+            nargs="*",
+            help="Template names to warm instead of the dashboard microapp templates.",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        results = template_warmup.warm(options["templates"] or None)
+        for result in results:
+            line = f"{result.seconds * 1000:8.2f} ms  {result.name}"
+            self.stdout.write(self.style.ERROR(f"{line}  {result.error}") if result.error else line)
+
+        failed = [result for result in results if result.error]
+        if failed:
+            raise CommandError(f"{len(failed)} of {len(results)} templates failed to compile.")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Compiled {len(results)} templates in {(time.perf_counter() - started) * 1000:.1f} ms."
+            )
+        )
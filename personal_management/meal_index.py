@@ -0,0 +1,267 @@
+"""In-process macro vector index over the meal library.
+
+Every meal with a full macro breakdown (calories, protein, carbohydrates, fats per
+serving) is stored as a column of a ``float32`` matrix, next to its category id and
+prep time. Macros are divided by the library-wide standard deviation of each
+column, so one gram of fat and one kcal do not dominate each other, and nearest
+neighbours become a single matrix-vector product over the whole library.
+
+Like :mod:`personal_management.exercise_index`, saves and deletes in this
+process patch the arrays in place and a change of the shared library version
+made elsewhere triggers a full reload.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Iterable
+
+import numpy as np
+
+from . import models
+from .library_cache import get_library_version
+
+MACROS = ("calories", "protein", "carbohydrates", "fats")
+REMOVED = -1
+UNKNOWN_PREP = -1
+
+
+def _macros(values: Iterable) -> tuple[float, ...] | None:
+    values = tuple(values)
+    if any(value is None for value in values):
+        return None
+    return tuple(float(value) for value in values)
+
+
+class MealIndex:
+    """Columnar snapshot of the meal library keyed by position."""
+
+    def __init__(self, rows: Iterable[tuple] = (), *, version: int | None = None):
+        ids: list[int] = []
+        names: list[str] = []
+        categories: list[int] = []
+        prep: list[int] = []
+        macros: list[tuple[float, ...]] = []
+        for meal_id, name, category_id, prep_time, *values in rows:
+            values = _macros(values)
+            if values is None:
+                continue
+            ids.append(meal_id)
+            names.append(name)
+            categories.append(category_id)
+            prep.append(UNKNOWN_PREP if prep_time is None else prep_time)
+            macros.append(values)
+
+        size = len(ids)
+        capacity = max(16, size)
+        self.ids = np.zeros(capacity, dtype=np.int64)
+        self.category = np.full(capacity, REMOVED, dtype=np.int32)
+        self.prep = np.full(capacity, UNKNOWN_PREP, dtype=np.int32)
+        # One contiguous row per macro: a (4, n) matrix turns the distance
+        # computation into a single long matrix-vector product.
+        self.macros = np.zeros((len(MACROS), capacity), dtype=np.float32)
+        self.ids[:size] = ids
+        self.category[:size] = categories
+        self.prep[:size] = prep
+        if size:
+            self.macros[:, :size] = np.asarray(macros, dtype=np.float32).T
+        # Scales are fixed at load time; incremental updates reuse them so stored
+        # vectors never need rescaling.
+        scale = self.macros[:, :size].std(axis=1) if size > 1 else np.ones(len(MACROS))
+        self.scale = np.where(scale > 1e-6, scale, 1.0).astype(np.float32)
+        self.vectors = self.macros / self.scale[:, None]
+        self.norms = np.einsum("ij,ij->j", self.vectors, self.vectors)
+        self.max_category = max(categories, default=0)
+        self.names = names
+        self.positions = {meal_id: position for position, meal_id in enumerate(ids)}
+        self.size = size
+        self.version = version
+        self.lock = threading.RLock()
+
+    @classmethod
+    def load(cls) -> "MealIndex":
+        version = get_library_version()
+        rows = models.Meal.objects.order_by("id").values_list(
+            "id", "name", "category_id", "prep_time_minutes", *MACROS
+        )
+        return cls(rows.iterator(chunk_size=5000), version=version)
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.category[: self.size] != REMOVED))
+
+    def _append_slot(self, meal_id: int) -> int:
+        if self.size == len(self.ids):
+            capacity = len(self.ids) * 2
+            self.ids = np.resize(self.ids, capacity)
+            self.prep = np.resize(self.prep, capacity)
+            self.norms = np.resize(self.norms, capacity)
+            grown = np.full(capacity, REMOVED, dtype=np.int32)
+            grown[: self.size] = self.category[: self.size]
+            self.category = grown
+            for name in ("macros", "vectors"):
+                matrix = np.zeros((len(MACROS), capacity), dtype=np.float32)
+                matrix[:, : self.size] = getattr(self, name)[:, : self.size]
+                setattr(self, name, matrix)
+        position = self.size
+        self.size += 1
+        self.positions[meal_id] = position
+        self.names.append("")
+        return position
+
+    def upsert(self, meal: models.Meal) -> None:
+        values = _macros(getattr(meal, field_name) for field_name in MACROS)
+        with self.lock:
+            if values is None:
+                self.remove(meal.pk)
+                return
+            position = self.positions.get(meal.pk)
+            if position is None:
+                position = self._append_slot(meal.pk)
+            self.ids[position] = meal.pk
+            self.names[position] = meal.name
+            self.category[position] = meal.category_id
+            self.max_category = max(self.max_category, meal.category_id)
+            self.prep[position] = UNKNOWN_PREP if meal.prep_time_minutes is None else meal.prep_time_minutes
+            self.macros[:, position] = values
+            self.vectors[:, position] = self.macros[:, position] / self.scale
+            self.norms[position] = float(self.vectors[:, position] @ self.vectors[:, position])
+
+    def remove(self, meal_id: int) -> None:
+        with self.lock:
+            position = self.positions.pop(meal_id, None)
+            if position is not None:
+                self.category[position] = REMOVED
+
+    def eligible(
+        self,
+        *,
+        categories: Iterable[int] | None = None,
+        exclude_categories: Iterable[int] | None = None,
+        max_prep_time: int | None = None,
+    ) -> np.ndarray:
+        """Boolean mask over positions that pass the category and prep filters."""
+
+        categories = list(categories or ())
+        exclude_categories = list(exclude_categories or ())
+        category = self.category[: self.size]
+        if categories or exclude_categories:
+            # Lookup table indexed by category id; REMOVED (-1) lands on the
+            # trailing slot, which is always False. Ids no meal has match nothing.
+            size = self.max_category + 2
+            allowed = np.zeros(size, dtype=bool) if categories else np.ones(size, dtype=bool)
+            allowed[[value for value in categories if 0 <= value <= self.max_category]] = True
+            allowed[[value for value in exclude_categories if 0 <= value <= self.max_category]] = False
+            allowed[-1] = False
+            live = allowed[category]
+        else:
+            live = category != REMOVED
+        if max_prep_time is not None:
+            prep = self.prep[: self.size]
+            live &= (prep != UNKNOWN_PREP) & (prep <= max_prep_time)
+        return live
+
+    def nearest(
+        self,
+        macros: Iterable[float],
+        *,
+        limit: int = 10,
+        exclude_id: int | None = None,
+        **filters,
+    ) -> list[dict]:
+        """Return the ``limit`` meals closest to a ``(calories, protein, carbs, fats)`` vector."""
+
+        query = np.asarray(tuple(macros), dtype=np.float32) / self.scale
+        with self.lock:
+            live = self.eligible(**filters)
+            if exclude_id is not None and exclude_id in self.positions:
+                live[self.positions[exclude_id]] = False
+            # ||x - q||² = ||x||² - 2·x·q + ||q||²; the last term does not change the ranking.
+            distances = query @ self.vectors[:, : self.size]
+            distances *= -2
+            distances += self.norms[: self.size]
+            candidates = self._nearest_positions(distances, live, limit)
+            offset = float(query @ query)
+            return self._results(candidates, np.sqrt(np.maximum(distances[candidates] + offset, 0)))
+
+    @staticmethod
+    def _nearest_positions(distances: np.ndarray, live: np.ndarray, limit: int) -> np.ndarray:
+        # The limit-th smallest distance in a strided sample bounds the true
+        # limit-th smallest from above, so thresholding on it keeps every winner
+        # while leaving only a few hundred candidates to sort.
+        stride = max(1, len(distances) // (limit * 1024))
+        sample = distances[::stride][live[::stride]]
+        if len(sample) >= limit and stride > 1:
+            threshold = np.partition(sample, limit - 1)[limit - 1]
+            candidates = np.flatnonzero((distances <= threshold) & live)
+        else:
+            candidates = np.flatnonzero(live)
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(distances[candidates], limit - 1)[:limit]]
+        return candidates[np.argsort(distances[candidates], kind="stable")]
+
+    def similar(self, meal_id: int, *, limit: int = 10, **filters) -> list[dict]:
+        with self.lock:
+            position = self.positions.get(meal_id)
+            if position is None:
+                return []
+            macros = self.macros[:, position].copy()
+        return self.nearest(macros, limit=limit, exclude_id=meal_id, **filters)
+
+    def _results(self, positions: np.ndarray, distances: np.ndarray) -> list[dict]:
+        results = []
+        for position, distance in zip(positions.tolist(), distances.tolist()):
+            calories, protein, carbohydrates, fats = self.macros[:, position].tolist()
+            prep = int(self.prep[position])
+            results.append(
+                {
+                    "id": int(self.ids[position]),
+                    "name": self.names[position],
+                    "category": int(self.category[position]),
+                    "calories": round(calories, 2),
+                    "protein": round(protein, 2),
+                    "carbohydrates": round(carbohydrates, 2),
+                    "fats": round(fats, 2),
+                    "prep_time_minutes": None if prep == UNKNOWN_PREP else prep,
+                    "distance": round(distance, 4),
+                }
+            )
+        return results
+
+
+_index: MealIndex | None = None
+_index_lock = threading.Lock()
+
+
+def get_meal_index() -> MealIndex:
+    """Return the process-wide index, reloading it if the library changed elsewhere."""
+
+    global _index
+    version = get_library_version()
+    index = _index
+    if index is None or index.version != version:
+        with _index_lock:
+            if _index is None or _index.version != version:
+                _index = MealIndex.load()
+            index = _index
+    return index
+
+
+def library_changed(instance, *, deleted: bool, previous_version: int, version: int) -> None:
+    """Keep the loaded index current across a local library write.
+
+    Meal writes are patched in place; writes to other library models only carry
+    the version forward. A stale index is left alone so the next lookup reloads it.
+    """
+
+    index = _index
+    if index is None:
+        return
+    with index.lock:
+        if index.version != previous_version:
+            return
+        if isinstance(instance, models.Meal):
+            if deleted:
+                index.remove(instance.pk)
+            else:
+                index.upsert(instance)
+        index.version = version
@@ -0,0 +1,217 @@
+"""Daily meal plans that land close to calorie and macro targets.
+
+Plans are searched over the macro columns of the in-process meal index, so no
+query touches the Meal table. Each macro is divided by its daily target (and
+weighted), which makes "how far is this day from the targets" a squared
+Euclidean distance. Picking the best meal for one slot while the others stay
+fixed is then a nearest-neighbour lookup of ``targets - others``. A day starts
+from a greedy pass and is improved slot by slot until no swap helps.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from dataclasses import asdict, dataclass, replace
+from datetime import date, timedelta
+from typing import Iterable
+
+import numpy as np
+
+from .library_cache import cached_library_value
+from .meal_index import MACROS, UNKNOWN_PREP, MealIndex, get_meal_index
+
+# Protein misses weigh a little more than the energy macros.
+MACRO_WEIGHTS = np.array([1.0, 1.5, 1.0, 1.0], dtype=np.float32)
+# Larger libraries are sampled down to this many eligible meals per plan.
+MAX_POOL = 20000
+MAX_ROUNDS = 4
+# The greedy start draws from the best few meals so consecutive days differ.
+START_CHOICES = 5
+
+
+@dataclass(frozen=True)
+class MacroTargets:
+    calories: float = 2200
+    protein: float = 150
+    carbohydrates: float = 230
+    fats: float = 70
+
+    def as_array(self) -> np.ndarray:
+        return np.array([getattr(self, name) for name in MACROS], dtype=np.float32)
+
+
+DEFAULT_TARGETS = MacroTargets()
+
+
+def training_day_targets(targets: MacroTargets) -> MacroTargets:
+    """Extra energy on training days, mostly as carbohydrates."""
+
+    return replace(targets, calories=targets.calories * 1.1, carbohydrates=targets.carbohydrates * 1.2)
+
+
+def plan_seed(owner_id: int, start: date) -> int:
+    """Stable seed so a user's week does not reshuffle on every request."""
+
+    digest = hashlib.blake2b(f"{owner_id}:{start.isoformat()}".encode(), digest_size=4).digest()
+    return int.from_bytes(digest, "big")
+
+
+class _Pool:
+    """Eligible meals copied out of the index, with macros scaled per target."""
+
+    def __init__(
+        self,
+        index: MealIndex,
+        *,
+        categories: Iterable[int] | None,
+        max_prep_time: int | None,
+        rng: np.random.Generator,
+    ):
+        with index.lock:
+            positions = np.flatnonzero(
+                index.eligible(categories=categories, max_prep_time=max_prep_time)
+            )
+            if len(positions) > MAX_POOL:
+                positions = np.sort(rng.choice(positions, MAX_POOL, replace=False))
+            self.ids = index.ids[positions]
+            self.category = index.category[positions]
+            self.prep = index.prep[positions]
+            self.macros = index.macros[:, positions]
+            self.names = [index.names[position] for position in positions.tolist()]
+        self.used = np.zeros(len(positions), dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def meal(self, position: int) -> dict:
+        calories, protein, carbohydrates, fats = self.macros[:, position].tolist()
+        prep = int(self.prep[position])
+        return {
+            "id": int(self.ids[position]),
+            "name": self.names[position],
+            "category": int(self.category[position]),
+            "calories": round(calories, 2),
+            "protein": round(protein, 2),
+            "carbohydrates": round(carbohydrates, 2),
+            "fats": round(fats, 2),
+            "prep_time_minutes": None if prep == UNKNOWN_PREP else prep,
+        }
+
+
+def _plan_day(pool: _Pool, targets: MacroTargets, meal_count: int, rng: np.random.Generator) -> list[int]:
+    weights = np.sqrt(MACRO_WEIGHTS)
+    scaled = pool.macros * (weights / targets.as_array())[:, None]
+    norms = np.einsum("ij,ij->j", scaled, scaled)
+    goal = weights
+    available = ~pool.used
+    meal_count = min(meal_count, int(np.count_nonzero(available)))
+
+    def closest(query: np.ndarray, blocked: list[int], choices: int = 1) -> int:
+        # ||x - q||² up to the constant ||q||²; blocked meals are pushed to +inf.
+        distances = norms - 2 * (query @ scaled)
+        distances[~available] = np.inf
+        distances[blocked] = np.inf
+        if choices == 1:
+            return int(np.argmin(distances))
+        choices = min(choices, int(np.isfinite(distances).sum()))
+        best = np.argpartition(distances, choices - 1)[:choices]
+        return int(rng.choice(best))
+
+    chosen: list[int] = []
+    for slot in range(meal_count):
+        remaining = goal - scaled[:, chosen].sum(axis=1)
+        chosen.append(closest(remaining / (meal_count - slot), chosen, START_CHOICES))
+
+    for _ in range(MAX_ROUNDS):
+        changed = False
+        for slot in range(meal_count):
+            others = chosen[:slot] + chosen[slot + 1 :]
+            best = closest(goal - scaled[:, others].sum(axis=1), others)
+            if best != chosen[slot]:
+                chosen[slot] = best
+                changed = True
+        if not changed:
+            break
+    return chosen
+
+
+def plan_days(
+    days: Iterable[date],
+    *,
+    targets: MacroTargets = DEFAULT_TARGETS,
+    meal_count: int = 3,
+    categories: Iterable[int] | None = None,
+    max_prep_time: int | None = None,
+    training_days: Iterable[date] = (),
+    seed: int | None = None,
+    index: MealIndex | None = None,
+) -> list[dict]:
+    """Plan ``meal_count`` meals for each day, never repeating a meal across days."""
+
+    rng = np.random.default_rng(seed)
+    pool = _Pool(
+        index or get_meal_index(), categories=categories, max_prep_time=max_prep_time, rng=rng
+    )
+    training_days = set(training_days)
+    plan = []
+    for day in days:
+        training = day in training_days
+        day_targets = training_day_targets(targets) if training else targets
+        chosen = _plan_day(pool, day_targets, meal_count, rng) if len(pool) else []
+        pool.used[chosen] = True
+        totals = pool.macros[:, chosen].sum(axis=1) if chosen else np.zeros(len(MACROS))
+        goal = day_targets.as_array()
+        plan.append(
+            {
+                "date": day,
+                "training_day": training,
+                "targets": {name: round(float(value), 1) for name, value in asdict(day_targets).items()},
+                "meals": [pool.meal(position) for position in chosen],
+                "totals": {name: round(float(value), 1) for name, value in zip(MACROS, totals)},
+                "deviation": {
+                    name: round(float(value), 3) for name, value in zip(MACROS, totals / goal - 1)
+                },
+            }
+        )
+    return plan
+
+
+def _week(start: date) -> list[date]:
+    return [start + timedelta(days=offset) for offset in range(7)]
+
+
+def _training_days(owner, days: list[date]) -> list[date]:
+    return sorted(
+        set(
+            owner.workout_sessions.filter(
+                scheduled_for__gte=days[0], scheduled_for__lte=days[-1]
+            ).values_list("scheduled_for", flat=True)
+        )
+    )
+
+
+def plan_week(owner, start: date, **options) -> list[dict]:
+    """Plan seven days from ``start``, with training-day targets on session days."""
+
+    days = _week(start)
+    options.setdefault("seed", plan_seed(owner.pk, start))
+    return plan_days(days, training_days=_training_days(owner, days), **options)
+
+
+def planned_meal_ids(owner, day: date, *, start: date) -> list[int]:
+    """Ids of the meals ``plan_week(owner, start)`` puts on ``day``, with default options.
+
+    Cached per user, day and library version, so the meal index is only searched
+    (and loaded) on a miss. The week's training days are part of the key, so
+    scheduling a session plans the day again.
+    """
+
+    days = _week(start)
+    training_days = _training_days(owner, days)
+
+    def plan() -> list[int]:
+        week = plan_days(days, training_days=training_days, seed=plan_seed(owner.pk, start))
+        return [meal["id"] for meal in week[(day - start).days]["meals"]]
+
+    training_key = (training_day.isoformat() for training_day in training_days)
+    return cached_library_value("meal-plan", plan, owner.pk, day.isoformat(), *training_key)
@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("personal_management", "0006_pomodoro_models"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="workoutsession",
+            index=models.Index(fields=["owner", "scheduled_for"], name="pm_session_owner_sched_idx"),
+        ),
+    ]
@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+MUSCLE_CHOICES = [
+    ("Abdominals", "Abdominals"),
+    ("Obliques", "Obliques"),
+    ("Lower Back", "Lower Back"),
+    ("Upper Back", "Upper Back"),
+    ("Chest", "Chest"),
+    ("Shoulders", "Shoulders"),
+    ("Biceps", "Biceps"),
+    ("Triceps", "Triceps"),
+    ("Forearms", "Forearms"),
+    ("Quadriceps", "Quadriceps"),
+    ("Hamstrings", "Hamstrings"),
+    ("Glutes", "Glutes"),
+    ("Calves", "Calves"),
+    ("Hip Flexors", "Hip Flexors"),
+    ("Adductors", "Adductors"),
+    ("Rotator Cuff", "Rotator Cuff"),
+    ("Cardiovascular System", "Cardiovascular System"),
+    ("Neck", "Neck"),
+    ("Grip", "Grip"),
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("personal_management", "0007_workoutsession_owner_scheduled_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="WeeklyMuscleVolume",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("week_start", models.DateField(help_text="Monday of the ISO week.")),
+                ("muscle", models.CharField(choices=MUSCLE_CHOICES, max_length=32)),
+                ("primary_sets", models.PositiveIntegerField(default=0)),
+                ("secondary_sets", models.PositiveIntegerField(default=0)),
+                ("primary_reps", models.PositiveIntegerField(default=0)),
+                ("secondary_reps", models.PositiveIntegerField(default=0)),
+                (
+                    "owner",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="weekly_muscle_volume",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Weekly Muscle Volume",
+                "verbose_name_plural": "Weekly Muscle Volume",
+                "ordering": ["-week_start", "muscle"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("owner", "week_start", "muscle"), name="pm_volume_owner_week_muscle_uniq"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,54 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("personal_management", "0008_weeklymusclevolume"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Ingredient",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("name", models.CharField(max_length=120, unique=True)),
+            ],
+            options={
+                "ordering": ["name"],
+            },
+        ),
+        migrations.CreateModel(
+            name="MealIngredient",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("quantity", models.DecimalField(blank=True, decimal_places=2, max_digits=8, null=True)),
+                ("unit", models.CharField(blank=True, max_length=20)),
+                ("position", models.PositiveSmallIntegerField(default=1)),
+                (
+                    "ingredient",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="meal_links",
+                        to="personal_management.ingredient",
+                    ),
+                ),
+                (
+                    "meal",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="ingredient_links",
+                        to="personal_management.meal",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["position"],
+                "indexes": [models.Index(fields=["ingredient", "meal"], name="pm_ingredient_meal_idx")],
+                "constraints": [
+                    models.UniqueConstraint(fields=("meal", "ingredient"), name="pm_meal_ingredient_uniq")
+                ],
+            },
+        ),
+    ]
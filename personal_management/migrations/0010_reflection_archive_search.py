@@ -0,0 +1,41 @@
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("personal_management", "0009_meal_ingredients"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="reflection",
+            name="search_vector",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=(
+                    SearchVector("highlights", weight="A", config="english")
+                    + SearchVector("lessons", weight="B", config="english")
+                    + SearchVector("next_steps", weight="C", config="english")
+                ),
+                output_field=django.contrib.postgres.search.SearchVectorField(),
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="reflection",
+            index=models.Index(
+                fields=["owner", "cadence", "-created_at", "-id"], name="pm_reflection_archive_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="reflection",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="pm_reflection_search_idx"
+            ),
+        ),
+    ]
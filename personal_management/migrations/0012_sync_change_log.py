@@ -0,0 +1,49 @@
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("personal_management", "0011_calendarfeed"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            "CREATE SEQUENCE personal_management_syncchange_seq",
+            "DROP SEQUENCE personal_management_syncchange_seq",
+        ),
+        migrations.CreateModel(
+            name="SyncChange",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("model", models.CharField(max_length=32)),
+                ("object_id", models.BigIntegerField()),
+                (
+                    "seq",
+                    models.BigIntegerField(help_text="Position in the change log, drawn from a sequence."),
+                ),
+                ("deleted", models.BooleanField(default=False)),
+                ("changed_at", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "owner",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="sync_changes",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["seq"],
+                "indexes": [models.Index(fields=["owner", "seq"], name="pm_sync_change_owner_seq_idx")],
+                "constraints": [
+                    models.UniqueConstraint(fields=("model", "object_id"), name="pm_sync_change_object_uniq")
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("personal_management", "0012_sync_change_log"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            "CREATE SEQUENCE personal_management_slowquery_seq",
+            "DROP SEQUENCE personal_management_slowquery_seq",
+        ),
+        migrations.CreateModel(
+            name="SlowQuery",
+            fields=[
+                ("slot", models.PositiveIntegerField(primary_key=True, serialize=False)),
+                ("captured_at", models.DateTimeField(default=django.utils.timezone.now)),
+                ("duration_ms", models.FloatField()),
+                ("view", models.CharField(blank=True, max_length=255)),
+                ("template", models.CharField(blank=True, max_length=255)),
+                ("caller", models.CharField(blank=True, max_length=255)),
+                ("sql", models.TextField()),
+                ("params", models.TextField(blank=True)),
+                (
+                    "plan",
+                    models.JSONField(
+                        blank=True, help_text="EXPLAIN (ANALYZE, BUFFERS) output, when sampled.", null=True
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "slow queries",
+                "ordering": ["-captured_at"],
+            },
+        ),
+    ]
@@ -0,0 +1,60 @@
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Check-ins and sessions can hold millions of rows; build their indexes
+    # without locking out writes.
+    atomic = False
+
+    dependencies = [
+        ("personal_management", "0013_slow_query"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="habitcheckin",
+            index=models.Index(fields=["timestamp", "id"], name="pm_checkin_timestamp_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="habitcheckin",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.search.SearchVector("note", config="simple"),
+                name="pm_checkin_note_search_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="pomodorosession",
+            index=models.Index(fields=["started_at", "id"], name="pm_pomodoro_started_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="exercise",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.search.SearchVector("name", config="simple"),
+                name="pm_exercise_search_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="exercise",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["primary_muscles"], name="pm_exercise_primary_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="exercise",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["secondary_muscles"], name="pm_exercise_secondary_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="meal",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.search.SearchVector("name", config="simple")
+                + django.contrib.postgres.search.SearchVector("summary", config="simple")
+                + django.contrib.postgres.search.SearchVector("ingredients", config="simple"),
+                name="pm_meal_search_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,221 @@
+from datetime import date, timezone
+
+import django.db.models.deletion
+from django.db import migrations, models, transaction
+
+TABLE = "personal_management_habitcheckin"
+LEGACY = f"{TABLE}_legacy"
+MONTHS_AHEAD = 3
+# Built on the existing table before it is locked, then adopted by the partitioned one.
+LEGACY_KEY = "pm_checkin_legacy_key"
+LEGACY_HABIT_TIME = "pm_checkin_legacy_habit_time_idx"
+LEGACY_BOUND = "pm_checkin_legacy_bound"
+
+INDEXES = {
+    "pm_checkin_habit_time_idx": f'CREATE INDEX pm_checkin_habit_time_idx ON {TABLE} (habit_id, "timestamp")',
+    "pm_checkin_timestamp_idx": f'CREATE INDEX pm_checkin_timestamp_idx ON {TABLE} ("timestamp", id)',
+    "pm_checkin_note_search_idx": f"CREATE INDEX pm_checkin_note_search_idx ON {TABLE} "
+    "USING gin (to_tsvector('simple'::regconfig, (COALESCE(note, ''::character varying))::text))",
+}
+
+
+def _add_months(month, months):
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _bound(month):
+    return f"'{month.isoformat()} 00:00:00+00'"
+
+
+def _month(moment):
+    moment = moment.astimezone(timezone.utc)
+    return date(moment.year, moment.month, 1)
+
+
+def _fetch(cursor, sql, params=()):
+    cursor.execute(sql, params)
+    return cursor.fetchall()
+
+
+def partition_checkins(apps, schema_editor):
+    """Turn the check-in table into the first partition of a partitioned table.
+
+    Nothing is copied. The existing table becomes ``…_legacy``, the partition for
+    every timestamp before the first month that has no rows yet, and monthly
+    partitions start there. Its new indexes and the CHECK constraint that lets
+    ATTACH skip scanning it are built first without blocking writes; the
+    ACCESS EXCLUSIVE lock is then only held for catalog changes.
+    """
+
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        (newest, now), = _fetch(cursor, f'SELECT max("timestamp"), now() FROM {TABLE}')
+        first_month = _add_months(_month(max(newest or now, now)), 1)
+        last_month = _add_months(_month(now), MONTHS_AHEAD)
+
+        # The migration is not atomic, so each of these commits on its own.
+        for name in (LEGACY_KEY, LEGACY_HABIT_TIME):
+            cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+        cursor.execute(f'CREATE UNIQUE INDEX CONCURRENTLY {LEGACY_KEY} ON {TABLE} (id, "timestamp")')
+        cursor.execute(f'CREATE INDEX CONCURRENTLY {LEGACY_HABIT_TIME} ON {TABLE} (habit_id, "timestamp")')
+        cursor.execute(f"ALTER TABLE {TABLE} DROP CONSTRAINT IF EXISTS {LEGACY_BOUND}")
+        cursor.execute(
+            f'ALTER TABLE {TABLE} ADD CONSTRAINT {LEGACY_BOUND} CHECK ("timestamp" < {_bound(first_month)}) '
+            "NOT VALID"
+        )
+        cursor.execute(f"ALTER TABLE {TABLE} VALIDATE CONSTRAINT {LEGACY_BOUND}")
+
+        with transaction.atomic(using=schema_editor.connection.alias):
+            cursor.execute(f"LOCK TABLE {TABLE} IN ACCESS EXCLUSIVE MODE")
+            # Constraint and index names depend on the migration history; look them up.
+            (primary_key,), = _fetch(
+                cursor, "SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'p'", [TABLE]
+            )
+            foreign_keys = _fetch(
+                cursor,
+                "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+                "WHERE conrelid = %s::regclass AND contype = 'f'",
+                [TABLE],
+            )
+            habit_indexes = _fetch(
+                cursor,
+                "SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                "JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = i.indkey[0] "
+                "WHERE i.indrelid = %s::regclass AND i.indnatts = 1 AND i.indexprs IS NULL "
+                "AND NOT i.indisunique AND a.attname = 'habit_id'",
+                [TABLE],
+            )
+            (next_id,), = _fetch(cursor, f"SELECT COALESCE(max(id), 0) + 1 FROM {TABLE}")
+
+            cursor.execute(f"ALTER TABLE {TABLE} DROP CONSTRAINT {primary_key}")
+            cursor.execute(f"ALTER TABLE {TABLE} ADD CONSTRAINT {LEGACY}_pkey PRIMARY KEY USING INDEX {LEGACY_KEY}")
+            cursor.execute(f"ALTER TABLE {TABLE} ALTER COLUMN id DROP IDENTITY IF EXISTS")
+            cursor.execute(f"ALTER TABLE {TABLE} ALTER COLUMN id DROP DEFAULT")
+            # Covered by the (habit_id, timestamp) index.
+            for (name,) in habit_indexes:
+                cursor.execute(f"DROP INDEX {name}")
+            # Free the names the partitioned table's indexes take.
+            for name in INDEXES:
+                legacy_name = name.replace("pm_checkin_", "pm_checkin_legacy_")
+                cursor.execute(f"ALTER INDEX IF EXISTS {name} RENAME TO {legacy_name}")
+            cursor.execute(f"ALTER TABLE {TABLE} RENAME TO {LEGACY}")
+
+            # The primary key of a partitioned table has to include the partition
+            # key; ids still come from one sequence, so ``id`` alone stays unique.
+            cursor.execute(f"DROP SEQUENCE IF EXISTS {TABLE}_id_seq")
+            cursor.execute(f"CREATE SEQUENCE {TABLE}_id_seq START WITH {next_id}")
+            constraints = "".join(f", CONSTRAINT {name} {definition}" for name, definition in foreign_keys)
+            cursor.execute(
+                f"CREATE TABLE {TABLE} ("
+                f"id bigint NOT NULL DEFAULT nextval('{TABLE}_id_seq'), "
+                '"timestamp" timestamp with time zone NOT NULL, '
+                "note varchar(240) NOT NULL, "
+                "habit_id bigint NOT NULL, "
+                f'CONSTRAINT {TABLE}_pkey PRIMARY KEY (id, "timestamp"){constraints}'
+                ') PARTITION BY RANGE ("timestamp")'
+            )
+            cursor.execute(f"ALTER SEQUENCE {TABLE}_id_seq OWNED BY {TABLE}.id")
+            for statement in INDEXES.values():
+                cursor.execute(statement)
+            # The validated CHECK proves the bound, so this does not scan the table,
+            # and its matching indexes and foreign key are adopted, not rebuilt.
+            cursor.execute(
+                f"ALTER TABLE {TABLE} ATTACH PARTITION {LEGACY} FOR VALUES FROM (MINVALUE) TO ({_bound(first_month)})"
+            )
+            cursor.execute(f"ALTER TABLE {LEGACY} DROP CONSTRAINT {LEGACY_BOUND}")
+            cursor.execute(f"CREATE TABLE {TABLE}_default PARTITION OF {TABLE} DEFAULT")
+            month = first_month
+            while month <= last_month:
+                following = _add_months(month, 1)
+                cursor.execute(
+                    f"CREATE TABLE {TABLE}_y{month.year}m{month.month:02d} PARTITION OF {TABLE} "
+                    f"FOR VALUES FROM ({_bound(month)}) TO ({_bound(following)})"
+                )
+                month = following
+        cursor.execute(f"ANALYZE {TABLE}")
+
+
+def unpartition_checkins(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with transaction.atomic(using=schema_editor.connection.alias), schema_editor.connection.cursor() as cursor:
+        # Free the names the plain table takes, then copy every partition into it.
+        cursor.execute(f"ALTER TABLE {TABLE} RENAME TO {TABLE}_partitioned")
+        cursor.execute(f"ALTER TABLE {TABLE}_partitioned DROP CONSTRAINT {TABLE}_pkey")
+        cursor.execute(f"ALTER TABLE {TABLE}_partitioned ALTER COLUMN id DROP DEFAULT")
+        cursor.execute(f"DROP SEQUENCE {TABLE}_id_seq")
+        for name in INDEXES:
+            cursor.execute(f"DROP INDEX {name}")
+        schema_editor.create_model(apps.get_model("personal_management", "HabitCheckIn"))
+        cursor.execute(
+            f'INSERT INTO {TABLE} (id, "timestamp", note, habit_id) '
+            f'SELECT id, "timestamp", note, habit_id FROM {TABLE}_partitioned'
+        )
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence('{TABLE}', 'id'), COALESCE(max(id), 0) + 1, false) FROM {TABLE}"
+        )
+        cursor.execute(f"DROP TABLE {TABLE}_partitioned CASCADE")
+
+
+class Migration(migrations.Migration):
+    # The check-in table can hold millions of rows: its new indexes are built
+    # concurrently, outside the short transaction that partitions it.
+    atomic = False
+
+    dependencies = [
+        ("personal_management", "0014_admin_search_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="HabitCheckInRollup",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "period",
+                    models.CharField(
+                        choices=[("day", "Day"), ("week", "Week"), ("month", "Month")], max_length=8
+                    ),
+                ),
+                ("period_start", models.DateField()),
+                ("count", models.PositiveIntegerField()),
+                (
+                    "habit",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="checkin_rollups",
+                        to="personal_management.habit",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-period_start"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("habit", "period", "period_start"), name="pm_checkin_rollup_uniq"
+                    )
+                ],
+            },
+        ),
+        migrations.SeparateDatabaseAndState(
+            database_operations=[migrations.RunPython(partition_checkins, unpartition_checkins)],
+            state_operations=[
+                migrations.AlterField(
+                    model_name="habitcheckin",
+                    name="habit",
+                    field=models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="checkins",
+                        to="personal_management.habit",
+                    ),
+                ),
+                migrations.AddIndex(
+                    model_name="habitcheckin",
+                    index=models.Index(fields=["habit", "timestamp"], name="pm_checkin_habit_time_idx"),
+                ),
+            ],
+        ),
+    ]
@@ -4,11 +4,23 @@ from datetime import timedelta
 
 from django.contrib.auth import get_user_model
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
 from django.utils import timezone
 
 User = get_user_model()
 
+# Documents behind the admin's search boxes. Each has a GIN expression index
+# below, and a query only uses it when it repeats the expression exactly.
+CHECKIN_SEARCH_DOCUMENT = SearchVector("note", config="simple")
+EXERCISE_SEARCH_DOCUMENT = SearchVector("name", config="simple")
+MEAL_SEARCH_DOCUMENT = (
+    SearchVector("name", config="simple")
+    + SearchVector("summary", config="simple")
+    + SearchVector("ingredients", config="simple")
+)
+
 
 class AreaOfLife(models.Model):
     """High-level life domain used to group goals and habits."""
@@ -111,19 +123,59 @@ class Habit(models.Model):
 
 
 class HabitCheckIn(models.Model):
-    """Atomic record of a user completing a habit repetition."""
+    """Atomic record of a user completing a habit repetition.
+
+    Stored in monthly partitions on ``timestamp``; months older than the detail
+    window are compacted into ``HabitCheckInRollup`` (see ``checkin_partitions``).
+    """
 
-    habit = models.ForeignKey(Habit, on_delete=models.CASCADE, related_name="checkins")
+    # Covered by the (habit, timestamp) index below.
+    habit = models.ForeignKey(Habit, on_delete=models.CASCADE, related_name="checkins", db_index=False)
     timestamp = models.DateTimeField(default=timezone.now)
     note = models.CharField(max_length=240, blank=True)
 
     class Meta:
         ordering = ["-timestamp"]
+        indexes = [
+            models.Index(fields=["habit", "timestamp"], name="pm_checkin_habit_time_idx"),
+            models.Index(fields=["timestamp", "id"], name="pm_checkin_timestamp_idx"),
+            GinIndex(CHECKIN_SEARCH_DOCUMENT, name="pm_checkin_note_search_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.habit.name} @ {self.timestamp:%Y-%m-%d %H:%M}"
 
 
+class HabitCheckInRollup(models.Model):
+    """Check-in count for one habit and period, from months compacted out of ``HabitCheckIn``."""
+
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
+    PERIOD_CHOICES = [
+        (DAY, "Day"),
+        (WEEK, "Week"),
+        (MONTH, "Month"),
+    ]
+
+    habit = models.ForeignKey(Habit, on_delete=models.CASCADE, related_name="checkin_rollups")
+    period = models.CharField(max_length=8, choices=PERIOD_CHOICES)
+    period_start = models.DateField()
+    count = models.PositiveIntegerField()
+
+    class Meta:
+        ordering = ["-period_start"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["habit", "period", "period_start"], name="pm_checkin_rollup_uniq"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.habit.name}: {self.count} check-ins ({self.period} of {self.period_start:%Y-%m-%d})"
+
+
 class Task(models.Model):
     """Actionable item that can be tied to goals or tracked independently."""
 
@@ -162,9 +214,25 @@ class Reflection(models.Model):
     highlights = models.TextField(blank=True)
     lessons = models.TextField(blank=True)
     next_steps = models.TextField(blank=True)
+    # Computed by PostgreSQL on every write, so bulk inserts stay searchable too.
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector("highlights", weight="A", config="english")
+            + SearchVector("lessons", weight="B", config="english")
+            + SearchVector("next_steps", weight="C", config="english")
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["owner", "cadence", "-created_at", "-id"], name="pm_reflection_archive_idx"
+            ),
+            GinIndex(fields=["search_vector"], name="pm_reflection_search_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.owner} reflection ({self.created_at:%Y-%m-%d})"
@@ -266,6 +334,11 @@ class Exercise(models.Model):
     class Meta:
         ordering = ["name"]
         unique_together = ("name", "category", "equipment")
+        indexes = [
+            GinIndex(EXERCISE_SEARCH_DOCUMENT, name="pm_exercise_search_idx"),
+            GinIndex(fields=["primary_muscles"], name="pm_exercise_primary_idx"),
+            GinIndex(fields=["secondary_muscles"], name="pm_exercise_secondary_idx"),
+        ]
 
     def __str__(self) -> str:
         return self.name
@@ -338,11 +411,54 @@ class Meal(models.Model):
     class Meta:
         ordering = ["name"]
         unique_together = ("name", "category")
+        indexes = [
+            GinIndex(MEAL_SEARCH_DOCUMENT, name="pm_meal_search_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class Ingredient(models.Model):
+    """Normalized ingredient name shared by every meal that lists it."""
+
+    name = models.CharField(max_length=120, unique=True)
+
+    class Meta:
+        ordering = ["name"]
 
     def __str__(self) -> str:
         return self.name
 
 
+class MealIngredient(models.Model):
+    """One parsed line of ``Meal.ingredients``.
+
+    Rows are derived data, rebuilt from the meal text on save (see
+    ``personal_management.ingredients``), so they should not be edited directly.
+    """
+
+    meal = models.ForeignKey(Meal, on_delete=models.CASCADE, related_name="ingredient_links")
+    ingredient = models.ForeignKey(
+        Ingredient, on_delete=models.CASCADE, related_name="meal_links"
+    )
+    quantity = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True)
+    unit = models.CharField(max_length=20, blank=True)
+    position = models.PositiveSmallIntegerField(default=1)
+
+    class Meta:
+        ordering = ["position"]
+        constraints = [
+            models.UniqueConstraint(fields=["meal", "ingredient"], name="pm_meal_ingredient_uniq"),
+        ]
+        indexes = [
+            models.Index(fields=["ingredient", "meal"], name="pm_ingredient_meal_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.meal.name} · {self.ingredient.name}"
+
+
 class PomodoroProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="pomodoro_profile")
     total_focus_minutes = models.PositiveIntegerField(default=0)
@@ -447,6 +563,9 @@ class PomodoroSession(models.Model):
 
     class Meta:
         ordering = ["-started_at"]
+        indexes = [
+            models.Index(fields=["started_at", "id"], name="pm_pomodoro_started_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"Pomodoro session for {self.profile.user} ({self.status})"
@@ -498,6 +617,9 @@ class WorkoutSession(models.Model):
 
     class Meta:
         ordering = ["-scheduled_for", "-created_at"]
+        indexes = [
+            models.Index(fields=["owner", "scheduled_for"], name="pm_session_owner_sched_idx"),
+        ]
 
     def __str__(self) -> str:
         return self.title
@@ -527,3 +649,97 @@ class SessionExercise(models.Model):
 
     def __str__(self) -> str:
         return f"{self.session.title} · {self.exercise.name}"
+
+
+class WeeklyMuscleVolume(models.Model):
+    """Rollup of planned training volume per user, ISO week, and muscle group.
+
+    Maintained incrementally from SessionExercise and WorkoutSession writes (see
+    ``personal_management.training_volume``) so volume charts never rescan sessions.
+    """
+
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name="weekly_muscle_volume")
+    week_start = models.DateField(help_text="Monday of the ISO week.")
+    muscle = models.CharField(max_length=32, choices=Exercise.MUSCLE_GROUP_CHOICES)
+    primary_sets = models.PositiveIntegerField(default=0)
+    secondary_sets = models.PositiveIntegerField(default=0)
+    primary_reps = models.PositiveIntegerField(default=0)
+    secondary_reps = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["-week_start", "muscle"]
+        verbose_name = "Weekly Muscle Volume"
+        verbose_name_plural = "Weekly Muscle Volume"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["owner", "week_start", "muscle"], name="pm_volume_owner_week_muscle_uniq"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.owner} · {self.muscle} ({self.week_start:%Y-%m-%d})"
+
+
+class CalendarFeed(models.Model):
+    """Secret token that exposes a user's dated items as an iCalendar feed."""
+
+    owner = models.OneToOneField(User, on_delete=models.CASCADE, related_name="calendar_feed")
+    token = models.CharField(max_length=64, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Calendar Feed"
+
+    def __str__(self) -> str:
+        return f"Calendar feed for {self.owner}"
+
+
+class SyncChange(models.Model):
+    """Latest change to one synced object, read by the delta-sync API."""
+
+    owner = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="sync_changes",
+        # Tombstones for a user's rows are queued while the user itself is deleted.
+        db_constraint=False,
+    )
+    model = models.CharField(max_length=32)
+    object_id = models.BigIntegerField()
+    seq = models.BigIntegerField(help_text="Position in the change log, drawn from a sequence.")
+    deleted = models.BooleanField(default=False)
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["seq"]
+        constraints = [
+            models.UniqueConstraint(fields=["model", "object_id"], name="pm_sync_change_object_uniq"),
+        ]
+        indexes = [
+            models.Index(fields=["owner", "seq"], name="pm_sync_change_owner_seq_idx"),
+        ]
+
+    def __str__(self) -> str:
+        state = "deleted" if self.deleted else "changed"
+        return f"{self.model} {self.object_id} {state} (#{self.seq})"
+
+
+class SlowQuery(models.Model):
+    """A captured slow query; ``slot`` wraps around, so the table is a fixed-size ring buffer."""
+
+    slot = models.PositiveIntegerField(primary_key=True)
+    captured_at = models.DateTimeField(default=timezone.now)
+    duration_ms = models.FloatField()
+    view = models.CharField(max_length=255, blank=True)
+    template = models.CharField(max_length=255, blank=True)
+    caller = models.CharField(max_length=255, blank=True)
+    sql = models.TextField()
+    params = models.TextField(blank=True)
+    plan = models.JSONField(null=True, blank=True, help_text="EXPLAIN (ANALYZE, BUFFERS) output, when sampled.")
+
+    class Meta:
+        ordering = ["-captured_at"]
+        verbose_name_plural = "slow queries"
+
+    def __str__(self) -> str:
+        return f"{self.duration_ms:.0f} ms in {self.view or 'unknown view'}"
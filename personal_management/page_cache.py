@@ -0,0 +1,101 @@
+"""Full-page cache for pages that render the same HTML for every anonymous visitor.
+
+A request without a session or messages cookie cannot belong to a signed-in user,
+so its response is taken from the shared cache without running the view or
+rendering templates. A cached page that contains a login form keeps a
+placeholder where the CSRF token goes, and each visitor gets their own token
+filled in when the page is served. Keys include the static manifest hash, so a
+deploy that changes asset bundles never serves HTML pointing at stale files.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.utils.cache import add_never_cache_headers, patch_cache_control, patch_vary_headers
+
+PAGE_CACHE_TIMEOUT = 60 * 10
+# How long browsers and shared caches may reuse a public page without asking again.
+PUBLIC_MAX_AGE = 60 * 5
+
+CSRF_PLACEHOLDER = "\x00csrf-token\x00"
+_CSRF_INPUT = re.compile(r'(name="csrfmiddlewaretoken" value=")[^"]*(")')
+
+
+def is_anonymous(request) -> bool:
+    return not any(
+        name in request.COOKIES for name in (settings.SESSION_COOKIE_NAME, CookieStorage.cookie_name)
+    )
+
+
+def _cache_key(request) -> str:
+    digest = hashlib.sha256(f"{request.get_host()}|{request.get_full_path()}".encode()).hexdigest()
+    manifest = getattr(staticfiles_storage, "manifest_hash", "")
+    return f"page-cache:{manifest}:{digest[:32]}"
+
+
+def _cacheable(request, query_params: tuple[str, ...]) -> bool:
+    # Unknown query strings would let anyone fill the cache with variants.
+    return (
+        request.method in ("GET", "HEAD")
+        and is_anonymous(request)
+        and all(name in query_params for name in request.GET)
+    )
+
+
+def _patch_headers(response: HttpResponse, *, has_form: bool) -> HttpResponse:
+    patch_vary_headers(response, ("Cookie",))
+    if has_form:
+        # Each visitor's copy carries their own CSRF token.
+        add_never_cache_headers(response)
+        patch_cache_control(response, private=True)
+    else:
+        patch_cache_control(response, public=True, max_age=PUBLIC_MAX_AGE)
+    return response
+
+
+def anonymous_page_cache(view=None, *, timeout: int = PAGE_CACHE_TIMEOUT, query_params: tuple[str, ...] = ()):
+    """Serve anonymous GETs of ``view`` from the cache; usable with or without arguments."""
+
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if not _cacheable(request, query_params):
+                return view(request, *args, **kwargs)
+
+            key = _cache_key(request)
+            cached = cache.get(key)
+            if cached is not None:
+                content, content_type = cached
+                has_form = CSRF_PLACEHOLDER in content
+                if has_form:
+                    content = content.replace(CSRF_PLACEHOLDER, get_token(request))
+                return _patch_headers(HttpResponse(content, content_type=content_type), has_form=has_form)
+
+            response = view(request, *args, **kwargs)
+            if hasattr(response, "render") and not response.is_rendered:
+                response.render()
+            # The CSRF cookie is per visitor and is set again whenever a cached copy is served.
+            cookies = set(response.cookies) - {settings.CSRF_COOKIE_NAME}
+            if response.status_code != 200 or response.streaming or cookies:
+                return response
+            content = response.content.decode(response.charset)
+            has_form = bool(_CSRF_INPUT.search(content))
+            cache.set(
+                key,
+                (_CSRF_INPUT.sub(rf"\g<1>{CSRF_PLACEHOLDER}\g<2>", content), response["Content-Type"]),
+                timeout,
+            )
+            return _patch_headers(response, has_form=has_form)
+
+        return wrapped
+
+    return decorator(view) if view is not None else decorator
@@ -0,0 +1,260 @@
+"""Per-request profiling for superusers: ``?__profile=cprofile|sql|template``.
+
+The middleware only looks at the raw query string until ``__profile=`` shows up,
+and only a signed-in superuser can trigger it, so leaving it installed costs
+nothing on normal requests. A profiled request runs as usual and its response is
+replaced by a plain-text report:
+
+* ``cprofile`` — the functions with the most cumulative time and what each of
+  them called;
+* ``sql`` — every query with its duration, the template and app function that
+  ran it, and repeated statements grouped together;
+* ``template`` — calls, total and self time for each Django and Jinja2 template.
+
+With ``settings.PROFILE_DIR`` set the report is also written there (plus a
+``.prof`` file for ``cprofile`` that snakeviz or ``pstats`` can open).
+"""
+
+from __future__ import annotations
+
+import contextvars
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseBadRequest
+from django.template.base import Template as DjangoTemplate
+from django.utils import timezone
+from django.utils.text import slugify
+
+from rebolution import metrics
+
+from .slow_queries import query_origin
+
+PARAMETER = "__profile"
+MODES = ("cprofile", "sql", "template")
+CPROFILE_LIMIT = 60
+CALL_TREE_LIMIT = 15
+SQL_PREVIEW_LENGTH = 300
+
+_SKIP_FILES = frozenset({__file__})
+
+
+@dataclass
+class _TemplateTimings:
+    calls: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    total: dict[str, float] = field(default_factory=lambda: defaultdict(float))
+    own: dict[str, float] = field(default_factory=lambda: defaultdict(float))
+    # Time spent in templates nested inside the one currently rendering.
+    stack: list[float] = field(default_factory=list)
+
+    @contextmanager
+    def measure(self, name: str, *, call: bool = True):
+        self.stack.append(0.0)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            nested = self.stack.pop()
+            self.calls[name] += call
+            self.total[name] += elapsed
+            self.own[name] += elapsed - nested
+            if self.stack:
+                self.stack[-1] += elapsed
+
+
+# Set only on the thread serving a profiled request; the template hooks below
+# do nothing for everyone else while they are installed.
+_timings: contextvars.ContextVar[_TemplateTimings | None] = contextvars.ContextVar("template_timings", default=None)
+_hooks_lock = threading.Lock()
+_hooks_users = 0
+
+# Captured once: other threads may still be inside a hook after it is removed.
+_django_template_render = DjangoTemplate.render
+try:
+    from jinja2 import Environment as JinjaEnvironment
+except ImportError:  # Optional dependency.
+    JinjaEnvironment = None
+else:
+    _jinja_environment_get_template = JinjaEnvironment.get_template
+
+
+def _django_render(self, context):
+    timings = _timings.get()
+    if timings is None:
+        return _django_template_render(self, context)
+    with timings.measure(self.origin.template_name or "<string>"):
+        return _django_template_render(self, context)
+
+
+def _timed_render_func(name, render_func):
+    def render(context):
+        timings = _timings.get()
+        generator = render_func(context)
+        first = True
+        while True:
+            # Only time spent producing output counts; the consumer's share does not.
+            with timings.measure(name, call=first):
+                try:
+                    event = next(generator)
+                except StopIteration:
+                    return
+            first = False
+            yield event
+
+    return render
+
+
+def _jinja_get_template(self, *args, **kwargs):
+    template = _jinja_environment_get_template(self, *args, **kwargs)
+    if _timings.get() is None:
+        return template
+    # Includes and extends fetch their templates at render time, so a copy with a
+    # timed render function covers every Jinja2 template in the request.
+    timed = object.__new__(template.__class__)
+    timed.__dict__.update(template.__dict__)
+    timed.root_render_func = _timed_render_func(template.name, template.root_render_func)
+    return timed
+
+
+@contextmanager
+def _template_hooks():
+    global _hooks_users
+    with _hooks_lock:
+        if _hooks_users == 0:
+            DjangoTemplate.render = _django_render
+            if JinjaEnvironment is not None:
+                JinjaEnvironment.get_template = _jinja_get_template
+        _hooks_users += 1
+    try:
+        yield
+    finally:
+        with _hooks_lock:
+            _hooks_users -= 1
+            if _hooks_users == 0:
+                DjangoTemplate.render = _django_template_render
+                if JinjaEnvironment is not None:
+                    JinjaEnvironment.get_template = _jinja_environment_get_template
+
+
+def _profile_cprofile(request, get_response):
+    profiler = cProfile.Profile()
+    response = profiler.runcall(get_response, request)
+    output = io.StringIO()
+    stats = pstats.Stats(profiler, stream=output).strip_dirs().sort_stats("cumulative")
+    stats.print_stats(CPROFILE_LIMIT)
+    output.write("\nCall tree (callees of the most expensive functions):\n")
+    stats.print_callees(CALL_TREE_LIMIT)
+    return response, output.getvalue(), profiler
+
+
+def _profile_sql(request, get_response):
+    queries = []
+
+    def record(execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            seconds = time.perf_counter() - started
+            queries.append((seconds, sql, *query_origin(sys._getframe(1), _SKIP_FILES)))
+
+    with ExitStack() as stack:
+        for db in connections.all():
+            stack.enter_context(db.execute_wrapper(record))
+        response = get_response(request)
+
+    lines = [f"{len(queries)} queries, {sum(query[0] for query in queries) * 1000:.2f} ms in total", ""]
+    for index, (seconds, sql, template, caller) in enumerate(queries, 1):
+        lines.append(f"#{index:<4} {seconds * 1000:9.2f} ms  {template or '-'}  {caller or '-'}")
+        lines.append(f"      {sql[:SQL_PREVIEW_LENGTH]}")
+    repeated = defaultdict(list)
+    for seconds, sql, *_ in queries:
+        repeated[sql].append(seconds)
+    repeated = {sql: runs for sql, runs in repeated.items() if len(runs) > 1}
+    if repeated:
+        lines += ["", "Repeated statements:"]
+        for sql, runs in sorted(repeated.items(), key=lambda item: -sum(item[1])):
+            lines.append(f"{len(runs):5}x {sum(runs) * 1000:9.2f} ms  {sql[:SQL_PREVIEW_LENGTH]}")
+    return response, "\n".join(lines) + "\n", None
+
+
+def _profile_template(request, get_response):
+    timings = _TemplateTimings()
+    token = _timings.set(timings)
+    try:
+        with _template_hooks():
+            response = get_response(request)
+    finally:
+        _timings.reset(token)
+
+    lines = [f"{'template':<70} {'calls':>6} {'total ms':>10} {'self ms':>10}"]
+    for name in sorted(timings.total, key=lambda name: -timings.own[name]):
+        lines.append(
+            f"{name:<70} {timings.calls[name]:>6} {timings.total[name] * 1000:>10.2f} "
+            f"{timings.own[name] * 1000:>10.2f}"
+        )
+    return response, "\n".join(lines) + "\n", None
+
+
+PROFILERS = {
+    "cprofile": _profile_cprofile,
+    "sql": _profile_sql,
+    "template": _profile_template,
+}
+
+
+def _store(request, mode: str, report: str, profiler) -> str:
+    directory = settings.PROFILE_DIR
+    os.makedirs(directory, exist_ok=True)
+    stem = f"{timezone.now():%Y%m%dT%H%M%S%f}-{mode}-{slugify(metrics.view_label(request))[:80]}"
+    with open(os.path.join(directory, f"{stem}.txt"), "w") as file:
+        file.write(report)
+    if profiler is not None:
+        profiler.dump_stats(os.path.join(directory, f"{stem}.prof"))
+    return stem
+
+
+class ProfilingMiddleware:
+    """Profile a request when a superuser adds ``?__profile=<mode>``."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if PARAMETER not in request.META.get("QUERY_STRING", ""):
+            return self.get_response(request)
+        user = getattr(request, "user", None)
+        if user is None or not (user.is_active and user.is_superuser):
+            return self.get_response(request)
+
+        mode = request.GET.get(PARAMETER, "")
+        if mode not in PROFILERS:
+            return HttpResponseBadRequest(
+                f"Unknown profile mode {mode!r}; use one of {', '.join(MODES)}.", content_type="text/plain"
+            )
+
+        started = time.perf_counter()
+        response, report, profiler = PROFILERS[mode](request, self.get_response)
+        elapsed = time.perf_counter() - started
+        header = (
+            f"{request.method} {request.get_full_path()}\n"
+            f"view: {metrics.view_label(request)}  status: {response.status_code}  "
+            f"time: {elapsed * 1000:.2f} ms (profiled)\n\n"
+        )
+        report = header + report
+        result = HttpResponse(report, content_type="text/plain; charset=utf-8")
+        if settings.PROFILE_DIR:
+            result["X-Profile-Report"] = _store(request, mode, report, profiler)
+        result["Cache-Control"] = "no-store"
+        return result
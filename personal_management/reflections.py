@@ -0,0 +1,96 @@
+"""Paging and full-text search over a user's reflection archive.
+
+Review lists page with a keyset cursor on ``(created_at, id)``, served by the
+``pm_reflection_archive_idx`` index, so the cost per page does not grow with the
+size of the archive. Search goes through the generated, GIN-indexed
+``search_vector`` column and returns ranked rows with highlighted snippets.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+from datetime import datetime
+
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+from django.db.models import F, Q, TextField, Value
+from django.db.models.functions import Concat
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from . import models
+
+PAGE_SIZE = 10
+SEARCH_LIMIT = 20
+SEARCH_CONFIG = "english"
+
+# Control characters survive HTML escaping untouched, so the snippet can be
+# escaped first and the highlight markers swapped for <mark> afterwards.
+_START, _STOP = "\x02", "\x03"
+
+
+class InvalidCursor(ValueError):
+    """Raised when a review cursor cannot be decoded."""
+
+
+def encode_cursor(reflection: models.Reflection) -> str:
+    raw = f"{reflection.created_at.isoformat()}|{reflection.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, pk = base64.urlsafe_b64decode(padded.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(created_at), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursor("Invalid cursor") from None
+
+
+def review_page(owner, cadence: str, cursor: str | None = None, *, size: int = PAGE_SIZE):
+    """Return ``(reflections, next_cursor)`` for one page, newest first."""
+
+    queryset = models.Reflection.objects.filter(owner=owner, cadence=cadence)
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        # The plain range keeps the index scan bounded; the OR breaks timestamp ties.
+        queryset = queryset.filter(created_at__lte=created_at).filter(
+            Q(created_at__lt=created_at) | Q(pk__lt=pk)
+        )
+    rows = list(queryset.order_by("-created_at", "-pk")[: size + 1])
+    next_cursor = encode_cursor(rows[size - 1]) if len(rows) > size else None
+    return rows[:size], next_cursor
+
+
+def _snippet(headline: str) -> str:
+    return mark_safe(escape(headline).replace(_START, "<mark>").replace(_STOP, "</mark>"))
+
+
+def search(owner, text: str, *, cadence: str | None = None, limit: int = SEARCH_LIMIT) -> list[dict]:
+    """Rank the owner's reflections against ``text`` (web search syntax)."""
+
+    query = SearchQuery(text, search_type="websearch", config=SEARCH_CONFIG)
+    queryset = models.Reflection.objects.filter(owner=owner, search_vector=query)
+    if cadence:
+        queryset = queryset.filter(cadence=cadence)
+    rows = (
+        queryset.annotate(
+            rank=SearchRank(F("search_vector"), query),
+            snippet=SearchHeadline(
+                Concat(
+                    "highlights", Value(" "), "lessons", Value(" "), "next_steps",
+                    output_field=TextField(),
+                ),
+                query,
+                config=SEARCH_CONFIG,
+                start_sel=_START,
+                stop_sel=_STOP,
+                max_words=35,
+                min_words=15,
+                max_fragments=2,
+            ),
+        )
+        .order_by("-rank", "-created_at")
+        .values("id", "cadence", "created_at", "rank", "snippet")[:limit]
+    )
+    return [{**row, "rank": round(row["rank"], 4), "snippet": _snippet(row["snippet"])} for row in rows]
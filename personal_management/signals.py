@@ -0,0 +1,181 @@
+import copy
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+
+from . import calendar_feed, exercise_index, ingredients, meal_index, models, sync, training_volume
+from .library_cache import bump_library_version, get_library_version
+
+LIBRARY_MODELS = (
+    models.Exercise,
+    models.ExerciseCategory,
+    models.Meal,
+    models.MealCategory,
+)
+
+
+def invalidate_body_library(sender, instance, **kwargs):
+    deleted = kwargs.get("created") is None
+    # Copied because Django clears a deleted instance's pk before the commit.
+    written = copy.copy(instance)
+
+    def bump():
+        # Bumping before the commit would let another request cache the old rows
+        # under the new version, where they would stay until the next write.
+        previous_version = get_library_version()
+        version = bump_library_version()
+        for index in (exercise_index, meal_index):
+            index.library_changed(written, deleted=deleted, previous_version=previous_version, version=version)
+
+    transaction.on_commit(bump)
+
+
+for library_model in LIBRARY_MODELS:
+    post_save.connect(
+        invalidate_body_library,
+        sender=library_model,
+        dispatch_uid=f"body-library-save-{library_model._meta.model_name}",
+    )
+    post_delete.connect(
+        invalidate_body_library,
+        sender=library_model,
+        dispatch_uid=f"body-library-delete-{library_model._meta.model_name}",
+    )
+
+
+def _meal_ingredients_changed(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and "ingredients" not in update_fields:
+        return
+    ingredients.sync_meals([instance])
+
+
+post_save.connect(_meal_ingredients_changed, sender=models.Meal, dispatch_uid="meal-ingredients-save")
+
+
+VOLUME_FIELDS = ("primary_muscles", "secondary_muscles")
+
+
+def _remember_scheduled_for(sender, instance, **kwargs):
+    instance._previous_scheduled_for = None
+    if instance.pk:
+        instance._previous_scheduled_for = (
+            sender.objects.filter(pk=instance.pk).values_list("scheduled_for", flat=True).first()
+        )
+
+
+def _session_changed(sender, instance, **kwargs):
+    training_volume.mark_dirty(
+        instance.owner_id,
+        instance.scheduled_for,
+        getattr(instance, "_previous_scheduled_for", None),
+    )
+
+
+def _session_exercise_changed(sender, instance, **kwargs):
+    session = (
+        models.WorkoutSession.objects.filter(pk=instance.session_id)
+        .values_list("owner_id", "scheduled_for")
+        .first()
+    )
+    if session is not None:
+        training_volume.mark_dirty(*session)
+
+
+def _remember_muscles(sender, instance, update_fields=None, **kwargs):
+    instance._previous_muscles = None
+    if instance.pk and (update_fields is None or not set(update_fields).isdisjoint(VOLUME_FIELDS)):
+        instance._previous_muscles = (
+            sender.objects.filter(pk=instance.pk).values_list(*VOLUME_FIELDS).first()
+        )
+
+
+def _exercise_volume_changed(sender, instance, created=False, **kwargs):
+    previous = getattr(instance, "_previous_muscles", None)
+    if created or previous is None:
+        return
+    # Only the muscle groups feed the rollup; renames and descriptions do not.
+    if all(set(old) == set(getattr(instance, name)) for old, name in zip(previous, VOLUME_FIELDS)):
+        return
+    uses = (
+        models.SessionExercise.objects.filter(exercise=instance, session__scheduled_for__isnull=False)
+        .values_list("session__owner_id", "session__scheduled_for")
+        .distinct()
+    )
+    for owner_id, scheduled_for in uses:
+        training_volume.mark_dirty(owner_id, scheduled_for)
+
+
+pre_save.connect(_remember_scheduled_for, sender=models.WorkoutSession, dispatch_uid="volume-session-pre-save")
+post_save.connect(_session_changed, sender=models.WorkoutSession, dispatch_uid="volume-session-save")
+post_delete.connect(_session_changed, sender=models.WorkoutSession, dispatch_uid="volume-session-delete")
+post_save.connect(
+    _session_exercise_changed, sender=models.SessionExercise, dispatch_uid="volume-session-exercise-save"
+)
+post_delete.connect(
+    _session_exercise_changed, sender=models.SessionExercise, dispatch_uid="volume-session-exercise-delete"
+)
+pre_save.connect(_remember_muscles, sender=models.Exercise, dispatch_uid="volume-exercise-pre-save")
+post_save.connect(_exercise_volume_changed, sender=models.Exercise, dispatch_uid="volume-exercise-save")
+
+
+def _calendar_owner_changed(sender, instance, **kwargs):
+    if sender is models.Milestone:
+        owner_id = (
+            models.Goal.objects.filter(pk=instance.goal_id).values_list("area__owner_id", flat=True).first()
+        )
+    elif sender is models.Goal:
+        owner_id = (
+            models.AreaOfLife.objects.filter(pk=instance.area_id).values_list("owner_id", flat=True).first()
+        )
+    else:
+        owner_id = instance.owner_id
+    if owner_id is not None:
+        # After the commit, so a poll in between cannot cache the old feed under the new version.
+        transaction.on_commit(lambda: calendar_feed.bump_feed_version(owner_id))
+
+
+# Goal titles appear in milestone event summaries.
+for calendar_model in (models.Task, models.Milestone, models.Goal, models.WorkoutSession):
+    post_save.connect(
+        _calendar_owner_changed,
+        sender=calendar_model,
+        dispatch_uid=f"calendar-save-{calendar_model._meta.model_name}",
+    )
+    post_delete.connect(
+        _calendar_owner_changed,
+        sender=calendar_model,
+        dispatch_uid=f"calendar-delete-{calendar_model._meta.model_name}",
+    )
+
+
+def _sync_object_changed(sender, instance, **kwargs):
+    sync.object_changed(instance)
+
+
+def _sync_session_exercise_changed(sender, instance, **kwargs):
+    sync.session_changed(instance.session_id)
+
+
+def _sync_goal_tasks(sender, instance, **kwargs):
+    # Deleting a goal nulls Task.goal with a plain UPDATE, which sends no signals.
+    sync.queryset_changed("task", models.Task.objects.filter(goal=instance))
+
+
+for synced_model in sync.MODEL_NAMES:
+    post_save.connect(
+        _sync_object_changed,
+        sender=synced_model,
+        dispatch_uid=f"sync-save-{synced_model._meta.model_name}",
+    )
+    post_delete.connect(
+        _sync_object_changed,
+        sender=synced_model,
+        dispatch_uid=f"sync-delete-{synced_model._meta.model_name}",
+    )
+post_save.connect(
+    _sync_session_exercise_changed, sender=models.SessionExercise, dispatch_uid="sync-session-exercise-save"
+)
+post_delete.connect(
+    _sync_session_exercise_changed, sender=models.SessionExercise, dispatch_uid="sync-session-exercise-delete"
+)
+pre_delete.connect(_sync_goal_tasks, sender=models.Goal, dispatch_uid="sync-goal-tasks")
@@ -0,0 +1,206 @@
+"""Capture slow SQL with the view and template that ran it.
+
+``SlowQueryMiddleware`` wraps every database connection for the length of a
+request. A query that takes ``settings.SLOW_QUERY_MS`` or longer is noted with
+the innermost template being rendered (Django or Jinja2) and the nearest
+project function on the stack; the stack is only walked for slow queries.
+
+Once the response has been sent, each capture is logged as one JSON document
+on the ``personal_management.slow_queries`` logger and stored in ``SlowQuery``,
+a ring buffer of ``settings.SLOW_QUERY_BUFFER_SIZE`` rows that superusers browse
+in the admin. A ``settings.SLOW_QUERY_EXPLAIN_RATE`` fraction of slow SELECTs is
+re-run under ``EXPLAIN (ANALYZE, BUFFERS)`` in a transaction that is rolled
+back, with a statement timeout. SELECTs that take locks or call functions with
+side effects (advisory locks, ``nextval``, ``FOR UPDATE``) only get a plain
+``EXPLAIN``; running them again would wait on the same locks.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import random
+import re
+import sys
+import time
+from contextlib import ExitStack
+from dataclasses import dataclass
+from typing import Any
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DatabaseError, connection, connections, transaction
+from django.template.base import Template as DjangoTemplate
+from django.utils import timezone
+
+from rebolution import metrics
+
+from . import models
+
+logger = logging.getLogger(__name__)
+
+SEQUENCE = "personal_management_slowquery_seq"
+EXPLAIN_TIMEOUT_MS = 5000
+MAX_PARAMS_LENGTH = 2000
+
+# Statements that must not run a second time just to time them.
+_SIDE_EFFECTS = re.compile(
+    r"\b(?:pg_(?:try_)?advisory\w*|nextval|setval|pg_sleep\w*)\s*\("
+    r"|\bFOR\s+(?:NO\s+KEY\s+)?UPDATE\b|\bFOR\s+(?:KEY\s+)?SHARE\b",
+    re.IGNORECASE,
+)
+
+_APP_DIR = os.path.dirname(os.path.abspath(__file__)) + os.sep
+_PROJECT_DIR = os.path.dirname(_APP_DIR.rstrip(os.sep)) + os.sep
+
+
+@dataclass
+class CapturedQuery:
+    alias: str
+    sql: str
+    params: Any
+    many: bool
+    seconds: float
+    template: str
+    caller: str
+
+
+def query_origin(frame, skip_files: frozenset[str] = frozenset()) -> tuple[str, str]:
+    """Return ``(template, caller)`` for a query executed below ``frame``.
+
+    ``template`` is the innermost Django or Jinja2 template being rendered and
+    ``caller`` the nearest Python frame in this app outside ``skip_files``.
+    """
+
+    template = caller = ""
+    while frame is not None and not (template and caller):
+        if not template:
+            jinja = frame.f_globals.get("__jinja_template__")
+            if jinja is not None:
+                template = jinja.name or ""
+            elif frame.f_code.co_name == "render" and isinstance(frame.f_locals.get("self"), DjangoTemplate):
+                template = frame.f_locals["self"].origin.template_name or ""
+        filename = frame.f_code.co_filename
+        if (
+            not caller
+            and filename.startswith(_APP_DIR)
+            and filename.endswith(".py")
+            and filename != __file__
+            and filename not in skip_files
+        ):
+            caller = f"{filename[len(_PROJECT_DIR):]}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return template, caller
+
+
+def _explainable(query: CapturedQuery) -> bool:
+    statement = query.sql.lstrip().split(None, 1)[0].upper() if query.sql.strip() else ""
+    return (
+        statement == "SELECT"
+        and not query.many
+        and connections[query.alias].vendor == "postgresql"
+        and random.random() < settings.SLOW_QUERY_EXPLAIN_RATE
+    )
+
+
+def explain(query: CapturedQuery) -> Any:
+    options = "FORMAT JSON" if _SIDE_EFFECTS.search(query.sql) else "ANALYZE, BUFFERS, FORMAT JSON"
+    with transaction.atomic(using=query.alias), connections[query.alias].cursor() as cursor:
+        cursor.execute(f"SET LOCAL statement_timeout = {EXPLAIN_TIMEOUT_MS}")
+        cursor.execute(f"EXPLAIN ({options}) {query.sql}", query.params)
+        plan = cursor.fetchone()[0]
+        # ANALYZE executes the statement; undo anything it did.
+        transaction.set_rollback(True, using=query.alias)
+    return plan
+
+
+def record(queries: list[CapturedQuery], view: str) -> None:
+    """Log ``queries`` and add them to the ring buffer."""
+
+    entries = []
+    for query in queries:
+        plan = None
+        if _explainable(query):
+            try:
+                plan = explain(query)
+            except DatabaseError as exc:
+                plan = {"error": str(exc)}
+        entry = {
+            "event": "slow_query",
+            "captured_at": timezone.now().isoformat(),
+            "duration_ms": round(query.seconds * 1000, 3),
+            "database": query.alias,
+            "view": view,
+            "template": query.template,
+            "caller": query.caller,
+            "sql": query.sql,
+            "params": repr(query.params)[:MAX_PARAMS_LENGTH],
+            "plan": plan,
+        }
+        logger.warning(json.dumps(entry, default=str))
+        entries.append(entry)
+
+    table = models.SlowQuery._meta.db_table
+    try:
+        with connection.cursor() as cursor:
+            for entry in entries:
+                cursor.execute(
+                    f"INSERT INTO {table} "
+                    "(slot, captured_at, duration_ms, view, template, caller, sql, params, plan) "
+                    f"VALUES (nextval('{SEQUENCE}') %% %s, %s, %s, %s, %s, %s, %s, %s, %s::jsonb) "
+                    "ON CONFLICT (slot) DO UPDATE SET captured_at = EXCLUDED.captured_at, "
+                    "duration_ms = EXCLUDED.duration_ms, view = EXCLUDED.view, "
+                    "template = EXCLUDED.template, caller = EXCLUDED.caller, sql = EXCLUDED.sql, "
+                    "params = EXCLUDED.params, plan = EXCLUDED.plan",
+                    [
+                        settings.SLOW_QUERY_BUFFER_SIZE,
+                        entry["captured_at"],
+                        entry["duration_ms"],
+                        entry["view"][:255],
+                        entry["template"][:255],
+                        entry["caller"][:255],
+                        entry["sql"],
+                        entry["params"],
+                        None if entry["plan"] is None else json.dumps(entry["plan"], default=str),
+                    ],
+                )
+    except DatabaseError:
+        # The log line above already has everything; never fail the response over it.
+        logger.exception("Could not store slow queries in the ring buffer")
+
+
+class SlowQueryMiddleware:
+    """Capture queries slower than ``settings.SLOW_QUERY_MS`` during each request."""
+
+    def __init__(self, get_response):
+        if settings.SLOW_QUERY_MS <= 0:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.threshold = settings.SLOW_QUERY_MS / 1000
+
+    def __call__(self, request):
+        captured: list[CapturedQuery] = []
+
+        def capture(execute, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                seconds = time.perf_counter() - started
+                if seconds >= self.threshold:
+                    template, caller = query_origin(sys._getframe(1))
+                    captured.append(
+                        CapturedQuery(context["connection"].alias, sql, params, many, seconds, template, caller)
+                    )
+
+        with ExitStack() as stack:
+            for db in connections.all():
+                stack.enter_context(db.execute_wrapper(capture))
+            response = self.get_response(request)
+        if captured:
+            view = metrics.view_label(request)
+            # Runs when the server closes the response, after the client has it,
+            # since a sampled EXPLAIN ANALYZE runs the statement again.
+            response._resource_closers.append(lambda: record(captured, view))
+        return response
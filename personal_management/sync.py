@@ -0,0 +1,293 @@
+"""Per-user change log behind the delta-sync API.
+
+``SyncChange`` keeps one row per synced object. Every save or delete gives the
+row a fresh ``seq`` from a database sequence, so a client that remembers the
+highest ``seq`` it has seen only has to fetch the rows above it. A deleted object
+leaves its row behind as a tombstone. Reconnecting therefore costs in proportion
+to what changed, not to the size of the account.
+
+Changes are queued while a transaction runs and written with one upsert once it
+commits. The writer holds a per-owner advisory lock until its own commit, so an
+owner's ``seq`` values become visible in increasing order and a reader can never
+move its cursor past a change that has yet to commit.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Iterable
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.db.models import Model, QuerySet
+
+from . import models
+
+SEQUENCE = "personal_management_syncchange_seq"
+# First key of the two-key advisory lock; the second is the owner id.
+LOCK_NAMESPACE = 0x5359
+BATCH_SIZE = 500
+MAX_BATCH_SIZE = 2000
+
+_pending = threading.local()
+
+
+@dataclass(frozen=True)
+class SyncedModel:
+    """How one model is exposed to sync clients and how its owner is found."""
+
+    model: type[Model]
+    fields: tuple[str, ...]
+    # Lookup from the synced model to the owning user's id.
+    owner_path: str
+    # ``(foreign key attname, parent model, owner path from the parent)`` for
+    # models that do not carry an owner column themselves.
+    parent: tuple[str, type[Model], str] | None = None
+
+
+SYNCED_MODELS = {
+    "task": SyncedModel(
+        models.Task,
+        ("id", "goal_id", "title", "description", "due_date", "completed"),
+        "owner_id",
+    ),
+    "goal": SyncedModel(
+        models.Goal,
+        ("id", "area_id", "title", "description", "start_date", "target_date", "success_criteria"),
+        "area__owner_id",
+        parent=("area_id", models.AreaOfLife, "owner_id"),
+    ),
+    "milestone": SyncedModel(
+        models.Milestone,
+        ("id", "goal_id", "title", "due_date", "done", "notes"),
+        "goal__area__owner_id",
+        parent=("goal_id", models.Goal, "area__owner_id"),
+    ),
+    "habit": SyncedModel(
+        models.Habit,
+        ("id", "area_id", "name", "frequency", "target_per_period", "description", "active"),
+        "area__owner_id",
+        parent=("area_id", models.AreaOfLife, "owner_id"),
+    ),
+    "habit_checkin": SyncedModel(
+        models.HabitCheckIn,
+        ("id", "habit_id", "timestamp", "note"),
+        "habit__area__owner_id",
+        parent=("habit_id", models.Habit, "area__owner_id"),
+    ),
+    "reflection": SyncedModel(
+        models.Reflection,
+        ("id", "cadence", "created_at", "highlights", "lessons", "next_steps"),
+        "owner_id",
+    ),
+    "workout_session": SyncedModel(
+        models.WorkoutSession,
+        ("id", "title", "scheduled_for", "focus", "notes", "created_at", "updated_at"),
+        "owner_id",
+    ),
+}
+MODEL_NAMES = {synced.model: name for name, synced in SYNCED_MODELS.items()}
+
+SESSION_EXERCISE_FIELDS = ("order", "exercise_id", "sets", "reps", "tempo", "rest_seconds", "notes")
+
+
+@dataclass
+class _Pending:
+    # (model name, object id) -> owner id; the last write in a transaction wins.
+    changes: dict[tuple[str, int], int] = field(default_factory=dict)
+    # Owner ids of parent rows, resolved once per transaction.
+    owners: dict[tuple[type[Model], int], int | None] = field(default_factory=dict)
+    scheduled: bool = False
+
+
+def _state() -> _Pending:
+    state = getattr(_pending, "state", None)
+    if state is None or not any(callback[1] is _flush for callback in connection.run_on_commit):
+        # Either nothing is queued yet, or the transaction that queued it rolled back.
+        state = _pending.state = _Pending()
+    return state
+
+
+def _queue(state: _Pending, name: str, object_id: int, owner_id: int | None) -> None:
+    if owner_id is None:
+        return
+    state.changes[(name, object_id)] = owner_id
+    if not state.scheduled:
+        state.scheduled = True
+        transaction.on_commit(_flush)
+
+
+def _parent_owner(state: _Pending, parent_model: type[Model], parent_id: int, path: str) -> int | None:
+    key = (parent_model, parent_id)
+    if key not in state.owners:
+        state.owners[key] = (
+            parent_model.objects.filter(pk=parent_id).values_list(path, flat=True).first()
+        )
+    return state.owners[key]
+
+
+def object_changed(instance: Model) -> None:
+    """Queue a change for a saved or deleted instance of a synced model."""
+
+    name = MODEL_NAMES[type(instance)]
+    synced = SYNCED_MODELS[name]
+    state = _state()
+    if synced.parent is None:
+        owner_id = instance.owner_id
+    else:
+        attname, parent_model, path = synced.parent
+        owner_id = _parent_owner(state, parent_model, getattr(instance, attname), path)
+    _queue(state, name, instance.pk, owner_id)
+
+
+def session_changed(session_id: int) -> None:
+    """Queue a workout session whose planned exercises changed."""
+
+    state = _state()
+    owner_id = _parent_owner(state, models.WorkoutSession, session_id, "owner_id")
+    _queue(state, "workout_session", session_id, owner_id)
+
+
+def queryset_changed(name: str, queryset: QuerySet) -> None:
+    """Queue every row of ``queryset``; for writes that bypass model signals."""
+
+    state = _state()
+    for pk, owner_id in queryset.order_by().values_list("pk", SYNCED_MODELS[name].owner_path):
+        _queue(state, name, pk, owner_id)
+
+
+def _flush() -> None:
+    state = getattr(_pending, "state", None)
+    _pending.state = None
+    if state is not None and state.changes:
+        write_changes(state.changes)
+
+
+def write_changes(changes: dict[tuple[str, int], int]) -> None:
+    """Upsert log rows for ``{(model name, object id): owner id}``.
+
+    Whether a row is a tombstone is decided here rather than by the signal that
+    queued it, so a delete undone by a rolled-back savepoint stays an upsert.
+    """
+
+    ids = defaultdict(list)
+    for name, object_id in changes:
+        ids[name].append(object_id)
+    existing = {
+        (name, pk)
+        for name, object_ids in ids.items()
+        for pk in SYNCED_MODELS[name].model.objects.filter(pk__in=object_ids).values_list("pk", flat=True)
+    }
+    # Deleting a user queues tombstones for rows nobody can sync any more.
+    owners = set(
+        get_user_model().objects.filter(pk__in=set(changes.values())).values_list("pk", flat=True)
+    )
+    rows = [(key, owner_id) for key, owner_id in changes.items() if owner_id in owners]
+    if not rows:
+        return
+
+    table = models.SyncChange._meta.db_table
+    with transaction.atomic(), connection.cursor() as cursor:
+        for owner_id in sorted(owners):
+            cursor.execute("SELECT pg_advisory_xact_lock(%s, %s)", [LOCK_NAMESPACE, owner_id & 0x7FFFFFFF])
+        cursor.execute(
+            f"INSERT INTO {table} (owner_id, model, object_id, deleted, changed_at, seq) "
+            f"SELECT c.owner_id, c.model, c.object_id, c.deleted, now(), nextval('{SEQUENCE}') "
+            "FROM unnest(%s::bigint[], %s::text[], %s::bigint[], %s::boolean[]) "
+            "AS c(owner_id, model, object_id, deleted) "
+            "ON CONFLICT (model, object_id) DO UPDATE SET "
+            "owner_id = EXCLUDED.owner_id, deleted = EXCLUDED.deleted, "
+            "changed_at = EXCLUDED.changed_at, seq = EXCLUDED.seq",
+            [
+                [owner_id for _, owner_id in rows],
+                [name for (name, _), _ in rows],
+                [object_id for (_, object_id), _ in rows],
+                [(name, object_id) not in existing for (name, object_id), _ in rows],
+            ],
+        )
+
+
+def changes_since(owner, since: int = 0, *, limit: int = BATCH_SIZE) -> tuple[list[dict[str, Any]], int, bool]:
+    """Return ``(changes, last_seq, has_more)`` for the owner's rows after ``since``."""
+
+    log = list(
+        models.SyncChange.objects.filter(owner=owner, seq__gt=since)
+        .order_by("seq")
+        .values_list("seq", "model", "object_id", "deleted")[: limit + 1]
+    )
+    has_more = len(log) > limit
+    log = log[:limit]
+
+    ids = defaultdict(list)
+    for _, name, object_id, deleted in log:
+        if not deleted and name in SYNCED_MODELS:
+            ids[name].append(object_id)
+    data = {name: _rows(owner, name, object_ids) for name, object_ids in ids.items()}
+
+    changes = []
+    for _, name, object_id, deleted in log:
+        row = None if deleted else data.get(name, {}).get(object_id)
+        # A row deleted after this batch was logged reads as a tombstone; its own
+        # log entry follows later with a higher seq.
+        change = {"type": name, "id": object_id, "deleted": row is None}
+        if row is not None:
+            change["data"] = row
+        changes.append(change)
+    return changes, (log[-1][0] if log else since), has_more
+
+
+def _rows(owner, name: str, object_ids: Iterable[int]) -> dict[int, dict[str, Any]]:
+    synced = SYNCED_MODELS[name]
+    rows = {
+        row["id"]: row
+        for row in synced.model.objects.filter(pk__in=object_ids, **{synced.owner_path: owner.pk})
+        .order_by()
+        .values(*synced.fields)
+    }
+    if name == "workout_session" and rows:
+        for row in rows.values():
+            row["exercises"] = []
+        exercises = (
+            models.SessionExercise.objects.filter(session_id__in=rows)
+            .order_by("session_id", "order", "pk")
+            .values("session_id", *SESSION_EXERCISE_FIELDS)
+        )
+        for exercise in exercises:
+            rows[exercise.pop("session_id")]["exercises"].append(exercise)
+    return rows
+
+
+def rebuild() -> int:
+    """Log every existing row that has no entry and tombstone entries whose row is gone.
+
+    Rows written with ``bulk_create`` or before the log existed are picked up here.
+    The table lock makes concurrent writers wait, so their ``seq`` values still
+    land after the ones assigned here. Returns the number of log rows written.
+    """
+
+    table = models.SyncChange._meta.db_table
+    written = 0
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"LOCK TABLE {table} IN EXCLUSIVE MODE")
+        for name, synced in SYNCED_MODELS.items():
+            live_sql, params = (
+                synced.model.objects.order_by("pk").values_list("pk", synced.owner_path).query.sql_with_params()
+            )
+            cursor.execute(
+                f"INSERT INTO {table} (owner_id, model, object_id, deleted, changed_at, seq) "
+                f"SELECT live.owner_id, %s, live.id, FALSE, now(), nextval('{SEQUENCE}') "
+                f"FROM ({live_sql}) AS live(id, owner_id) "
+                "ON CONFLICT (model, object_id) DO NOTHING",
+                [name, *params],
+            )
+            written += cursor.rowcount
+            cursor.execute(
+                f"UPDATE {table} SET deleted = TRUE, changed_at = now(), seq = nextval('{SEQUENCE}') "
+                f"WHERE model = %s AND NOT deleted AND NOT EXISTS "
+                f"(SELECT 1 FROM {synced.model._meta.db_table} o WHERE o.id = {table}.object_id)",
+                [name],
+            )
+            written += cursor.rowcount
+    return written
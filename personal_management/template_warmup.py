@@ -0,0 +1,100 @@
+"""Compile the dashboard templates before the first request needs them.
+
+``dashboard.html`` includes the active microapp's dashboard and settings
+templates by variable name, so nothing loads them until a user opens that
+microapp. Warming walks every template listed in
+``DashboardView.default_microapps`` plus everything they include or extend by
+literal name, and fills the cached template loader the same way rendering would.
+When ``settings.JINJA2_TEMPLATES`` is on, the Jinja2 twins are compiled as well.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Iterable, Iterator
+
+from django.conf import settings
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+from django.template.base import Template
+from django.template.loader_tags import ExtendsNode, IncludeNode
+
+
+@dataclass(frozen=True)
+class WarmedTemplate:
+    name: str
+    seconds: float
+    error: str = ""
+
+
+def dashboard_template_names() -> list[str]:
+    from .views import DashboardView
+
+    names = [DashboardView.template_name]
+    for microapp in DashboardView.default_microapps:
+        names.extend(microapp[key] for key in ("dashboard_template", "settings_template") if key in microapp)
+    return list(dict.fromkeys(names))
+
+
+def _literal(expression) -> str | None:
+    # Constant names compile to a plain string; variables stay ``Variable`` objects.
+    return expression.var if isinstance(expression.var, str) and not expression.filters else None
+
+
+def _references(template: Template) -> Iterator[tuple[str, bool]]:
+    """Yield ``(name, extends)`` for every literal include or extends in ``template``."""
+
+    for node in template.nodelist.get_nodes_by_type(ExtendsNode):
+        name = _literal(node.parent_name)
+        if name:
+            yield name, True
+    for node in template.nodelist.get_nodes_by_type(IncludeNode):
+        name = _literal(node.template)
+        if name:
+            yield name, False
+
+
+def warm(names: Iterable[str] | None = None) -> list[WarmedTemplate]:
+    """Compile ``names`` (default: the dashboard templates) and everything they reference."""
+
+    engine = engines["django"].engine
+    pending = [(name, None) for name in (names or dashboard_template_names())]
+    seen: set[tuple[str, str | None]] = set()
+    results = []
+    while pending:
+        name, parent = pending.pop(0)
+        key = (name, parent and parent.name)
+        if key in seen:
+            continue
+        seen.add(key)
+        started = time.perf_counter()
+        try:
+            if parent is None:
+                template = engine.get_template(name)
+            else:
+                # ``{% extends %}`` looks templates up with the child's origin in the
+                # skip list, which is a separate entry in the cached loader.
+                template, _ = engine.find_template(name, skip=[parent])
+        except (TemplateDoesNotExist, TemplateSyntaxError) as exc:
+            results.append(WarmedTemplate(name, time.perf_counter() - started, f"{type(exc).__name__}: {exc}"))
+            continue
+        results.append(WarmedTemplate(name, time.perf_counter() - started))
+        for reference, extends in _references(template):
+            pending.append((reference, template.origin if extends else None))
+    if names is None and settings.JINJA2_TEMPLATES:
+        results.extend(_warm_jinja2())
+    return results
+
+
+def _warm_jinja2() -> Iterator[WarmedTemplate]:
+    from .jinja_environment import JINJA_TEMPLATES
+
+    engine = engines["jinja2"]
+    for name in sorted(JINJA_TEMPLATES):
+        started = time.perf_counter()
+        try:
+            engine.get_template(name)
+        except (TemplateDoesNotExist, TemplateSyntaxError) as exc:
+            yield WarmedTemplate(f"{name} (jinja2)", time.perf_counter() - started, f"{type(exc).__name__}: {exc}")
+            continue
+        yield WarmedTemplate(f"{name} (jinja2)", time.perf_counter() - started)
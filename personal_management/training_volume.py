@@ -0,0 +1,167 @@
+"""Weekly training volume per muscle group, rolled up in SQL.
+
+Volume is derived by unnesting ``Exercise.primary_muscles`` and
+``Exercise.secondary_muscles`` against every planned ``SessionExercise`` and
+grouping by the ISO week of ``WorkoutSession.scheduled_for``. Results live in
+``WeeklyMuscleVolume``; writes mark the affected ``(owner, week)`` pairs dirty
+and the pairs are recomputed once when the surrounding transaction commits.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Iterable
+
+from django.db import connection, transaction
+
+from . import models
+
+_pending = threading.local()
+
+# First key of the two-key advisory lock; the second is the owner id.
+LOCK_NAMESPACE = 0x564F
+
+# Only plain counts ("10") and ranges ("8-10", lower bound) are numeric reps;
+# timed work such as "45s" contributes sets but no reps.
+_VOLUME_SELECT = """
+    SELECT
+        ws.owner_id,
+        date_trunc('week', ws.scheduled_for::timestamp)::date AS week_start,
+        m.muscle,
+        SUM(CASE WHEN m.is_primary THEN se.sets ELSE 0 END),
+        SUM(CASE WHEN m.is_primary THEN 0 ELSE se.sets END),
+        SUM(CASE WHEN m.is_primary THEN se.sets * r.reps ELSE 0 END),
+        SUM(CASE WHEN m.is_primary THEN 0 ELSE se.sets * r.reps END)
+    FROM {session_exercise} se
+    JOIN {session} ws ON ws.id = se.session_id
+    JOIN {exercise} e ON e.id = se.exercise_id
+    CROSS JOIN LATERAL (
+        SELECT unnest(e.primary_muscles) AS muscle, TRUE AS is_primary
+        UNION ALL
+        SELECT unnest(e.secondary_muscles), FALSE
+    ) m
+    CROSS JOIN LATERAL (
+        SELECT COALESCE(
+            CASE WHEN se.reps ~ '^\\s*\\d{{1,6}}\\s*(-\\s*\\d{{1,6}}\\s*)?$'
+                 THEN substring(se.reps FROM '^\\s*(\\d+)')::integer END,
+            0
+        ) AS reps
+    ) r
+    WHERE ws.scheduled_for IS NOT NULL {where}
+    GROUP BY ws.owner_id, week_start, m.muscle
+"""
+
+
+def _tables() -> dict[str, str]:
+    return {
+        "volume": models.WeeklyMuscleVolume._meta.db_table,
+        "session_exercise": models.SessionExercise._meta.db_table,
+        "session": models.WorkoutSession._meta.db_table,
+        "exercise": models.Exercise._meta.db_table,
+    }
+
+
+def week_start(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+
+def _insert_sql(where: str) -> str:
+    tables = _tables()
+    select = _VOLUME_SELECT.format(where=where, **tables)
+    return (
+        f"INSERT INTO {tables['volume']} "
+        "(owner_id, week_start, muscle, primary_sets, secondary_sets, primary_reps, secondary_reps) "
+        f"{select}"
+    )
+
+
+def _lock_owner(cursor, owner_id: int) -> None:
+    # Two refreshes of one owner would otherwise both delete and then both insert,
+    # and the second insert would hit the unique constraint.
+    cursor.execute("SELECT pg_advisory_xact_lock(%s, %s)", [LOCK_NAMESPACE, owner_id & 0x7FFFFFFF])
+
+
+def refresh_weeks(owner_id: int, weeks: Iterable[date]) -> None:
+    """Recompute the rollup rows of ``owner_id`` for the given week starts."""
+
+    weeks = sorted({week_start(week) for week in weeks})
+    if not weeks:
+        return
+    first, last = weeks[0], weeks[-1] + timedelta(days=7)
+    with transaction.atomic(), connection.cursor() as cursor:
+        _lock_owner(cursor, owner_id)
+        cursor.execute(
+            f"DELETE FROM {_tables()['volume']} WHERE owner_id = %s AND week_start = ANY(%s)",
+            [owner_id, weeks],
+        )
+        cursor.execute(
+            _insert_sql(
+                "AND ws.owner_id = %s AND ws.scheduled_for >= %s AND ws.scheduled_for < %s "
+                "AND date_trunc('week', ws.scheduled_for::timestamp)::date = ANY(%s)"
+            ),
+            [owner_id, first, last, weeks],
+        )
+
+
+def rebuild(owner_id: int | None = None) -> None:
+    """Recompute the whole rollup, or every week for a single owner."""
+
+    volume = _tables()["volume"]
+    with transaction.atomic(), connection.cursor() as cursor:
+        if owner_id is None:
+            # Waits for running refreshes and holds off new ones until this commits.
+            cursor.execute(f"LOCK TABLE {volume} IN SHARE ROW EXCLUSIVE MODE")
+            cursor.execute(f"DELETE FROM {volume}")
+            cursor.execute(_insert_sql(""))
+        else:
+            _lock_owner(cursor, owner_id)
+            cursor.execute(f"DELETE FROM {volume} WHERE owner_id = %s", [owner_id])
+            cursor.execute(_insert_sql("AND ws.owner_id = %s"), [owner_id])
+
+
+def mark_dirty(owner_id: int, *days: date | None) -> None:
+    """Queue ``(owner, week)`` pairs for recomputation when the transaction commits."""
+
+    days = [day for day in days if day is not None]
+    if not days:
+        return
+    dirty = getattr(_pending, "dirty", None)
+    scheduled = dirty is not None and any(
+        callback[1] is _flush for callback in connection.run_on_commit
+    )
+    if not scheduled:
+        # Either nothing is queued yet, or the transaction that queued it rolled back.
+        dirty = _pending.dirty = defaultdict(set)
+    dirty[owner_id].update(week_start(day) for day in days)
+    if not scheduled:
+        transaction.on_commit(_flush)
+
+
+def _flush() -> None:
+    dirty = getattr(_pending, "dirty", None) or {}
+    _pending.dirty = None
+    for owner_id, weeks in dirty.items():
+        refresh_weeks(owner_id, weeks)
+
+
+def weekly_volume(owner, *, weeks: int = 12, muscle: str | None = None, today: date | None = None):
+    """Return rollup rows for the trailing ``weeks`` ISO weeks, oldest first."""
+
+    current = week_start(today or date.today())
+    queryset = models.WeeklyMuscleVolume.objects.filter(
+        owner=owner,
+        week_start__gt=current - timedelta(weeks=weeks),
+        week_start__lte=current,
+    )
+    if muscle:
+        queryset = queryset.filter(muscle=muscle)
+    return queryset.order_by("week_start", "muscle").values(
+        "week_start",
+        "muscle",
+        "primary_sets",
+        "secondary_sets",
+        "primary_reps",
+        "secondary_reps",
+    )
@@ -1,15 +1,71 @@
 from django.urls import path
 
-from . import views
+from . import api, views
+from .page_cache import anonymous_page_cache
 
 app_name = "personal_management"
 
 urlpatterns = [
-    path("", views.HomeView.as_view(), name="home"),
+    path("", anonymous_page_cache(views.HomeView.as_view()), name="home"),
     path("today/", views.today_redirect, name="today"),
     path("dashboard/", views.DashboardView.as_view(), name="dashboard"),
+    path("calendar/<str:token>.ics", views.calendar_ics, name="calendar_ics"),
+    path("api/calendar/feed/", views.calendar_feed_settings, name="calendar_feed_settings"),
     path("api/pomodoro/summary/", views.pomodoro_summary, name="pomodoro_summary"),
     path("api/pomodoro/start/", views.pomodoro_start, name="pomodoro_start"),
     path("api/pomodoro/complete/", views.pomodoro_complete, name="pomodoro_complete"),
     path("api/pomodoro/cancel/", views.pomodoro_cancel, name="pomodoro_cancel"),
+    path("api/library/exercises/", api.library_exercises, name="library_exercises"),
+    path(
+        "api/library/exercise-categories/",
+        api.library_exercise_categories,
+        name="library_exercise_categories",
+    ),
+    path(
+        "api/library/exercises/<int:exercise_id>/alternatives/",
+        api.exercise_alternatives,
+        name="exercise_alternatives",
+    ),
+    path(
+        "api/library/exercises/for-muscles/",
+        api.exercises_for_muscles,
+        name="exercises_for_muscles",
+    ),
+    path("api/library/meals/", api.library_meals, name="library_meals"),
+    path(
+        "api/library/meals/<int:meal_id>/similar/",
+        api.similar_meals,
+        name="library_meal_similar",
+    ),
+    path(
+        "api/library/meal-categories/",
+        api.library_meal_categories,
+        name="library_meal_categories",
+    ),
+    path(
+        "api/library/<str:dataset>/export/",
+        api.export_library,
+        name="library_export",
+    ),
+    path(
+        "api/library/<str:dataset>/import/",
+        api.import_library,
+        name="library_import",
+    ),
+    path("api/body/volume/", api.weekly_training_volume, name="weekly_training_volume"),
+    path("api/body/meal-plan/", api.meal_plan, name="meal_plan"),
+    path("api/reflections/", api.reflection_archive, name="reflection_archive"),
+    path("api/reflections/search/", api.reflection_search, name="reflection_search"),
+    path("api/sync/", api.sync_changes, name="sync_changes"),
+    path("api/body/shopping-list/", api.shopping_list, name="shopping_list"),
+    path(
+        "api/body/sessions/generate/",
+        api.generate_workout_session,
+        name="generate_workout_session",
+    ),
+    path(
+        "api/body/sessions/export/",
+        api.export_workout_sessions,
+        name="workout_sessions_export",
+    ),
 ]
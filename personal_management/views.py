@@ -1,20 +1,31 @@
-from datetime import timedelta
+from datetime import date, timedelta
 
 import json
 
+from django.conf import settings
 from django.contrib.auth import logout
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.paginator import Paginator
-from django.http import HttpResponseBadRequest, JsonResponse
+from django.db.models import Prefetch
+from django.http import (
+    Http404,
+    HttpResponse,
+    HttpResponseBadRequest,
+    HttpResponseNotModified,
+    JsonResponse,
+    StreamingHttpResponse,
+)
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
 from django.views import View
 from django.views.decorators.http import require_GET, require_POST
 from django.views.generic import TemplateView
 
-from . import models
+from . import calendar_feed, meal_planner, models, reflections, training_volume
+from .library_cache import cached_library_value, get_library_version
 
 
 class DashboardView(LoginRequiredMixin, TemplateView):
@@ -182,6 +193,23 @@ class DashboardView(LoginRequiredMixin, TemplateView):
         },
     ]
 
+    body_views = ("overview", "exercises", "meals", "sessions")
+    productivity_views = (
+        "overview",
+        "pomodoro",
+        "blocking",
+        "weekly",
+        "monthly",
+        "goals",
+        "habits",
+        "backward",
+        "parkinson",
+    )
+
+    overview_review_count = 4
+    session_window_days = 28
+    session_page_size = 20
+
     @classmethod
     def build_dashboard_context(cls, request):
         user = request.user
@@ -247,7 +275,9 @@ class DashboardView(LoginRequiredMixin, TemplateView):
             "body_exercises_pagination": [],
             "body_meals_page": None,
             "body_meals_pagination": [],
-            "body_sessions_full": None,
+            "body_sessions_page": None,
+            "body_sessions_pagination": [],
+            "body_sessions_window": None,
         }
 
         productivity_view = "overview"
@@ -260,7 +290,13 @@ class DashboardView(LoginRequiredMixin, TemplateView):
                 "cycles_before_long_break": 4,
             },
             "weekly_reviews": [],
+            "weekly_reviews_next_cursor": None,
+            "weekly_review_count": 0,
             "monthly_reviews": [],
+            "monthly_reviews_next_cursor": None,
+            "monthly_review_count": 0,
+            "review_search_query": "",
+            "review_search_results": [],
             "big_four_goals": [],
             "productivity_habits": [],
             "backward_engineering_samples": [],
@@ -275,26 +311,23 @@ class DashboardView(LoginRequiredMixin, TemplateView):
             body_view = request.GET.get("body_view", "overview")
             exercises_qs = models.Exercise.objects.select_related("category").order_by("name")
             meals_qs = models.Meal.objects.select_related("category").order_by("name")
-            sessions_qs = (
-                models.WorkoutSession.objects.filter(owner=user)
-                .prefetch_related("session_exercises__exercise")
-                .order_by("-scheduled_for", "-updated_at")
+            sessions_qs = models.WorkoutSession.objects.filter(owner=user)
+            session_exercises = Prefetch(
+                "session_exercises",
+                queryset=models.SessionExercise.objects.select_related("exercise"),
             )
 
-            sessions_list = list(sessions_qs)
-            today_sessions = [s for s in sessions_list if s.scheduled_for == today]
+            today_sessions = list(
+                sessions_qs.filter(scheduled_for=today)
+                .prefetch_related(session_exercises)
+                .order_by("-updated_at")
+            )
             next_session = None
             if not today_sessions:
-                next_session = next(
-                    (
-                        s
-                        for s in sessions_list
-                        if s.scheduled_for and s.scheduled_for >= today
-                    ),
-                    None,
+                next_session = (
+                    sessions_qs.filter(scheduled_for__gt=today).order_by("scheduled_for", "pk").first()
+                    or sessions_qs.order_by("-scheduled_for", "-updated_at").first()
                 )
-                if next_session is None and sessions_list:
-                    next_session = sessions_list[0]
 
             seen_exercise_ids: set[int] = set()
             today_exercises: list[models.Exercise] = []
@@ -304,11 +337,21 @@ class DashboardView(LoginRequiredMixin, TemplateView):
                         seen_exercise_ids.add(section.exercise_id)
                         today_exercises.append(section.exercise)
 
-            meals_for_today: list[models.Meal] = []
-            if today_sessions:
-                meals_for_today = list(meals_qs[:3])
-            else:
-                meals_for_today = list(meals_qs[:3])
+            meals_for_today = []
+            if body_view == "overview":
+                # The week is planned from Monday with a per-user seed, so today's meals
+                # stay put across reloads and match /api/body/meal-plan/.
+                planned_ids = meal_planner.planned_meal_ids(
+                    user, today, start=training_volume.week_start(today)
+                )
+                planned_meals = meals_qs.in_bulk(planned_ids)
+                meals_for_today = [planned_meals[pk] for pk in planned_ids if pk in planned_meals]
+
+            library_version = get_library_version()
+            exercise_count = cached_library_value(
+                "exercise-count", exercises_qs.count, version=library_version
+            )
+            meal_count = cached_library_value("meal-count", meals_qs.count, version=library_version)
 
             body_context.update(
                 {
@@ -317,37 +360,39 @@ class DashboardView(LoginRequiredMixin, TemplateView):
                     "body_today_exercises": today_exercises,
                     "body_today_meals": meals_for_today,
                     "body_next_session": next_session,
-                    "body_exercise_count": exercises_qs.count(),
-                    "body_meal_count": meals_qs.count(),
-                    "body_session_count": len(sessions_list),
+                    "body_exercise_count": exercise_count,
+                    "body_meal_count": meal_count,
+                    "body_session_count": sessions_qs.count(),
+                    "body_library_version": library_version,
                 }
             )
 
+            # The library pages reuse the cached counts so a cached page of rows can be
+            # served without touching the Exercise or Meal tables at all.
             if body_view == "exercises":
                 page_number = request.GET.get("page", 1)
                 paginator = Paginator(exercises_qs, 50)
+                paginator.count = exercise_count
                 page_obj = paginator.get_page(page_number)
                 body_context["body_exercises_page"] = page_obj
                 body_context["body_exercises_pagination"] = DashboardView.pagination_window(page_obj)
             elif body_view == "meals":
                 page_number = request.GET.get("page", 1)
                 paginator = Paginator(meals_qs, 50)
+                paginator.count = meal_count
                 page_obj = paginator.get_page(page_number)
                 body_context["body_meals_page"] = page_obj
                 body_context["body_meals_pagination"] = DashboardView.pagination_window(page_obj)
             elif body_view == "sessions":
-                body_context["body_sessions_full"] = sessions_list
+                body_context.update(
+                    DashboardView.session_timeline(
+                        request, sessions_qs.prefetch_related(session_exercises), today
+                    )
+                )
 
         if active_microapp["slug"] == "productivity":
             productivity_view = request.GET.get("productivity_view", "overview")
-            weekly_reviews = list(
-                models.Reflection.objects.filter(owner=user, cadence=models.Reflection.WEEKLY)
-                .order_by("-created_at")
-            )
-            monthly_reviews = list(
-                models.Reflection.objects.filter(owner=user, cadence=models.Reflection.MONTHLY)
-                .order_by("-created_at")
-            )
+            review_archive = DashboardView.review_archive(request, productivity_view)
             big_goals = list(
                 models.Goal.objects.filter(area__owner=user)
                 .order_by("target_date", "-start_date")[:4]
@@ -355,8 +400,7 @@ class DashboardView(LoginRequiredMixin, TemplateView):
             productivity_context.update(
                 {
                     "productivity_view": productivity_view,
-                    "weekly_reviews": weekly_reviews,
-                    "monthly_reviews": monthly_reviews,
+                    **review_archive,
                     "big_four_goals": big_goals,
                     "productivity_habits": list(
                         models.Habit.objects.filter(area__owner=user)
@@ -414,6 +458,107 @@ class DashboardView(LoginRequiredMixin, TemplateView):
         context.update(self.build_dashboard_context(self.request))
         return context
 
+    @classmethod
+    def metrics_variant(cls, request) -> str:
+        """Label the request by microapp and sub-view for ``/metrics``; unknown values are folded."""
+
+        slugs = {microapp["slug"] for microapp in cls.default_microapps}
+        app = request.GET.get("app") or cls.default_microapps[0]["slug"]
+        variant = f"app={app if app in slugs else 'other'}"
+        for parameter, known in (("body_view", cls.body_views), ("productivity_view", cls.productivity_views)):
+            if app == parameter.split("_")[0]:
+                value = request.GET.get(parameter, "overview")
+                variant += f"&{parameter}={value if value in known else 'other'}"
+        return variant
+
+    def render_to_response(self, context, **response_kwargs):
+        if settings.JINJA2_TEMPLATES:
+            # Only imported when enabled, since Jinja2 is an optional dependency.
+            from .jinja_environment import JINJA_TEMPLATES
+
+            if context["active_dashboard_template"] in JINJA_TEMPLATES:
+                self.template_engine = "jinja2"
+        return super().render_to_response(context, **response_kwargs)
+
+    @classmethod
+    def review_archive(cls, request, productivity_view):
+        """Keyset-paged weekly and monthly reviews plus an optional full-text search.
+
+        Only the archive being browsed honours ``reviews_cursor``; every other view
+        just needs the newest few reviews and the totals.
+        """
+
+        user = request.user
+        context = {}
+        for cadence, key in (
+            (models.Reflection.WEEKLY, "weekly"),
+            (models.Reflection.MONTHLY, "monthly"),
+        ):
+            browsing = productivity_view == key
+            try:
+                reviews, next_cursor = reflections.review_page(
+                    user,
+                    cadence,
+                    request.GET.get("reviews_cursor") if browsing else None,
+                    size=reflections.PAGE_SIZE if browsing else cls.overview_review_count,
+                )
+            except reflections.InvalidCursor:
+                reviews, next_cursor = reflections.review_page(user, cadence)
+            context[f"{key}_reviews"] = reviews
+            context[f"{key}_reviews_next_cursor"] = next_cursor
+            context[f"{key}_review_count"] = models.Reflection.objects.filter(
+                owner=user, cadence=cadence
+            ).count()
+
+        query = request.GET.get("reviews_q", "").strip()[:200]
+        context["review_search_query"] = query
+        context["review_search_results"] = []
+        if query and productivity_view in {"weekly", "monthly"}:
+            context["review_search_results"] = reflections.search(
+                user,
+                query,
+                cadence=models.Reflection.WEEKLY if productivity_view == "weekly" else models.Reflection.MONTHLY,
+            )
+        return context
+
+    @classmethod
+    def session_timeline(cls, request, sessions_qs, today):
+        """Paginate the sessions scheduled inside one date window (or the unscheduled ones)."""
+
+        window_days = cls.session_window_days
+        unscheduled = request.GET.get("sessions_window") == "unscheduled"
+        try:
+            start = date.fromisoformat(request.GET["sessions_from"])
+        except (KeyError, ValueError):
+            start = today - timedelta(days=window_days // 2)
+        # Keep the previous and next windows representable.
+        start = min(
+            max(start, date.min + timedelta(days=window_days)),
+            date.max - timedelta(days=2 * window_days),
+        )
+        end = start + timedelta(days=window_days)
+
+        if unscheduled:
+            window_qs = sessions_qs.filter(scheduled_for__isnull=True).order_by("-updated_at", "-pk")
+        else:
+            window_qs = sessions_qs.filter(scheduled_for__gte=start, scheduled_for__lt=end).order_by(
+                "-scheduled_for", "-updated_at", "-pk"
+            )
+        page_obj = Paginator(window_qs, cls.session_page_size).get_page(request.GET.get("page", 1))
+        return {
+            "body_sessions_page": page_obj,
+            "body_sessions_pagination": cls.pagination_window(page_obj),
+            "body_sessions_window": {
+                "unscheduled": unscheduled,
+                "start": start,
+                "end": end - timedelta(days=1),
+                "previous_start": (start - timedelta(days=window_days)).isoformat(),
+                "next_start": end.isoformat(),
+                "current_start": start.isoformat(),
+                "unscheduled_count": sessions_qs.filter(scheduled_for__isnull=True).count(),
+            },
+        }
+
     @staticmethod
     def pagination_window(page_obj, *, boundary=2, radius=1):
         pages = []
@@ -583,3 +728,49 @@ def pomodoro_cancel(request):
     session.status = models.PomodoroSession.CANCELLED
     session.save(update_fields=["status", "updated_at"])
     return JsonResponse({"ok": True})
+
+
+@login_required
+def calendar_feed_settings(request):
+    """Return the caller's feed URL; POST issues a new token and retires the old URL."""
+
+    if request.method == "POST":
+        feed = calendar_feed.rotate_token(request.user)
+    elif request.method == "GET":
+        feed = calendar_feed.feed_for(request.user)
+    else:
+        return HttpResponseBadRequest("Use GET or POST")
+    url = request.build_absolute_uri(reverse("personal_management:calendar_ics", args=[feed.token]))
+    return JsonResponse({"url": url, "created_at": feed.created_at.isoformat()})
+
+
+@require_GET
+def calendar_ics(request, token):
+    owner_id = calendar_feed.owner_for_token(token)
+    if owner_id is None:
+        raise Http404("Unknown calendar feed")
+
+    version = calendar_feed.get_feed_version(owner_id)
+    etag = f'"ics-{version}"'
+    modified = calendar_feed.last_modified(version)
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match is not None:
+        not_modified = etag in {tag.removeprefix("W/") for tag in parse_etags(if_none_match)}
+    else:
+        since = parse_http_date_safe(request.headers.get("If-Modified-Since", ""))
+        not_modified = since is not None and since >= int(modified.timestamp())
+
+    if not_modified:
+        response = HttpResponseNotModified()
+    else:
+        body = calendar_feed.cached_body(owner_id, version)
+        if body is not None:
+            response = HttpResponse(body)
+        else:
+            response = StreamingHttpResponse(calendar_feed.render(owner_id, version))
+        response["Content-Type"] = "text/calendar; charset=utf-8"
+        response["Content-Disposition"] = 'inline; filename="improve.ics"'
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(modified.timestamp())
+    response["Cache-Control"] = "private, no-cache"
+    return response
@@ -0,0 +1,85 @@
+"""Build a WorkoutSession that covers requested muscle groups.
+
+Exercise selection runs against the in-process bitmask index (greedy set cover,
+see :meth:`ExerciseIndex.greedy_cover`), so generating a session never scans the
+Exercise table. The session is created with one INSERT and its exercises with a
+single ``bulk_create``.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from datetime import date
+
+import numpy as np
+from django.db import transaction
+
+from . import models
+from .exercise_index import get_exercise_index, muscles_from_mask
+
+# Rough time under tension per set; rest comes from the request.
+SECONDS_PER_SET = 45
+MAX_EXERCISES = 20
+
+
+@dataclass
+class WorkoutRequest:
+    muscles: list[str]
+    equipment: list[str] = field(default_factory=list)
+    exercise_count: int = 6
+    time_budget_minutes: int = 60
+    sets: int = 3
+    reps: str = "8-10"
+    rest_seconds: int = 90
+    title: str = ""
+    focus: str = ""
+    scheduled_for: date | None = None
+    seed: int | None = None
+
+    @property
+    def minutes_per_exercise(self) -> float:
+        return self.sets * (SECONDS_PER_SET + self.rest_seconds) / 60
+
+    @property
+    def slots(self) -> int:
+        fits_budget = math.floor(self.time_budget_minutes / self.minutes_per_exercise)
+        return max(0, min(self.exercise_count, fits_budget, MAX_EXERCISES))
+
+
+def generate_session(owner, request: WorkoutRequest) -> tuple[models.WorkoutSession, list[str]]:
+    """Create and return the session plus the muscles that could not be covered."""
+
+    rng = np.random.default_rng(request.seed)
+    exercise_ids, uncovered = get_exercise_index().greedy_cover(
+        request.muscles,
+        count=request.slots,
+        equipment=request.equipment,
+        rng=rng,
+    )
+    focus = request.focus or ", ".join(request.muscles)
+    with transaction.atomic():
+        session = models.WorkoutSession.objects.create(
+            owner=owner,
+            title=request.title or f"Generated: {focus}"[:160],
+            focus=focus[:120],
+            scheduled_for=request.scheduled_for,
+            notes=(
+                f"Generated for {', '.join(request.muscles)} within "
+                f"{request.time_budget_minutes} minutes."
+            ),
+        )
+        models.SessionExercise.objects.bulk_create(
+            [
+                models.SessionExercise(
+                    session=session,
+                    exercise_id=exercise_id,
+                    order=order,
+                    sets=request.sets,
+                    reps=request.reps,
+                    rest_seconds=request.rest_seconds,
+                )
+                for order, exercise_id in enumerate(exercise_ids, start=1)
+            ]
+        )
+    return session, muscles_from_mask(uncovered)
@@ -0,0 +1,325 @@
+"""Request, database and cache metrics in the Prometheus text exposition format.
+
+``MetricsMiddleware`` times every request and, through a database
+``execute_wrapper``, each query it runs, labelling both with the resolved URL
+name. Views can split their label further with a ``metrics_variant(request)``
+classmethod (the dashboard adds its microapp and sub-view). ``MeteredCache``
+wraps the configured cache backend and counts hits and misses per key prefix.
+
+Samples are kept in a lock-protected registry per process. With
+``METRICS_DIR`` set (``DJANGO_METRICS_DIR``), each process also writes a
+snapshot of its registry to that directory at most once per
+``SNAPSHOT_INTERVAL`` and when it exits, and ``/metrics`` adds up every
+snapshot, so any worker can answer a scrape for the whole server. Snapshots of
+exited workers are kept so counters never go backwards; clear the directory
+when the server restarts.
+"""
+
+from __future__ import annotations
+
+import atexit
+import glob
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import ExitStack
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+from django.utils.module_loading import import_string
+from django.views.decorators.http import require_GET
+
+SNAPSHOT_INTERVAL = 1.0
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+SIZE_BUCKETS = (1_000, 5_000, 10_000, 25_000, 50_000, 100_000, 250_000, 500_000, 1_000_000, 5_000_000)
+
+
+@dataclass(frozen=True)
+class Metric:
+    kind: str
+    documentation: str
+    labelnames: tuple[str, ...]
+    buckets: tuple[float, ...] = ()
+
+
+METRICS = {
+    "http_request_duration_seconds": Metric(
+        "histogram", "Time spent producing a response.", ("view", "method", "status"), LATENCY_BUCKETS
+    ),
+    "http_response_size_bytes": Metric(
+        "histogram", "Size of non-streaming response bodies as sent.", ("view",), SIZE_BUCKETS
+    ),
+    "db_queries_per_request": Metric(
+        "histogram", "Database queries run while handling one request.", ("view",), QUERY_COUNT_BUCKETS
+    ),
+    "db_query_duration_seconds": Metric(
+        "histogram", "Time spent in each database query.", ("view",), QUERY_BUCKETS
+    ),
+    "cache_requests_total": Metric(
+        "counter", "Cache lookups by key prefix and result (hit or miss).", ("group", "result")
+    ),
+}
+
+
+class Registry:
+    """Counters and histograms for one process; safe to update from any thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.values: dict[tuple[str, tuple[str, ...]], list[float]] = {}
+        # A fresh file per process start, so a recycled pid never overwrites
+        # the snapshot of a worker that has exited.
+        self.snapshot_name = f"{os.getpid()}-{uuid.uuid4().hex[:8]}.json"
+        self.snapshot_at = 0.0
+
+    def after_fork(self):
+        # Samples recorded before the fork belong to the parent's snapshot.
+        self._lock = threading.Lock()
+        self._reset()
+
+    def inc(self, name: str, labels: tuple[str, ...], amount: float = 1) -> None:
+        with self._lock:
+            values = self.values.setdefault((name, labels), [0.0])
+            values[0] += amount
+
+    def observe(self, name: str, labels: tuple[str, ...], *samples: float) -> None:
+        buckets = METRICS[name].buckets
+        with self._lock:
+            # One slot per bucket, then +Inf, sum.
+            values = self.values.setdefault((name, labels), [0.0] * (len(buckets) + 2))
+            for sample in samples:
+                for index, bound in enumerate(buckets):
+                    if sample <= bound:
+                        values[index] += 1
+                        break
+                else:
+                    values[len(buckets)] += 1
+                values[-1] += sample
+
+    def snapshot(self) -> list:
+        with self._lock:
+            return [[name, list(labels), list(values)] for (name, labels), values in self.values.items()]
+
+    def write_snapshot(self, *, force: bool = False) -> None:
+        directory = getattr(settings, "METRICS_DIR", None)
+        now = time.monotonic()
+        if not directory or (not force and now - self.snapshot_at < SNAPSHOT_INTERVAL):
+            return
+        self.snapshot_at = now
+        handle, temporary = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(handle, "w") as file:
+            json.dump(self.snapshot(), file)
+        os.replace(temporary, os.path.join(directory, self.snapshot_name))
+
+
+registry = Registry()
+os.register_at_fork(after_in_child=registry.after_fork)
+atexit.register(lambda: registry.write_snapshot(force=True))
+
+
+def collect() -> dict[tuple[str, tuple[str, ...]], list[float]]:
+    """Sum this process's live samples with every other process's latest snapshot."""
+
+    totals = {}
+    snapshots = [registry.snapshot()]
+    directory = getattr(settings, "METRICS_DIR", None)
+    if directory:
+        for path in glob.glob(os.path.join(directory, "*.json")):
+            if os.path.basename(path) == registry.snapshot_name:
+                continue
+            try:
+                with open(path) as file:
+                    snapshots.append(json.load(file))
+            except (OSError, ValueError):
+                continue
+    for snapshot in snapshots:
+        for name, labels, values in snapshot:
+            if name not in METRICS:
+                continue
+            key = (name, tuple(labels))
+            current = totals.setdefault(key, [0.0] * len(values))
+            if len(current) == len(values):
+                totals[key] = [left + right for left, right in zip(current, values)]
+    return totals
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+def exposition(totals=None) -> str:
+    totals = collect() if totals is None else totals
+    lines = []
+    for name, metric in METRICS.items():
+        lines.append(f"# HELP {name} {metric.documentation}")
+        lines.append(f"# TYPE {name} {metric.kind}")
+        for (sample_name, labels), values in sorted(totals.items()):
+            if sample_name != name:
+                continue
+            if metric.kind == "counter":
+                lines.append(f"{name}{_labels(metric.labelnames, labels)} {_number(values[0])}")
+                continue
+            cumulative = 0.0
+            for bound, count in zip((*metric.buckets, "+Inf"), values):
+                cumulative += count
+                le = f'le="{bound if bound == "+Inf" else _number(bound)}"'
+                lines.append(f"{name}_bucket{_labels(metric.labelnames, labels, le)} {_number(cumulative)}")
+            lines.append(f"{name}_sum{_labels(metric.labelnames, labels)} {_number(values[-1])}")
+            lines.append(f"{name}_count{_labels(metric.labelnames, labels)} {_number(cumulative)}")
+    return "\n".join(lines) + "\n"
+
+
+def view_label(request) -> str:
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "<unresolved>"
+    label = match.view_name
+    variant = getattr(getattr(match.func, "view_class", None), "metrics_variant", None)
+    if variant is not None:
+        label = f"{label}?{variant(request)}"
+    return label
+
+
+class MetricsMiddleware:
+    """Record latency, response size and query metrics for every request."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        durations: list[float] = []
+
+        def record_query(execute, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                durations.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(record_query))
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        view = view_label(request)
+        registry.observe(
+            "http_request_duration_seconds", (view, request.method, str(response.status_code)), elapsed
+        )
+        if not response.streaming:
+            registry.observe("http_response_size_bytes", (view,), len(response.content))
+        registry.observe("db_queries_per_request", (view,), len(durations))
+        if durations:
+            registry.observe("db_query_duration_seconds", (view,), *durations)
+        registry.write_snapshot()
+        return response
+
+
+def _key_group(key: str) -> str:
+    # ``{% cache %}`` keys are "template.cache.<fragment>.<hash>"; ours are "<prefix>:…".
+    if key.startswith("template.cache."):
+        return key.rsplit(".", 1)[0]
+    return key.split(":", 1)[0]
+
+
+class MeteredCache(BaseCache):
+    """Cache backend that delegates to ``OPTIONS["BACKEND"]`` and counts hits and misses."""
+
+    _missing = object()
+
+    def __init__(self, location, params):
+        options = dict(params.get("OPTIONS", {}))
+        backend = options.pop("BACKEND")
+        super().__init__(params)
+        self._cache = import_string(backend)(location, {**params, "OPTIONS": options})
+
+    def _record(self, key: str, hit: bool) -> None:
+        registry.inc("cache_requests_total", (_key_group(str(key)), "hit" if hit else "miss"))
+
+    def get(self, key, default=None, version=None):
+        value = self._cache.get(key, self._missing, version=version)
+        self._record(key, value is not self._missing)
+        return default if value is self._missing else value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        found = self._cache.get_many(keys, version=version)
+        for key in keys:
+            self._record(key, key in found)
+        return found
+
+    def get_or_set(self, key, default, timeout=DEFAULT_TIMEOUT, version=None):
+        value = self.get(key, self._missing, version=version)
+        if value is self._missing:
+            value = default() if callable(default) else default
+            self._cache.add(key, value, timeout=timeout, version=version)
+            # Another caller may have stored a value first; return theirs.
+            return self._cache.get(key, value, version=version)
+        return value
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        return self._cache.add(key, value, timeout=timeout, version=version)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        return self._cache.set(key, value, timeout=timeout, version=version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        return self._cache.set_many(data, timeout=timeout, version=version)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self._cache.touch(key, timeout=timeout, version=version)
+
+    def delete(self, key, version=None):
+        return self._cache.delete(key, version=version)
+
+    def delete_many(self, keys, version=None):
+        return self._cache.delete_many(keys, version=version)
+
+    def has_key(self, key, version=None):
+        return self._cache.has_key(key, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        return self._cache.incr(key, delta, version=version)
+
+    def decr(self, key, delta=1, version=None):
+        return self._cache.decr(key, delta, version=version)
+
+    def clear(self):
+        return self._cache.clear()
+
+    def close(self, **kwargs):
+        return self._cache.close(**kwargs)
+
+
+@require_GET
+def metrics_view(request):
+    token = getattr(settings, "METRICS_TOKEN", "")
+    if token and not constant_time_compare(request.headers.get("Authorization", ""), f"Bearer {token}"):
+        return HttpResponseForbidden("Forbidden", content_type="text/plain")
+    return HttpResponse(exposition(), content_type=CONTENT_TYPE)
@@ -1,6 +1,11 @@
 import os
 from pathlib import Path
 
+try:
+    import jinja2
+except ImportError:  # Optional: every page renders with Django templates without it.
+    jinja2 = None
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = "django-insecure-change-me"
@@ -20,6 +25,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Outermost, so latency covers the whole stack and sizes are the bytes sent.
+    "rebolution.metrics.MetricsMiddleware",
+    # Next, so queries from every middleware below are captured. Sampled EXPLAIN runs
+    # happen after the response is sent and are not part of the measured latency.
+    "personal_management.slow_queries.SlowQueryMiddleware",
+    # Next, so it compresses whatever the rest of the stack produces (HTML and JSON).
+    "django.middleware.gzip.GZipMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -27,6 +39,8 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    # Needs request.user; inert unless a superuser adds ?__profile=cprofile|sql|template.
+    "personal_management.profiling.ProfilingMiddleware",
 ]
 
 ROOT_URLCONF = "rebolution.urls"
@@ -47,6 +61,34 @@ TEMPLATES = [
     },
 ]
 
+# The dashboard shell, Body library and Productivity overview also exist as Jinja2
+# templates (personal_management/jinja2/). Django templates stay the default;
+# DJANGO_JINJA2_TEMPLATES=1 renders those pages with Jinja2 when it is installed.
+# Compare the engines with `python manage.py benchmark_templates`.
+if jinja2 is not None:
+    TEMPLATES.append(
+        {
+            "NAME": "jinja2",
+            "BACKEND": "django.template.backends.jinja2.Jinja2",
+            "DIRS": [],
+            "APP_DIRS": True,
+            "OPTIONS": {
+                "environment": "personal_management.jinja_environment.environment",
+                "context_processors": [
+                    "django.contrib.auth.context_processors.auth",
+                    "django.contrib.messages.context_processors.messages",
+                ],
+            },
+        }
+    )
+
+JINJA2_TEMPLATES = jinja2 is not None and os.environ.get("DJANGO_JINJA2_TEMPLATES") == "1"
+
+# Django's cached template loader keeps compiled templates per process; with this
+# on, each worker compiles the dashboard microapp templates while it boots instead
+# of on its first requests (see `python manage.py warm_templates`).
+WARM_TEMPLATES_ON_STARTUP = os.environ.get("DJANGO_WARM_TEMPLATES") == "1"
+
 WSGI_APPLICATION = "rebolution.wsgi.application"
 
 DATABASES = {
@@ -60,6 +102,47 @@ DATABASES = {
     }
 }
 
+# Shared fragments (e.g. the Body library pages) are versioned in the cache, so
+# multi-process deployments should point this at Redis or Memcached.
+# MeteredCache counts hits and misses for /metrics and hands everything else to
+# the backend named in OPTIONS.
+CACHES = {
+    "default": {
+        "BACKEND": "rebolution.metrics.MeteredCache",
+        "LOCATION": os.environ.get("DJANGO_CACHE_LOCATION", "improve"),
+        "OPTIONS": {
+            "BACKEND": os.environ.get(
+                "DJANGO_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+            ),
+        },
+    }
+}
+
+# /metrics serves request, query and cache metrics in the Prometheus text format.
+# With several worker processes, point DJANGO_METRICS_DIR at a directory they all
+# share (emptied on each restart) so every scrape covers all of them. When
+# DJANGO_METRICS_TOKEN is set, scrapers must send "Authorization: Bearer <token>".
+METRICS_DIR = os.environ.get("DJANGO_METRICS_DIR") or None
+METRICS_TOKEN = os.environ.get("DJANGO_METRICS_TOKEN", "")
+
+# Queries slower than DJANGO_SLOW_QUERY_MS (0 turns capture off) are logged as JSON
+# on the "personal_management.slow_queries" logger and kept in a ring buffer of the
+# latest SLOW_QUERY_BUFFER_SIZE that superusers browse in the admin. A
+# DJANGO_SLOW_QUERY_EXPLAIN_RATE fraction of them (0-1) is re-run under
+# EXPLAIN (ANALYZE, BUFFERS) after the response is sent, which repeats the query's
+# cost; statements that lock or call nextval() only get a plain EXPLAIN.
+SLOW_QUERY_MS = float(os.environ.get("DJANGO_SLOW_QUERY_MS", "250"))
+SLOW_QUERY_EXPLAIN_RATE = float(os.environ.get("DJANGO_SLOW_QUERY_EXPLAIN_RATE", "0"))
+SLOW_QUERY_BUFFER_SIZE = 500
+
+# Reports from ?__profile=… are returned in the response and, when this is set, also
+# saved to DJANGO_PROFILE_DIR (with a .prof file for cProfile runs).
+PROFILE_DIR = os.environ.get("DJANGO_PROFILE_DIR") or None
+
+# Habit check-ins stay in full detail for this many months; `compact_checkins`
+# rolls older monthly partitions into per-period counts and drops them.
+HABIT_CHECKIN_DETAIL_MONTHS = int(os.environ.get("DJANGO_HABIT_CHECKIN_DETAIL_MONTHS", "12"))
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -87,6 +170,18 @@ STATIC_URL = "static/"
 
 STATICFILES_DIRS = [BASE_DIR / "static"]
 
+STATIC_ROOT = BASE_DIR / "staticfiles"
+
+# collectstatic writes content-hashed names plus .gz/.br variants; hashed assets
+# are cached by browsers for a year. Set DJANGO_SERVE_STATIC=1 when no front-end
+# server handles STATIC_ROOT.
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "rebolution.staticfiles.CompressedManifestStaticFilesStorage"},
+}
+
+SERVE_STATIC = os.environ.get("DJANGO_SERVE_STATIC") == "1"
+
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 LOGIN_REDIRECT_URL = "personal_management:dashboard"
@@ -0,0 +1,123 @@
+"""Hashed, pre-compressed static assets and a view that serves them.
+
+``collectstatic`` writes content-hashed copies of every asset and, for text
+assets, ``.gz`` and ``.br`` siblings next to them (Brotli only when the optional
+``brotli`` package is installed). Hashed names change whenever the content does,
+so they are served with a one-year ``immutable`` lifetime. A front-end server can
+do the same from ``STATIC_ROOT`` with ``gzip_static``/``brotli_static``; the view
+below covers deployments where Django serves ``/static/`` itself
+(``DJANGO_SERVE_STATIC=1``).
+"""
+
+from __future__ import annotations
+
+import gzip
+import mimetypes
+import os
+import posixpath
+from functools import cache
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.base import ContentFile
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+from django.views.static import was_modified_since
+
+try:
+    import brotli
+except ImportError:  # Optional: only gzip variants are written without it.
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = (".css", ".js", ".svg", ".json", ".txt", ".map", ".html", ".xml")
+# Variants that do not save at least this fraction are not worth a second file.
+MIN_SAVING = 0.05
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+
+
+def _encoders():
+    yield "gzip", ".gz", lambda data: gzip.compress(data, compresslevel=9, mtime=0)
+    if brotli is not None:
+        yield "br", ".br", lambda data: brotli.compress(data, quality=11)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Manifest storage that also writes compressed variants of hashed text files."""
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        for name in sorted(set(self.hashed_files.values())):
+            if name.endswith(COMPRESSIBLE_EXTENSIONS):
+                self._compress(name)
+
+    def _compress(self, name: str) -> None:
+        with self.open(name) as handle:
+            data = handle.read()
+        for _, suffix, compress in _encoders():
+            compressed = compress(data)
+            if len(compressed) > len(data) * (1 - MIN_SAVING):
+                continue
+            if self.exists(name + suffix):
+                self.delete(name + suffix)
+            self._save(name + suffix, ContentFile(compressed))
+
+
+@cache
+def _hashed_names() -> frozenset[str]:
+    return frozenset(getattr(staticfiles_storage, "hashed_files", {}).values())
+
+
+def _accepted_encodings(header: str) -> set[str]:
+    accepted = set()
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        if params.strip().replace(" ", "") in {"q=0", "q=0.0", "q=0.00", "q=0.000"}:
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+@require_safe
+def serve(request, path: str):
+    """Serve a collected asset, preferring a pre-compressed variant."""
+
+    path = posixpath.normpath(path).lstrip("/")
+    try:
+        full_path = safe_join(settings.STATIC_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404("Not found") from None
+    if not os.path.isfile(full_path):
+        raise Http404("Not found")
+
+    accepted = _accepted_encodings(request.headers.get("Accept-Encoding", ""))
+    chosen, encoding = full_path, None
+    if path.endswith(COMPRESSIBLE_EXTENSIONS):
+        for coding, suffix, _ in _encoders():
+            if coding in accepted and os.path.isfile(full_path + suffix):
+                chosen, encoding = full_path + suffix, coding
+                break
+
+    modified = os.stat(chosen).st_mtime
+    if not was_modified_since(request.headers.get("If-Modified-Since"), modified):
+        response = HttpResponseNotModified()
+    else:
+        content_type, _ = mimetypes.guess_type(full_path)
+        response = FileResponse(
+            open(chosen, "rb"),
+            content_type=content_type or "application/octet-stream",
+            filename=os.path.basename(full_path),
+        )
+        response["Last-Modified"] = http_date(modified)
+        if encoding:
+            response["Content-Encoding"] = encoding
+    response["Vary"] = "Accept-Encoding"
+    if path in _hashed_names():
+        response["Cache-Control"] = f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+    else:
+        response["Cache-Control"] = "public, max-age=0, must-revalidate"
+    return response
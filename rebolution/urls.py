@@ -1,17 +1,33 @@
+from django.conf import settings
 from django.contrib import admin
-from django.urls import include, path
+from django.contrib.auth import views as auth_views
+from django.urls import include, path, re_path
 from django.views.generic import TemplateView
 
 from personal_management import views as pm_views
+from personal_management.page_cache import anonymous_page_cache
+
+from . import metrics, staticfiles
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("accounts/logout/", pm_views.logout_view, name="logout"),
+    path(
+        "accounts/login/",
+        anonymous_page_cache(auth_views.LoginView.as_view(), query_params=("next",)),
+        name="login",
+    ),
     path("accounts/", include("django.contrib.auth.urls")),
     path("", include("personal_management.urls")),
     path(
         "about/",
-        TemplateView.as_view(template_name="personal_management/about.html"),
+        anonymous_page_cache(TemplateView.as_view(template_name="personal_management/about.html")),
         name="about",
     ),
+    path("metrics", metrics.metrics_view, name="metrics"),
 ]
+
+if settings.SERVE_STATIC:
+    urlpatterns.append(
+        re_path(rf"^{settings.STATIC_URL.strip('/')}/(?P<path>.+)$", staticfiles.serve, name="static")
+    )
@@ -0,0 +1,592 @@
+/* Dashboard settings dialog */
+(function () {
+    const modal = document.querySelector("[data-settings-modal]");
+    if (!modal) {
+        return;
+    }
+    const openers = document.querySelectorAll("[data-open-settings]");
+    const closeButtons = modal.querySelectorAll("[data-close-settings]");
+
+    const openModal = () => {
+        modal.classList.add("is-open");
+    };
+    const closeModal = () => {
+        modal.classList.remove("is-open");
+    };
+
+    openers.forEach((trigger) => {
+        trigger.addEventListener("click", (event) => {
+            event.preventDefault();
+            openModal();
+        });
+    });
+
+    closeButtons.forEach((btn) => {
+        btn.addEventListener("click", (event) => {
+            event.preventDefault();
+            closeModal();
+        });
+    });
+
+    modal.addEventListener("click", (event) => {
+        if (event.target === modal) {
+            closeModal();
+        }
+    });
+})();
+
+/* Productivity: pomodoro */
+(function () {
+    const app = document.getElementById("pomodoro-app");
+    if (!app) return;
+
+    const modeLabel = document.getElementById("pomodoro-mode");
+    const timeLabel = document.getElementById("pomodoro-time");
+    const cycleLabel = document.getElementById("pomodoro-cycle");
+    const startBtn = document.getElementById("pomodoro-start");
+    const pauseBtn = document.getElementById("pomodoro-pause");
+    const resetBtn = document.getElementById("pomodoro-reset");
+    const saveBtn = document.getElementById("pomodoro-save");
+    const settingsForm = app.querySelector(".config-card");
+
+    const levelEl = document.getElementById("pomodoro-level");
+    const xpEl = document.getElementById("pomodoro-xp");
+    const nextXpEl = document.getElementById("pomodoro-next-xp");
+    const totalEl = document.getElementById("pomodoro-total");
+    const streakEl = document.getElementById("pomodoro-streak");
+    const bestStreakEl = document.getElementById("pomodoro-best-streak");
+    const coinsEl = document.getElementById("pomodoro-coins");
+    const progressBar = document.getElementById("pomodoro-progress-bar");
+    const forestGrid = document.getElementById("pomodoro-forest");
+
+    const defaults = {
+        focus: parseInt(settingsForm.querySelector("input[name='focus']").value, 10),
+        short: parseInt(settingsForm.querySelector("input[name='short']").value, 10),
+        long: parseInt(settingsForm.querySelector("input[name='long']").value, 10),
+        cycles: parseInt(settingsForm.querySelector("input[name='cycles']").value, 10),
+    };
+    const STORAGE_KEY = "improve:pomodoro-defaults";
+    const storedDefaults = JSON.parse(localStorage.getItem(STORAGE_KEY) || "null");
+    if (storedDefaults) {
+        ["focus", "short", "long", "cycles"].forEach((key) => {
+            if (storedDefaults[key]) {
+                defaults[key] = storedDefaults[key];
+                settingsForm.querySelector(`input[name='${key}']`).value = storedDefaults[key];
+            }
+        });
+    }
+
+    const TREE_EMOJI = {
+        Sprout: "🌱",
+        Sapling: "🌿",
+        Grove: "🌳",
+        Blossom: "🌸",
+        Ancient: "🪵",
+    };
+
+    let timer = null;
+    let mode = "focus";
+    let cycle = 1;
+    let remaining = defaults.focus * 60;
+    let activeSession = null;
+
+    function getCSRFToken() {
+        const match = document.cookie.match(/csrftoken=([^;]+)/);
+        return match ? match[1] : "";
+    }
+
+    async function fetchJSON(url, options = {}) {
+        const opts = Object.assign({
+            credentials: "same-origin",
+            headers: {
+                "Content-Type": "application/json",
+                "X-CSRFToken": getCSRFToken(),
+            },
+        }, options);
+        const response = await fetch(url, opts);
+        if (!response.ok) {
+            const text = await response.text();
+            throw new Error(text || response.statusText);
+        }
+        return response.json();
+    }
+
+    function format(seconds) {
+        const m = Math.floor(seconds / 60);
+        const s = seconds % 60;
+        return `${String(m).padStart(2, "0")}:${String(s).padStart(2, "0")}`;
+    }
+
+    function setMode(nextMode, opts = {}) {
+        const { newCycle = cycle, newRemaining = null } = opts;
+        cycle = newCycle;
+        mode = nextMode;
+        if (newRemaining !== null) {
+            remaining = newRemaining;
+        } else {
+            if (mode === "focus") remaining = defaults.focus * 60;
+            if (mode === "short") remaining = defaults.short * 60;
+            if (mode === "long") remaining = defaults.long * 60;
+        }
+        modeLabel.textContent = mode === "focus" ? "Focus" : mode === "short" ? "Short Break" : "Long Break";
+        cycleLabel.textContent = `Cycle ${cycle}`;
+        timeLabel.textContent = format(remaining);
+    }
+
+    function showNotification(message) {
+        if ("Notification" in window) {
+            if (Notification.permission === "granted") {
+                new Notification(message);
+            } else if (Notification.permission !== "denied") {
+                Notification.requestPermission().then((perm) => {
+                    if (perm === "granted") new Notification(message);
+                });
+            }
+        } else {
+            alert(message);
+        }
+    }
+
+    function stopTimer() {
+        if (timer) {
+            clearInterval(timer);
+            timer = null;
+        }
+    }
+
+    function startTimer(durationSeconds) {
+        stopTimer();
+        remaining = durationSeconds;
+        timeLabel.textContent = format(remaining);
+        timer = setInterval(() => {
+            remaining -= 1;
+            timeLabel.textContent = format(Math.max(0, remaining));
+            if (remaining <= 0) {
+                stopTimer();
+                completeSession();
+            }
+        }, 1000);
+    }
+
+    async function loadSummary() {
+        try {
+            const data = await fetchJSON("/api/pomodoro/summary/");
+            renderSummary(data);
+            if (data.active_session && !timer) {
+                activeSession = data.active_session;
+                const elapsed = data.active_session.elapsed_seconds;
+                const total = data.active_session.focus_minutes * 60;
+                const remainingSeconds = Math.max(1, total - elapsed);
+                setMode("focus", {
+                    newCycle: data.active_session.current_cycle,
+                    newRemaining: remainingSeconds,
+                });
+                startTimer(remainingSeconds);
+            }
+        } catch (error) {
+            console.error(error);
+        }
+    }
+
+    function renderSummary(data) {
+        const profile = data.profile;
+        levelEl.textContent = profile.level;
+        xpEl.textContent = profile.xp;
+        nextXpEl.textContent = profile.xp_for_next_level;
+        totalEl.textContent = profile.total_focus_minutes;
+        streakEl.textContent = profile.streak_count;
+        bestStreakEl.textContent = profile.best_streak;
+        coinsEl.textContent = profile.coins;
+        const progressPct = Math.min(100, Math.round((profile.xp_progress / Math.max(1, profile.xp_needed_for_next)) * 100));
+        progressBar.style.width = `${progressPct}%`;
+
+        forestGrid.innerHTML = "";
+        if (data.forest && data.forest.length) {
+            data.forest.forEach((tree) => {
+                const li = document.createElement("div");
+                li.className = "forest-card";
+                li.innerHTML = `
+                    <div class="emoji">${TREE_EMOJI[tree.tree_type] || "🌱"}</div>
+                    <strong>${tree.tree_type}</strong>
+                    <div class="lead">${tree.focus_minutes} min</div>
+                    <small>${tree.planted_at}</small>
+                `;
+                forestGrid.appendChild(li);
+            });
+        } else {
+            forestGrid.innerHTML = '<div class="empty-state">Complete a focus session to plant your first tree.</div>';
+        }
+    }
+
+    async function startSession() {
+        try {
+            const payload = {
+                focus_minutes: parseInt(settingsForm.querySelector("input[name='focus']").value, 10) || defaults.focus,
+                short_break_minutes: parseInt(settingsForm.querySelector("input[name='short']").value, 10) || defaults.short,
+                long_break_minutes: parseInt(settingsForm.querySelector("input[name='long']").value, 10) || defaults.long,
+                cycles_before_long_break: parseInt(settingsForm.querySelector("input[name='cycles']").value, 10) || defaults.cycles,
+            };
+            const data = await fetchJSON("/api/pomodoro/start/", {
+                method: "POST",
+                body: JSON.stringify(payload),
+            });
+            activeSession = data.session;
+            setMode("focus", { newCycle: data.session.current_cycle, newRemaining: data.session.focus_minutes * 60 });
+            startTimer(data.session.focus_minutes * 60);
+            if ("Notification" in window && Notification.permission !== "granted") {
+                Notification.requestPermission();
+            }
+        } catch (error) {
+            console.error(error);
+        }
+    }
+
+    async function completeSession() {
+        if (!activeSession) {
+            loadSummary();
+            return;
+        }
+        try {
+            const completedMinutes = Math.max(
+                1,
+                Math.round((activeSession.focus_minutes * 60 - Math.max(remaining, 0)) / 60)
+            );
+            const data = await fetchJSON("/api/pomodoro/complete/", {
+                method: "POST",
+                body: JSON.stringify({
+                    session_id: activeSession.id,
+                    completed_minutes: completedMinutes,
+                }),
+            });
+            activeSession = null;
+            showNotification("Focus block complete! Time for a break.");
+            renderSummary(data.summary);
+            loadSummary();
+        } catch (error) {
+            console.error(error);
+        }
+    }
+
+    async function cancelSession() {
+        if (!activeSession) return;
+        try {
+            await fetchJSON("/api/pomodoro/cancel/", {
+                method: "POST",
+                body: JSON.stringify({ session_id: activeSession.id }),
+            });
+        } catch (error) {
+            console.error(error);
+        }
+        activeSession = null;
+    }
+
+    startBtn.addEventListener("click", () => {
+        if (timer) return;
+        if (activeSession) {
+            startTimer(remaining);
+            return;
+        }
+        startSession();
+    });
+
+    pauseBtn.addEventListener("click", () => {
+        if (!timer) return;
+        stopTimer();
+    });
+
+    resetBtn.addEventListener("click", async () => {
+        stopTimer();
+        await cancelSession();
+        setMode("focus", { newCycle: 1 });
+    });
+
+    saveBtn.addEventListener("click", async () => {
+        const data = {
+            focus: parseInt(settingsForm.querySelector("input[name='focus']").value, 10) || defaults.focus,
+            short: parseInt(settingsForm.querySelector("input[name='short']").value, 10) || defaults.short,
+            long: parseInt(settingsForm.querySelector("input[name='long']").value, 10) || defaults.long,
+            cycles: parseInt(settingsForm.querySelector("input[name='cycles']").value, 10) || defaults.cycles,
+        };
+        localStorage.setItem(STORAGE_KEY, JSON.stringify(data));
+        Object.assign(defaults, data);
+        setMode(mode, { newCycle: cycle });
+        saveBtn.textContent = "Saved";
+        setTimeout(() => (saveBtn.textContent = "Save defaults"), 1200);
+    });
+
+    loadSummary();
+})();
+
+/* Productivity: blocking */
+(function() {
+    const app = document.getElementById("blocking-app");
+    if (!app) return;
+
+    const STORAGE_KEY = "improve:blocking";
+    const form = app.querySelector("#blocking-form");
+    const list = app.querySelector("#blocked-list");
+
+    let items = JSON.parse(localStorage.getItem(STORAGE_KEY) || "[]");
+
+    function render() {
+        list.innerHTML = "";
+        if (!items.length) {
+            const li = document.createElement("li");
+            li.className = "blocked-item";
+            li.innerHTML = '<span class="empty-state">No entries yet. Add your biggest distractions.</span>';
+            list.appendChild(li);
+            return;
+        }
+        items.forEach((item, index) => {
+            const li = document.createElement("li");
+            li.className = "blocked-item";
+            const status = item.enabled ? "Active" : "Paused";
+            li.innerHTML = `
+                <span><strong>${item.title}</strong> • ${item.kind} <br><small>${item.reason || "No reason provided"}</small></span>
+                <div class="actions-inline">
+                    <button data-action="toggle" data-index="${index}">${status}</button>
+                    <button data-action="remove" data-index="${index}">Remove</button>
+                </div>
+            `;
+            list.appendChild(li);
+        });
+    }
+
+    function save() {
+        localStorage.setItem(STORAGE_KEY, JSON.stringify(items));
+        render();
+    }
+
+    list.addEventListener("click", (event) => {
+        const button = event.target.closest("button");
+        if (!button) return;
+        const index = parseInt(button.dataset.index, 10);
+        const action = button.dataset.action;
+        if (action === "toggle") {
+            items[index].enabled = !items[index].enabled;
+        }
+        if (action === "remove") {
+            items.splice(index, 1);
+        }
+        save();
+    });
+
+    form.addEventListener("submit", (event) => {
+        event.preventDefault();
+        const data = new FormData(form);
+        const title = (data.get("title") || "").trim();
+        if (!title) return;
+        items.unshift({
+            title,
+            kind: data.get("kind"),
+            reason: (data.get("reason") || "").trim(),
+            enabled: true,
+        });
+        form.reset();
+        save();
+    });
+
+    render();
+})();
+
+/* Productivity: weekly review */
+(function() {
+    const container = document.getElementById("weekly-review");
+    if (!container) return;
+
+    const notesField = container.querySelector("#weekly-notes");
+    const saveBtn = container.querySelector("#weekly-save");
+    const clearBtn = container.querySelector("#weekly-clear");
+    const STORAGE_KEY = "improve:weekly_notes";
+
+    notesField.value = localStorage.getItem(STORAGE_KEY) || "";
+
+    saveBtn.addEventListener("click", () => {
+        localStorage.setItem(STORAGE_KEY, notesField.value);
+        saveBtn.textContent = "Saved";
+        setTimeout(() => (saveBtn.textContent = "Save notes"), 1200);
+    });
+
+    clearBtn.addEventListener("click", () => {
+        notesField.value = "";
+        localStorage.removeItem(STORAGE_KEY);
+    });
+})();
+
+/* Productivity: monthly review */
+(function() {
+    const container = document.getElementById("monthly-review");
+    if (!container) return;
+
+    const STORAGE_KEY = "improve:monthly_commitments";
+    const form = container.querySelector("#monthly-commitments");
+    const saveBtn = container.querySelector("#monthly-save");
+    const clearBtn = container.querySelector("#monthly-clear");
+
+    const saved = JSON.parse(localStorage.getItem(STORAGE_KEY) || "null");
+    if (saved) {
+        form.theme.value = saved.theme || "";
+        form.outcomes.value = saved.outcomes || "";
+    }
+
+    saveBtn.addEventListener("click", () => {
+        const data = {
+            theme: form.theme.value,
+            outcomes: form.outcomes.value,
+        };
+        localStorage.setItem(STORAGE_KEY, JSON.stringify(data));
+        saveBtn.textContent = "Saved";
+        setTimeout(() => (saveBtn.textContent = "Save routine"), 1200);
+    });
+
+    clearBtn.addEventListener("click", () => {
+        form.reset();
+        localStorage.removeItem(STORAGE_KEY);
+    });
+})();
+
+/* Productivity: habits */
+(function() {
+    const container = document.getElementById("habit-tracker");
+    if (!container) return;
+
+    const STORAGE_KEY = `improve:habit:${new Date().toISOString().slice(0,10)}`;
+    const legacyKeys = Object.keys(localStorage).filter((key) => key.startsWith("improve:habit:"));
+    legacyKeys.slice(0, -7).forEach((key) => localStorage.removeItem(key));
+
+    const habits = Array.from(container.querySelectorAll(".habit-item"));
+    const saveBtn = container.querySelector("#habit-save");
+    const clearBtn = container.querySelector("#habit-clear");
+
+    const saved = JSON.parse(localStorage.getItem(STORAGE_KEY) || "null");
+    if (saved) {
+        habits.forEach((row) => {
+            const id = row.dataset.habit;
+            const checkbox = row.querySelector("input[type='checkbox']");
+            const streakChip = row.querySelector(".streak");
+            if (saved[id]) {
+                checkbox.checked = saved[id].checked;
+                streakChip.textContent = `${saved[id].streak}-day streak`;
+            }
+        });
+    }
+
+    function persist() {
+        const data = {};
+        habits.forEach((row) => {
+            const id = row.dataset.habit;
+            const checkbox = row.querySelector("input[type='checkbox']");
+            const streakChip = row.querySelector(".streak");
+            const streak = parseInt(streakChip.textContent, 10) || 0;
+            data[id] = { checked: checkbox.checked, streak };
+        });
+        localStorage.setItem(STORAGE_KEY, JSON.stringify(data));
+    }
+
+    saveBtn?.addEventListener("click", () => {
+        habits.forEach((row) => {
+            const checkbox = row.querySelector("input[type='checkbox']");
+            const streakChip = row.querySelector(".streak");
+            let streak = parseInt(streakChip.textContent, 10) || 0;
+            if (checkbox.checked) {
+                streak += 1;
+            } else {
+                streak = 0;
+            }
+            streakChip.textContent = `${streak}-day streak`;
+        });
+        persist();
+        saveBtn.textContent = "Saved";
+        setTimeout(() => (saveBtn.textContent = "Save today"), 1200);
+    });
+
+    clearBtn?.addEventListener("click", () => {
+        habits.forEach((row) => {
+            row.querySelector("input[type='checkbox']").checked = false;
+            row.querySelector(".streak").textContent = "0-day streak";
+        });
+        persist();
+    });
+})();
+
+/* Productivity: backward planning */
+(function() {
+    const container = document.getElementById("backward-tool");
+    if (!container) return;
+
+    const form = container.querySelector("#backward-form");
+    const results = container.querySelector("#backward-results");
+
+    function renderPlan(data) {
+        const { outcome, target, steps, cadence } = data;
+        if (!outcome || !target) {
+            results.textContent = "Please provide an outcome and target date.";
+            return;
+        }
+        const targetDate = new Date(target);
+        const today = new Date();
+        const totalDays = Math.max(1, Math.ceil((targetDate - today) / (1000 * 60 * 60 * 24)));
+        const interval = Math.max(1, Math.floor(totalDays / steps));
+
+        let html = `<strong>${outcome}</strong><br>`;
+        html += `<span>${steps} milestones • ${cadence} work sessions per week</span><br><br>`;
+        html += "<ol>";
+        for (let i = steps; i >= 1; i--) {
+            const milestoneDate = new Date(targetDate);
+            milestoneDate.setDate(milestoneDate.getDate() - interval * (steps - i));
+            html += `<li><strong>Milestone ${i}</strong> — ${milestoneDate.toLocaleDateString()} : Draft deliverable / review with stakeholders</li>`;
+        }
+        html += "</ol>";
+        html += `<p>Schedule ${cadence} deep-work sessions each week leading to ${targetDate.toLocaleDateString()}.</p>`;
+        results.innerHTML = html;
+    }
+
+    container.querySelector("#backward-generate").addEventListener("click", () => {
+        const data = {
+            outcome: form.outcome.value.trim(),
+            target: form.target.value,
+            steps: parseInt(form.steps.value, 10) || 4,
+            cadence: parseInt(form.cadence.value, 10) || 3,
+        };
+        renderPlan(data);
+    });
+})();
+
+/* Productivity: Parkinson timeboxing */
+(function() {
+    const container = document.getElementById("parkinson-tool");
+    if (!container) return;
+
+    const form = container.querySelector("#parkinson-form");
+    const results = container.querySelector("#parkinson-results");
+
+    container.querySelector("#parkinson-generate").addEventListener("click", () => {
+        const task = form.task.value.trim();
+        const defaultHours = parseFloat(form.default.value) || 1;
+        const factor = parseFloat(form.factor.value) || 0.5;
+        const deadline = form.deadline.value ? new Date(form.deadline.value) : null;
+
+        if (!task) {
+            results.textContent = "Describe the task to timebox it.";
+            return;
+        }
+
+        const compressedHours = Math.max(0.5, defaultHours * factor);
+        const checkpoints = [0.25, 0.5, 0.75];
+        let html = `<strong>${task}</strong><br>`;
+        html += `<p>Default time: ${defaultHours}h → Challenge time: <strong>${compressedHours.toFixed(1)}h</strong></p>`;
+        html += "<ol>";
+        checkpoints.forEach((ratio, index) => {
+            const label = ["Kickoff", "Midpoint", "Polish"][index] || "Checkpoint";
+            html += `<li><strong>${label}</strong> — have ${Math.round(ratio * 100)}% done by ${(compressedHours * ratio).toFixed(1)}h.</li>`;
+        });
+        html += "</ol>";
+        if (deadline) {
+            const start = new Date(deadline.getTime() - compressedHours * 60 * 60 * 1000);
+            html += `<p>Start no later than <strong>${start.toLocaleString()}</strong> to deliver by ${deadline.toLocaleString()}.</p>`;
+        } else {
+            html += `<p>Block ${compressedHours.toFixed(1)} hours on your calendar this week.</p>`;
+        }
+        results.innerHTML = html;
+    });
+})();